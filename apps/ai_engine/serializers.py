@@ -6,6 +6,8 @@ class AIResultSerializer(serializers.Serializer):
     anomaly_threshold = serializers.FloatField(required=False)
     is_anomalous = serializers.BooleanField(required=False)
     heatmap = serializers.CharField(allow_blank=True)
+    heatmap_source = serializers.CharField(required=False, allow_blank=True)
+    heatmap_size = serializers.IntegerField(required=False)
     model = serializers.CharField()
     model_version = serializers.CharField(required=False, allow_blank=True)
     device = serializers.CharField(required=False, allow_blank=True)
@@ -14,6 +16,11 @@ class AIResultSerializer(serializers.Serializer):
     input_sha256 = serializers.CharField(required=False, allow_blank=True)
     image_id = serializers.CharField(required=False, allow_blank=True)
     service_processing_ms = serializers.FloatField(required=False)
+    frame_count = serializers.IntegerField(required=False)
+    frames_analyzed = serializers.IntegerField(required=False)
+    mean_anomaly_probability = serializers.FloatField(required=False)
+    peak_frame_index = serializers.IntegerField(required=False)
+    frame_probabilities = serializers.CharField(required=False, allow_blank=True)
 
 
 class AIProcessingLogSerializer(serializers.Serializer):
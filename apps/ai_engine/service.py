@@ -67,6 +67,7 @@ def _validate_inference_payload(payload: dict) -> dict:
         "weights_sha256",
         "input_sha256",
         "image_id",
+        "frame_probabilities",
     ):
         if optional_field in payload and payload[optional_field] is not None:
             if not isinstance(payload[optional_field], str):
@@ -90,6 +91,13 @@ def _validate_inference_payload(payload: dict) -> dict:
                 "AI inference service returned an invalid anomaly_threshold."
             ) from exc
 
+    for count_field in ("frame_count", "frames_analyzed"):
+        if count_field in payload and payload[count_field] is not None:
+            if isinstance(payload[count_field], bool) or not isinstance(payload[count_field], int):
+                raise AIServiceResponseError(
+                    f"AI inference service returned an invalid {count_field}."
+                )
+
     if "is_anomalous" in payload and payload["is_anomalous"] is not None:
         if not isinstance(payload["is_anomalous"], bool):
             raise AIServiceResponseError(
@@ -99,19 +107,33 @@ def _validate_inference_payload(payload: dict) -> dict:
     return payload
 
 
-def request_inference(image_bytes: bytes, image_id: str) -> dict:
+def request_inference(
+    image_bytes: bytes,
+    image_id: str,
+    *,
+    content_type: str = "application/octet-stream",
+    image_sha256: str | None = None,
+    frame_count: int | None = None,
+) -> dict:
+    """Score ``image_bytes`` with the AI service and store the result.
+
+    ``image_bytes`` is either the stored original or a preprocessed ``.npy``
+    tensor; for the latter pass the original's ``image_sha256`` and
+    ``frame_count`` so the result still describes the source image.
+    """
     response = None
     last_error: RequestException | None = None
-    image_sha256 = hashlib.sha256(image_bytes).hexdigest()
+    image_sha256 = image_sha256 or hashlib.sha256(image_bytes).hexdigest()
+    headers = {"X-Image-Id": image_id, "X-Image-SHA256": image_sha256}
+    if frame_count:
+        headers["X-Source-Frame-Count"] = str(frame_count)
+    file_name = "image.npy" if content_type == "application/x-npy" else "image.bin"
     for attempt in range(AI_SERVICE_RETRY_COUNT + 1):
         try:
             response = requests.post(
                 f"{AI_SERVICE_URL}/analyze-image",
-                headers={
-                    "X-Image-Id": image_id,
-                    "X-Image-SHA256": image_sha256,
-                },
-                files={"file": ("image.bin", image_bytes, "application/octet-stream")},
+                headers=headers,
+                files={"file": (file_name, image_bytes, content_type)},
                 timeout=AI_SERVICE_TIMEOUT_SECONDS,
             )
             response.raise_for_status()
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.11 on 2026-10-19 13:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = []
+
+    operations = [
+        migrations.CreateModel(
+            name="StatCounter",
+            fields=[
+                ("name", models.CharField(max_length=64, primary_key=True, serialize=False)),
+                ("value", models.BigIntegerField(default=0)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name="DailyActivity",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                ("day", models.DateField()),
+                ("metric", models.CharField(max_length=64)),
+                ("value", models.BigIntegerField(default=0)),
+            ],
+            options={
+                "indexes": [models.Index(fields=["day", "metric"], name="daily_activity_day_idx")],
+                "constraints": [
+                    models.UniqueConstraint(fields=("metric", "day"), name="uniq_daily_activity")
+                ],
+            },
+        ),
+    ]
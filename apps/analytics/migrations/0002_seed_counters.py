@@ -0,0 +1,32 @@
+from django.db import migrations
+
+COUNTED_MODELS = {
+    "users": ("authentication", "User"),
+    "appointments": ("appointments", "Appointment"),
+    "medical_records": ("medical_records", "MedicalRecord"),
+    "reports": ("reports", "Report"),
+    "images": ("imaging", "MedicalImage"),
+}
+
+
+def seed_counters(apps, schema_editor):
+    StatCounter = apps.get_model("analytics", "StatCounter")
+    for name, (app_label, model_name) in COUNTED_MODELS.items():
+        count = apps.get_model(app_label, model_name).objects.count()
+        StatCounter.objects.update_or_create(name=name, defaults={"value": count})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("analytics", "0001_initial"),
+        ("authentication", "0002_user_mfa_fields"),
+        ("appointments", "0003_appointment_appt_patient_scheduled_idx_and_more"),
+        ("medical_records", "0002_diagnosis_diagnosis_record_created_idx_and_more"),
+        ("reports", "0002_report_report_created_id_idx_and_more"),
+        ("imaging", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.RunPython(seed_counters, migrations.RunPython.noop),
+    ]
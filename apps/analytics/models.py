@@ -0,0 +1,31 @@
+from __future__ import annotations
+
+from django.db import models
+
+
+class StatCounter(models.Model):
+    """Running row count of one table, kept current by signals and reconciled hourly."""
+
+    name = models.CharField(max_length=64, primary_key=True)
+    value = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self) -> str:
+        return f"StatCounter({self.name}={self.value})"
+
+
+class DailyActivity(models.Model):
+    """One metric's total for one day, e.g. images uploaded or processing failures."""
+
+    day = models.DateField()
+    metric = models.CharField(max_length=64)
+    value = models.BigIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["metric", "day"], name="uniq_daily_activity"),
+        ]
+        indexes = [models.Index(fields=["day", "metric"], name="daily_activity_day_idx")]
+
+    def __str__(self) -> str:
+        return f"DailyActivity({self.day} {self.metric}={self.value})"
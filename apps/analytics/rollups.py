@@ -0,0 +1,138 @@
+"""Maintained counters and daily activity totals for the admin dashboard.
+
+The dashboard and ``/ops/stats`` read a handful of pre-aggregated rows instead
+of running ``COUNT(*)`` over every clinical table on each load. Signals adjust
+the rows after each write commits. ``reconcile_statistics`` resets the
+counters and recent activity from the source tables on a beat schedule, so a missed signal (bulk
+writes, raw SQL, a crash between commit and update) is corrected within one
+interval.
+"""
+
+from __future__ import annotations
+
+from datetime import date, timedelta
+
+from django.db import transaction
+from django.db.models import Count, F, Model, QuerySet
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from apps.analytics.models import DailyActivity, StatCounter
+from apps.appointments.models import Appointment
+from apps.authentication.models import User
+from apps.imaging.models import MedicalImage
+from apps.medical_records.models import MedicalRecord
+from apps.reports.models import Report
+
+COUNTED_MODELS: dict[str, type[Model]] = {
+    "users": User,
+    "appointments": Appointment,
+    "medical_records": MedicalRecord,
+    "reports": Report,
+    "images": MedicalImage,
+}
+IMAGES_UPLOADED = "images_uploaded"
+IMAGES_PROCESSED = "images_processed"
+IMAGES_FAILED = "images_failed"
+IMAGES_ANOMALOUS = "images_anomalous"
+ACTIVITY_METRICS = (IMAGES_UPLOADED, IMAGES_PROCESSED, IMAGES_FAILED, IMAGES_ANOMALOUS)
+
+
+def _adjust_counter(name: str, delta: int) -> None:
+    rows = StatCounter.objects.filter(name=name)
+    if not rows.update(value=F("value") + delta, updated_at=timezone.now()):
+        StatCounter.objects.bulk_create([StatCounter(name=name)], ignore_conflicts=True)
+        rows.update(value=F("value") + delta, updated_at=timezone.now())
+
+
+def _add_activity(metric: str, day: date, amount: int) -> None:
+    rows = DailyActivity.objects.filter(metric=metric, day=day)
+    if not rows.update(value=F("value") + amount):
+        DailyActivity.objects.bulk_create(
+            [DailyActivity(metric=metric, day=day)], ignore_conflicts=True
+        )
+        rows.update(value=F("value") + amount)
+
+
+def adjust_counter(name: str, delta: int) -> None:
+    """Add ``delta`` to counter ``name`` once the current transaction commits."""
+    transaction.on_commit(lambda: _adjust_counter(name, delta))
+
+
+def record_activity(metric: str, amount: int = 1) -> None:
+    """Add ``amount`` to today's ``metric`` once the current transaction commits."""
+    day = timezone.localdate()
+    transaction.on_commit(lambda: _add_activity(metric, day, amount))
+
+
+def reconcile_counters() -> dict[str, int]:
+    """Reset every counter to the true row count of its table."""
+    counts = {name: model.objects.count() for name, model in COUNTED_MODELS.items()}
+    for name, value in counts.items():
+        StatCounter.objects.update_or_create(name=name, defaults={"value": value})
+    return counts
+
+
+def _daily_totals(images: QuerySet[MedicalImage], field: str, start: date) -> dict[date, int]:
+    return dict(
+        images.filter(**{f"{field}__date__gte": start})
+        .annotate(day=TruncDate(field))
+        .values("day")
+        .annotate(total=Count("id"))
+        .values_list("day", "total")
+    )
+
+
+def reconcile_activity(days: int) -> None:
+    """Rebuild the last ``days`` days of uploaded, processed and anomalous totals.
+
+    Uploads come from ``uploaded_at`` and processing from ``processed_at``.
+    Failures are not recorded on the image, so their totals are left as counted.
+    """
+    start = timezone.localdate() - timedelta(days=days - 1)
+    processed = MedicalImage.objects.filter(status=MedicalImage.Status.PROCESSED)
+    totals = {
+        IMAGES_UPLOADED: _daily_totals(MedicalImage.objects.all(), "uploaded_at", start),
+        IMAGES_PROCESSED: _daily_totals(processed, "processed_at", start),
+        IMAGES_ANOMALOUS: _daily_totals(
+            processed.filter(ai_is_anomalous=True), "processed_at", start
+        ),
+    }
+    for offset in range(days):
+        day = start + timedelta(days=offset)
+        for metric, per_day in totals.items():
+            DailyActivity.objects.update_or_create(
+                metric=metric, day=day, defaults={"value": per_day.get(day, 0)}
+            )
+
+
+def statistics_snapshot(days: int = 14) -> dict:
+    """Counters and the last ``days`` days of activity, read from the rollup tables."""
+    counters = dict.fromkeys(COUNTED_MODELS, 0)
+    counters.update(
+        StatCounter.objects.filter(name__in=COUNTED_MODELS).values_list("name", "value")
+    )
+
+    start = timezone.localdate() - timedelta(days=days - 1)
+    totals: dict[date, dict[str, int]] = {
+        start + timedelta(days=offset): dict.fromkeys(ACTIVITY_METRICS, 0) for offset in range(days)
+    }
+    for day, metric, value in DailyActivity.objects.filter(
+        day__gte=start, metric__in=ACTIVITY_METRICS
+    ).values_list("day", "metric", "value"):
+        if day in totals:
+            totals[day][metric] = value
+
+    activity = []
+    for day, metrics in sorted(totals.items(), reverse=True):
+        processed = metrics[IMAGES_PROCESSED]
+        activity.append(
+            {
+                "day": day.isoformat(),
+                **metrics,
+                "anomaly_rate": (
+                    round(metrics[IMAGES_ANOMALOUS] / processed, 4) if processed else None
+                ),
+            }
+        )
+    return {"counters": counters, "activity": activity}
@@ -0,0 +1,5 @@
+from rest_framework import serializers
+
+
+class StatisticsQuerySerializer(serializers.Serializer):
+    days = serializers.IntegerField(required=False, min_value=1, max_value=90, default=14)
@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from apps.analytics.rollups import (
+    COUNTED_MODELS,
+    IMAGES_ANOMALOUS,
+    IMAGES_FAILED,
+    IMAGES_PROCESSED,
+    IMAGES_UPLOADED,
+    adjust_counter,
+    record_activity,
+)
+from apps.imaging.models import MedicalImage
+
+_COUNTER_NAMES = {model: name for name, model in COUNTED_MODELS.items()}
+
+
+def _count_created(sender, instance, created, **kwargs):
+    if created and not kwargs.get("raw"):
+        adjust_counter(_COUNTER_NAMES[sender], 1)
+
+
+def _count_deleted(sender, instance, **kwargs):
+    adjust_counter(_COUNTER_NAMES[sender], -1)
+
+
+for _model, _name in _COUNTER_NAMES.items():
+    post_save.connect(_count_created, sender=_model, dispatch_uid=f"analytics-count-{_name}")
+    post_delete.connect(_count_deleted, sender=_model, dispatch_uid=f"analytics-uncount-{_name}")
+
+
+@receiver(post_init, sender=MedicalImage)
+def remember_loaded_image_status(sender, instance, **kwargs):
+    # Deferred status is left as None rather than loaded.
+    instance._loaded_status = instance.__dict__.get("status")
+
+
+@receiver(post_save, sender=MedicalImage)
+def record_image_activity(sender, instance, created, **kwargs):
+    previous = instance._loaded_status
+    instance._loaded_status = instance.status
+    if created:
+        record_activity(IMAGES_UPLOADED)
+    if previous == instance.status:
+        return
+    if instance.status == MedicalImage.Status.PROCESSED:
+        record_activity(IMAGES_PROCESSED)
+        if instance.ai_is_anomalous:
+            record_activity(IMAGES_ANOMALOUS)
+    elif instance.status == MedicalImage.Status.FAILED:
+        record_activity(IMAGES_FAILED)
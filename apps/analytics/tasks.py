@@ -0,0 +1,16 @@
+import logging
+
+from celery import shared_task
+from django.conf import settings
+
+from apps.analytics.rollups import reconcile_activity, reconcile_counters
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def reconcile_statistics() -> dict[str, int]:
+    counts = reconcile_counters()
+    reconcile_activity(settings.STATS_RECONCILE_DAYS)
+    logger.info("Reconciled dashboard statistics: %s", counts)
+    return counts
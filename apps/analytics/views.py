@@ -0,0 +1,19 @@
+from drf_spectacular.utils import OpenApiTypes, extend_schema
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from apps.analytics.rollups import statistics_snapshot
+from apps.analytics.serializers import StatisticsQuerySerializer
+from apps.authentication.permissions import IsAdmin
+
+
+class StatisticsView(APIView):
+    permission_classes = [IsAdmin]
+
+    @extend_schema(parameters=[StatisticsQuerySerializer], responses=OpenApiTypes.OBJECT)
+    def get(self, request):
+        query_serializer = StatisticsQuerySerializer(data=request.query_params)
+        query_serializer.is_valid(raise_exception=True)
+        snapshot = statistics_snapshot(query_serializer.validated_data["days"])
+        return Response(snapshot, status=status.HTTP_200_OK)
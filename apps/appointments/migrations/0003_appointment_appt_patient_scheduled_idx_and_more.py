@@ -0,0 +1,27 @@
+# Generated by Django 5.2.11 on 2026-10-19 12:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("appointments", "0002_initial"),
+        ("doctors", "0001_initial"),
+        ("patients", "0002_patientprofile_patient_created_id_idx"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="appointment",
+            index=models.Index(
+                fields=["patient", "scheduled_time", "id"], name="appt_patient_scheduled_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="appointment",
+            index=models.Index(
+                fields=["doctor", "scheduled_time", "id"], name="appt_doctor_scheduled_idx"
+            ),
+        ),
+    ]
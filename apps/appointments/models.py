@@ -29,6 +29,14 @@ class Appointment(models.Model):
 
     class Meta:
         ordering = ["-scheduled_time"]
+        indexes = [
+            models.Index(
+                fields=["patient", "scheduled_time", "id"], name="appt_patient_scheduled_idx"
+            ),
+            models.Index(
+                fields=["doctor", "scheduled_time", "id"], name="appt_doctor_scheduled_idx"
+            ),
+        ]
 
     def __str__(self) -> str:
         return f"Appointment({self.patient.user.email} -> {self.doctor.user.email})"
@@ -14,6 +14,8 @@ from apps.authentication.models import User
 from apps.authentication.permissions import IsDoctor, IsPatient
 from apps.doctors.models import DoctorProfile
 from apps.notifications.tasks import send_email_notification
+from curamind_core.pagination import KEYSET_PARAMETERS, KeysetPagination
+from curamind_core.values_serializers import ValuesListMixin
 
 
 def _patient_profile_or_response(user):
@@ -36,10 +38,10 @@ def _doctor_profile_or_response(user):
     )
 
 
-class AppointmentCreateView(APIView):
+class AppointmentCreateView(ValuesListMixin, APIView):
     serializer_class = AppointmentSerializer
 
-    @extend_schema(responses=AppointmentSerializer(many=True))
+    @extend_schema(parameters=KEYSET_PARAMETERS, responses=AppointmentSerializer(many=True))
     def get(self, request):
         user = request.user
         if user.role == User.Role.PATIENT:
@@ -57,12 +59,10 @@ class AppointmentCreateView(APIView):
         else:
             return Response({"detail": "Not authorized"}, status=status.HTTP_403_FORBIDDEN)
 
-        appointments = appointments.select_related("patient", "doctor").order_by("-scheduled_time")
+        paginator = KeysetPagination(ordering=("-scheduled_time", "-id"))
+        page = paginator.paginate_queryset(appointments, request, view=self)
         log_action(user, "appointment_view", request)
-        return Response(
-            AppointmentSerializer(appointments, many=True).data,
-            status=status.HTTP_200_OK,
-        )
+        return paginator.get_paginated_response(self.list_data(AppointmentSerializer, page))
 
     @extend_schema(request=AppointmentCreateSerializer, responses=AppointmentSerializer)
     def post(self, request):
@@ -6,6 +6,7 @@ from apps.audit_logs.models import AuditLog
 @admin.register(AuditLog)
 class AuditLogAdmin(admin.ModelAdmin):
     list_display = ("action", "user", "timestamp", "ip_address", "resource_id")
+    list_select_related = ("user",)
     readonly_fields = ("action", "user", "timestamp", "ip_address", "resource_id", "metadata")
 
     def has_add_permission(self, request):
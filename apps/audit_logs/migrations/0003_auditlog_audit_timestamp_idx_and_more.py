@@ -0,0 +1,33 @@
+# Generated by Django 5.2.11 on 2026-10-19 13:28
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("audit_logs", "0002_initial"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="auditlog",
+            index=models.Index(fields=["-timestamp"], name="audit_timestamp_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="auditlog",
+            index=models.Index(fields=["action", "-timestamp"], name="audit_action_time_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="auditlog",
+            index=models.Index(fields=["user", "-timestamp"], name="audit_user_time_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="auditlog",
+            index=models.Index(
+                fields=["resource_id", "-timestamp"], name="audit_resource_time_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,17 @@
+from django.db import migrations
+from django.db.models.functions import Lower
+
+
+def lowercase_actions(apps, schema_editor):
+    AuditLog = apps.get_model("audit_logs", "AuditLog")
+    AuditLog.objects.exclude(action=Lower("action")).update(action=Lower("action"))
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("audit_logs", "0003_auditlog_audit_timestamp_idx_and_more"),
+    ]
+
+    operations = [
+        migrations.RunPython(lowercase_actions, migrations.RunPython.noop),
+    ]
@@ -19,8 +19,17 @@ class AuditLog(models.Model):
 
     class Meta:
         ordering = ["-timestamp"]
+        # Audit search filters on one of these columns and shows the newest events.
+        indexes = [
+            models.Index(fields=["-timestamp"], name="audit_timestamp_idx"),
+            models.Index(fields=["action", "-timestamp"], name="audit_action_time_idx"),
+            models.Index(fields=["user", "-timestamp"], name="audit_user_time_idx"),
+            models.Index(fields=["resource_id", "-timestamp"], name="audit_resource_time_idx"),
+        ]
 
     def save(self, *args, **kwargs):
         if self.pk and AuditLog.objects.filter(pk=self.pk).exists():
             raise ValueError("Audit logs are immutable")
+        # Search lowers the requested action, so every stored action is lowercase.
+        self.action = self.action.lower()
         return super().save(*args, **kwargs)
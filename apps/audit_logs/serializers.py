@@ -1,11 +1,14 @@
 from rest_framework import serializers
 
 from apps.audit_logs.models import AuditLog
+from curamind_core.query_plans import QueryPlanMixin
 
 
-class AuditLogSerializer(serializers.ModelSerializer):
+class AuditLogSerializer(QueryPlanMixin, serializers.ModelSerializer):
     user_email = serializers.EmailField(source="user.email", read_only=True)
 
+    select_related_fields = ("user",)
+
     class Meta:
         model = AuditLog
         fields = (
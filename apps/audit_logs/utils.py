@@ -2,9 +2,11 @@ from __future__ import annotations
 
 from typing import Any
 
+from django.db.models import QuerySet
 from django.http import HttpRequest
 
 from apps.audit_logs.models import AuditLog
+from apps.authentication.models import User
 
 
 def log_action(
@@ -24,3 +26,21 @@ def log_action(
         resource_id=resource_id or "",
         metadata=metadata or {},
     )
+
+
+def filter_audit_logs(
+    logs: QuerySet[AuditLog], *, action: str = "", email: str = "", resource_id: str = ""
+) -> QuerySet[AuditLog]:
+    """Apply the audit search filters so each is served by an (column, -timestamp) index.
+
+    Actions are stored lowercase, so ``action`` matches exactly after lowering.
+    ``email`` is a case-insensitive prefix: the users it names come from the
+    ``UPPER(email)`` pattern index and the logs from ``audit_user_time_idx``.
+    """
+    if action:
+        logs = logs.filter(action=action.lower())
+    if email:
+        logs = logs.filter(user__in=User.objects.filter(email__istartswith=email))
+    if resource_id:
+        logs = logs.filter(resource_id=resource_id)
+    return logs
@@ -5,6 +5,7 @@ from rest_framework.views import APIView
 
 from apps.audit_logs.models import AuditLog
 from apps.audit_logs.serializers import AuditLogListQuerySerializer, AuditLogSerializer
+from apps.audit_logs.utils import filter_audit_logs
 from apps.authentication.permissions import IsAdmin
 
 
@@ -21,14 +22,11 @@ class AuditLogListView(APIView):
         query_serializer.is_valid(raise_exception=True)
         filters = query_serializer.validated_data
 
-        logs = AuditLog.objects.select_related("user").all()
-
-        if filters.get("action"):
-            logs = logs.filter(action__iexact=filters["action"])
-        if filters.get("email"):
-            logs = logs.filter(user__email__icontains=filters["email"])
-        if filters.get("resource_id"):
-            logs = logs.filter(resource_id=filters["resource_id"])
-
+        logs = filter_audit_logs(
+            AuditLogSerializer.setup_queryset(AuditLog.objects.all()),
+            action=filters.get("action", ""),
+            email=filters.get("email", ""),
+            resource_id=filters.get("resource_id", ""),
+        )
         logs = logs.order_by("-timestamp")[: filters["limit"]]
         return Response(AuditLogSerializer(logs, many=True).data, status=status.HTTP_200_OK)
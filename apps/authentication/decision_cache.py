@@ -0,0 +1,89 @@
+"""Shared cache of per-user authorization decisions.
+
+Decisions are stored in the Django cache (Redis in deployments), so the REST
+API, the portal and every worker process share them. A key combines the user,
+their role and the resource, and each entry records the two version counters
+current when it was computed: one for the user and one global generation. A
+lookup reads the entry and both counters in one ``get_many`` and treats an
+entry with older versions as a miss, so bumping a counter makes a revoked
+grant stop working at once instead of when its TTL expires. Cache failures
+fall back to computing the decision.
+"""
+
+from __future__ import annotations
+
+import logging
+from collections.abc import Callable
+from typing import TypeVar
+
+from django.conf import settings
+from django.core.cache import cache
+
+from curamind_core.metrics import AUTHZ_CACHE_HIT_METRIC, AUTHZ_CACHE_MISS_METRIC, increment
+
+logger = logging.getLogger(__name__)
+DECISION_KEY_PREFIX = "authz"
+_GENERATION_KEY = f"{DECISION_KEY_PREFIX}:generation"
+
+Decision = TypeVar("Decision")
+
+
+def _user_version_key(user_id) -> str:
+    return f"{DECISION_KEY_PREFIX}:version:{user_id}"
+
+
+def _decision_key(user, resource_type: str, resource_id) -> str:
+    return f"{DECISION_KEY_PREFIX}:{user.id}:{user.role}:{resource_type}:{resource_id}"
+
+
+def cached_decision(
+    user, resource_type: str, resource_id, compute: Callable[[], Decision]
+) -> Decision:
+    """Return ``compute()`` for ``user`` and the resource, cached for AUTHZ_CACHE_TTL_SECONDS.
+
+    ``compute`` must not return ``None``; use a falsy value such as ``False`` or
+    ``""`` for a denial so it can be cached as well.
+    """
+    ttl = settings.AUTHZ_CACHE_TTL_SECONDS
+    if ttl <= 0:
+        return compute()
+    key = _decision_key(user, resource_type, resource_id)
+    user_version_key = _user_version_key(user.id)
+    try:
+        # One round trip: the entry and the counters it must still match.
+        values = cache.get_many([_GENERATION_KEY, user_version_key, key])
+    except Exception:
+        logger.warning("Authorization cache lookup failed", exc_info=True)
+        return compute()
+
+    versions = (values.get(_GENERATION_KEY, 0), values.get(user_version_key, 0))
+    entry = values.get(key)
+    if entry is not None and tuple(entry[:2]) == versions:
+        increment(AUTHZ_CACHE_HIT_METRIC)
+        return entry[2]
+    increment(AUTHZ_CACHE_MISS_METRIC)
+    decision = compute()
+    try:
+        cache.set(key, (*versions, decision), timeout=ttl)
+    except Exception:
+        logger.warning("Failed to cache authorization decision", exc_info=True)
+    return decision
+
+
+def _bump(key: str) -> None:
+    try:
+        cache.add(key, 0, timeout=None)
+        cache.incr(key)
+    except Exception:
+        logger.warning("Failed to invalidate authorization decisions (%s)", key, exc_info=True)
+
+
+def invalidate_user_decisions(*user_ids) -> None:
+    """Drop the cached decisions of the given users."""
+    for user_id in user_ids:
+        _bump(_user_version_key(user_id))
+
+
+def invalidate_all_decisions() -> None:
+    """Drop every cached decision, e.g. after a bulk rebuild of the underlying data."""
+    _bump(_GENERATION_KEY)
@@ -0,0 +1,31 @@
+from django.db import migrations
+
+INDEX_NAME = "auth_user_email_prefix_idx"
+
+
+def create_email_prefix_index(apps, schema_editor):
+    # Matches the UPPER(email::text) LIKE that istartswith emits on PostgreSQL;
+    # the pattern operator class lets a non-C collation use it for prefixes.
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    table = schema_editor.quote_name(apps.get_model("authentication", "User")._meta.db_table)
+    schema_editor.execute(
+        f"CREATE INDEX IF NOT EXISTS {INDEX_NAME} ON {table} "
+        "(UPPER(email::text) text_pattern_ops)"
+    )
+
+
+def drop_email_prefix_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute(f"DROP INDEX IF EXISTS {INDEX_NAME}")
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("authentication", "0002_user_mfa_fields"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_email_prefix_index, drop_email_prefix_index),
+    ]
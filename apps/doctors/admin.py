@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from apps.doctors.models import DoctorProfile
+from apps.doctors.models import CareTeamAssignment, DoctorProfile
 
 
 @admin.register(DoctorProfile)
@@ -16,3 +16,15 @@ class DoctorProfileAdmin(admin.ModelAdmin):
     )
     list_filter = ("specialty", "department")
     list_select_related = ("user",)
+
+
+@admin.register(CareTeamAssignment)
+class CareTeamAssignmentAdmin(admin.ModelAdmin):
+    list_display = ("doctor", "patient", "created_at")
+    search_fields = ("doctor__user__email", "patient__user__email")
+    list_select_related = ("doctor__user", "patient__user")
+    readonly_fields = ("doctor", "patient", "created_at")
+
+    def has_add_permission(self, request):
+        # Assignments follow appointments and records; see apps.doctors.signals.
+        return False
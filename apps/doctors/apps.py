@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class DoctorsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.doctors"
+
+    def ready(self):
+        from apps.doctors import signals  # noqa: F401
@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+from django.db import transaction
+from django.db.models import QuerySet
+
+from apps.appointments.models import Appointment
+from apps.authentication.decision_cache import cached_decision, invalidate_user_decisions
+from apps.authentication.models import User
+from apps.doctors.models import CareTeamAssignment, DoctorProfile
+from apps.medical_records.models import MedicalRecord
+from apps.patients.models import PatientProfile
+
+# Decisions are cached on the user object, which Django loads once per request,
+# the same way ModelBackend caches permissions in ``user._perm_cache``, and in
+# the shared authorization decision cache across requests.
+_CACHE_ATTRIBUTE = "_care_team_cache"
+
+
+def _invalidate_doctor_decisions(doctor_id) -> None:
+    user_id = DoctorProfile.objects.filter(id=doctor_id).values_list("user_id", flat=True).first()
+    if user_id is not None:
+        # Bumped only once the change is visible: a request between an earlier
+        # bump and the commit would read the old assignment and cache it under
+        # the new version.
+        transaction.on_commit(lambda: invalidate_user_decisions(user_id))
+
+
+def add_assignment(doctor_id, patient_id) -> None:
+    CareTeamAssignment.objects.bulk_create(
+        [CareTeamAssignment(doctor_id=doctor_id, patient_id=patient_id)],
+        ignore_conflicts=True,
+    )
+    _invalidate_doctor_decisions(doctor_id)
+
+
+def sync_assignment(doctor_id, patient_id) -> None:
+    """Drop the assignment once no appointment or record links the pair any more."""
+    still_linked = (
+        Appointment.objects.filter(doctor_id=doctor_id, patient_id=patient_id).exists()
+        or MedicalRecord.objects.filter(doctor_id=doctor_id, patient_id=patient_id).exists()
+    )
+    if still_linked:
+        add_assignment(doctor_id, patient_id)
+    elif CareTeamAssignment.objects.filter(doctor_id=doctor_id, patient_id=patient_id).delete()[0]:
+        _invalidate_doctor_decisions(doctor_id)
+
+
+def care_team_patients(doctor_profile: DoctorProfile) -> QuerySet[PatientProfile]:
+    return PatientProfile.objects.filter(care_team_assignments__doctor=doctor_profile)
+
+
+def is_care_team_member(user, patient_id) -> bool:
+    """Whether ``user`` is a doctor assigned to the patient; cached per request and shared."""
+    if not user or not user.is_authenticated or user.role != User.Role.DOCTOR:
+        return False
+    doctor_profile = getattr(user, "doctor_profile", None)
+    if not doctor_profile:
+        return False
+
+    cache = getattr(user, _CACHE_ATTRIBUTE, None)
+    if cache is None:
+        cache = {}
+        setattr(user, _CACHE_ATTRIBUTE, cache)
+    key = str(patient_id)
+    if key not in cache:
+        cache[key] = cached_decision(
+            user,
+            "patient",
+            key,
+            lambda: CareTeamAssignment.objects.filter(
+                doctor=doctor_profile, patient_id=patient_id
+            ).exists(),
+        )
+    return cache[key]
@@ -0,0 +1,51 @@
+from django.core.management.base import BaseCommand
+
+from apps.appointments.models import Appointment
+from apps.authentication.decision_cache import invalidate_all_decisions
+from apps.doctors.models import CareTeamAssignment
+from apps.medical_records.models import MedicalRecord
+
+
+class Command(BaseCommand):
+    help = "Rebuild care-team assignments from appointments and medical records."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument(
+            "--prune",
+            action="store_true",
+            help="Also delete assignments no appointment or record supports any more.",
+        )
+
+    def handle(self, *args, **options):
+        pairs = set(Appointment.objects.values_list("doctor_id", "patient_id").distinct())
+        pairs.update(MedicalRecord.objects.values_list("doctor_id", "patient_id").distinct())
+        before = CareTeamAssignment.objects.count()
+        CareTeamAssignment.objects.bulk_create(
+            [
+                CareTeamAssignment(doctor_id=doctor_id, patient_id=patient_id)
+                for doctor_id, patient_id in pairs
+            ],
+            batch_size=options["batch_size"],
+            ignore_conflicts=True,
+        )
+        created = CareTeamAssignment.objects.count() - before
+
+        pruned = 0
+        if options["prune"]:
+            stale = [
+                assignment_id
+                for assignment_id, doctor_id, patient_id in CareTeamAssignment.objects.values_list(
+                    "id", "doctor_id", "patient_id"
+                )
+                if (doctor_id, patient_id) not in pairs
+            ]
+            pruned, _ = CareTeamAssignment.objects.filter(id__in=stale).delete()
+        if created or pruned:
+            invalidate_all_decisions()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Care team: {len(pairs)} doctor-patient pairs, {created} assignments added, "
+                f"{pruned} pruned."
+            )
+        )
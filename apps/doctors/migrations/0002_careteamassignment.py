@@ -0,0 +1,70 @@
+# Generated by Django 5.2.11 on 2026-10-19 13:11
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+def backfill_care_team(apps, schema_editor):
+    Appointment = apps.get_model("appointments", "Appointment")
+    MedicalRecord = apps.get_model("medical_records", "MedicalRecord")
+    CareTeamAssignment = apps.get_model("doctors", "CareTeamAssignment")
+    pairs = set(Appointment.objects.values_list("doctor_id", "patient_id").distinct())
+    pairs.update(MedicalRecord.objects.values_list("doctor_id", "patient_id").distinct())
+    CareTeamAssignment.objects.bulk_create(
+        [
+            CareTeamAssignment(id=uuid.uuid4(), doctor_id=doctor_id, patient_id=patient_id)
+            for doctor_id, patient_id in pairs
+        ],
+        batch_size=1000,
+        ignore_conflicts=True,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("doctors", "0001_initial"),
+        ("patients", "0002_patientprofile_patient_created_id_idx"),
+        ("appointments", "0003_appointment_appt_patient_scheduled_idx_and_more"),
+        ("medical_records", "0002_diagnosis_diagnosis_record_created_idx_and_more"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CareTeamAssignment",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4, editable=False, primary_key=True, serialize=False
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "doctor",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="care_team_assignments",
+                        to="doctors.doctorprofile",
+                    ),
+                ),
+                (
+                    "patient",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="care_team_assignments",
+                        to="patients.patientprofile",
+                    ),
+                ),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("doctor", "patient"), name="uniq_care_team_member"
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(backfill_care_team, migrations.RunPython.noop),
+    ]
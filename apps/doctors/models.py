@@ -18,3 +18,29 @@ class DoctorProfile(models.Model):
 
     def __str__(self) -> str:
         return f"DoctorProfile({self.user.email})"
+
+
+class CareTeamAssignment(models.Model):
+    """A doctor who has an appointment or medical record with a patient.
+
+    Maintained by ``apps.doctors.signals`` from appointment and record writes, so
+    access checks are a single lookup on the ``(doctor, patient)`` unique index.
+    ``manage.py backfill_care_team`` rebuilds it after bulk imports, which skip signals.
+    """
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    doctor = models.ForeignKey(
+        DoctorProfile, on_delete=models.CASCADE, related_name="care_team_assignments"
+    )
+    patient = models.ForeignKey(
+        "patients.PatientProfile", on_delete=models.CASCADE, related_name="care_team_assignments"
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["doctor", "patient"], name="uniq_care_team_member"),
+        ]
+
+    def __str__(self) -> str:
+        return f"CareTeamAssignment({self.doctor_id} -> {self.patient_id})"
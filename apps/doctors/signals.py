@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from apps.appointments.models import Appointment
+from apps.doctors.care_team import add_assignment, sync_assignment
+from apps.medical_records.models import MedicalRecord
+
+
+@receiver(post_init, sender=Appointment)
+@receiver(post_init, sender=MedicalRecord)
+def remember_loaded_care_pair(sender, instance, **kwargs):
+    # Recorded at load time so a save that moves the row can re-check the old pair
+    # without reading the row again. Deferred fields are left as None, not loaded.
+    instance._loaded_care_pair = (
+        instance.__dict__.get("doctor_id"),
+        instance.__dict__.get("patient_id"),
+    )
+
+
+@receiver(post_save, sender=Appointment)
+@receiver(post_save, sender=MedicalRecord)
+def update_care_team_on_save(sender, instance, created, **kwargs):
+    pair = (instance.doctor_id, instance.patient_id)
+    previous = instance._loaded_care_pair
+    instance._loaded_care_pair = pair
+    if not created and previous == pair:
+        return
+    add_assignment(*pair)
+    if not created and None not in previous:
+        sync_assignment(*previous)
+
+
+@receiver(post_delete, sender=Appointment)
+@receiver(post_delete, sender=MedicalRecord)
+def update_care_team_on_delete(sender, instance, **kwargs):
+    sync_assignment(instance.doctor_id, instance.patient_id)
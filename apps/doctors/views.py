@@ -1,19 +1,20 @@
-from django.db.models import Q
 from drf_spectacular.utils import extend_schema
 from rest_framework import status
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
 from apps.authentication.permissions import IsDoctor
-from apps.patients.models import PatientProfile
+from apps.doctors.care_team import care_team_patients
 from apps.patients.serializers import PatientProfileSerializer
+from curamind_core.pagination import KEYSET_PARAMETERS, KeysetPagination
+from curamind_core.values_serializers import ValuesListMixin
 
 
-class DoctorPatientsView(APIView):
+class DoctorPatientsView(ValuesListMixin, APIView):
     permission_classes = [IsDoctor]
     serializer_class = PatientProfileSerializer
 
-    @extend_schema(responses=PatientProfileSerializer(many=True))
+    @extend_schema(parameters=KEYSET_PARAMETERS, responses=PatientProfileSerializer(many=True))
     def get(self, request):
         doctor_profile = getattr(request.user, "doctor_profile", None)
         if not doctor_profile:
@@ -21,12 +22,7 @@ class DoctorPatientsView(APIView):
                 {"detail": "Doctor profile is not provisioned for this account."},
                 status=status.HTTP_403_FORBIDDEN,
             )
-        patients = (
-            PatientProfile.objects.filter(
-                Q(appointments__doctor=doctor_profile) | Q(medical_records__doctor=doctor_profile)
-            )
-            .select_related("user")
-            .distinct()
-        )
-        data = PatientProfileSerializer(patients, many=True).data
-        return Response(data, status=status.HTTP_200_OK)
+        patients = care_team_patients(doctor_profile)
+        paginator = KeysetPagination(ordering=("-created_at", "-id"))
+        page = paginator.paginate_queryset(patients, request, view=self)
+        return paginator.get_paginated_response(self.list_data(PatientProfileSerializer, page))
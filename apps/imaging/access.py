@@ -1,33 +1,44 @@
 from __future__ import annotations
 
-from apps.appointments.models import Appointment
+import uuid
+
+from apps.authentication.decision_cache import cached_decision
 from apps.authentication.models import User
+from apps.doctors.care_team import is_care_team_member
 from apps.imaging.models import MedicalImage
-from apps.medical_records.models import MedicalRecord
+
+
+def _image_decision(user, image_id: str) -> str:
+    """The id of the image's patient if ``user`` may open it, otherwise ``""``."""
+    row = MedicalImage.objects.filter(id=image_id).values_list("patient_id", "patient__user_id")
+    found = row.first()
+    if not found:
+        return ""
+    patient_id, patient_user_id = found
+    if user.role == User.Role.PATIENT:
+        allowed = patient_user_id == user.id
+    else:
+        allowed = is_care_team_member(user, patient_id)
+    return str(patient_id) if allowed else ""
 
 
 def get_authorized_image_for_user(user, image_id: str) -> MedicalImage | None:
     if not user or not user.is_authenticated:
         return None
-
-    image = MedicalImage.objects.filter(id=image_id).select_related("patient__user").first()
-    if not image:
+    try:
+        image_id = str(uuid.UUID(str(image_id)))
+    except ValueError:
         return None
 
-    if user.role == User.Role.PATIENT:
-        return image if image.patient.user == user else None
-
-    if user.role == User.Role.DOCTOR:
-        doctor_profile = getattr(user, "doctor_profile", None)
-        if not doctor_profile:
-            return None
-        is_assigned_patient = (
-            Appointment.objects.filter(doctor=doctor_profile, patient=image.patient).exists()
-            or MedicalRecord.objects.filter(doctor=doctor_profile, patient=image.patient).exists()
-        )
-        return image if is_assigned_patient else None
-
     if user.role == User.Role.RADIOLOGIST:
-        return image
+        return MedicalImage.objects.filter(id=image_id).first()
 
-    return None
+    if user.role not in (User.Role.PATIENT, User.Role.DOCTOR):
+        return None
+
+    # The cached decision names the patient the grant applies to, so a cache hit
+    # costs one primary-key lookup instead of a join plus care-team checks.
+    patient_id = cached_decision(user, "image", image_id, lambda: _image_decision(user, image_id))
+    if not patient_id:
+        return None
+    return MedicalImage.objects.filter(id=image_id, patient_id=patient_id).first()
@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from apps.imaging.models import MedicalImage
+from apps.imaging.models import MedicalImage, StoredObject
 
 
 @admin.register(MedicalImage)
@@ -17,3 +17,10 @@ class MedicalImageAdmin(admin.ModelAdmin):
     list_select_related = ("patient__user", "uploaded_by")
     autocomplete_fields = ("patient", "uploaded_by")
     readonly_fields = ("uploaded_at", "metadata")
+
+
+@admin.register(StoredObject)
+class StoredObjectAdmin(admin.ModelAdmin):
+    list_display = ("sha256", "s3_key", "size", "ref_count", "created_at", "released_at")
+    search_fields = ("sha256", "s3_key")
+    readonly_fields = ("sha256", "s3_key", "size", "ref_count", "created_at", "released_at")
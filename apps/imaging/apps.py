@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class ImagingConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.imaging"
+
+    def ready(self):
+        from apps.imaging import signals  # noqa: F401
@@ -0,0 +1,106 @@
+"""Content-addressed storage for uploaded image bytes.
+
+Identical de-identified bytes are stored once, under a key derived from their
+SHA-256, and every ``MedicalImage`` with that content points at the same key.
+``StoredObject.ref_count`` counts those images: an upload takes a reference
+under the row lock and a signal drops one when an image is deleted. A row whose
+count reaches zero is kept, stamped with ``released_at``, so an upload of the
+same bytes simply takes it back; ``collect_unreferenced`` deletes rows left
+unreferenced past a grace period together with their bytes, the model-input
+tensor and its sidecar and the previews derived from them.
+
+Images stored before content addressing keep their per-upload keys and have no
+``StoredObject``; they are never counted or deleted here.
+"""
+
+from __future__ import annotations
+
+import logging
+from datetime import timedelta
+from io import BytesIO
+
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from apps.imaging.models import StoredObject
+from apps.imaging.preprocessing import model_input_info_key, model_input_key
+from apps.imaging.previews import preview_key
+from apps.imaging.storage import S3StorageService, StorageError
+
+logger = logging.getLogger(__name__)
+
+
+def acquire_stored_object(
+    storage: S3StorageService, file_bytes: bytes, sha256: str
+) -> StoredObject:
+    """Take a reference on the stored object for ``sha256``, uploading the bytes if it is new.
+
+    Call inside the transaction that creates the referencing image: the count
+    is raised under the row lock the collector also takes, and rolls back with
+    the image if that insert fails.
+    """
+    stored = StoredObject.objects.select_for_update().filter(sha256=sha256).first()
+    if stored is None:
+        # Concurrent first uploads write the same bytes to the same key, so the
+        # loser's upload is harmless and get_or_create returns the winner's row.
+        key = storage.upload(BytesIO(file_bytes), storage.build_content_key(sha256))
+        stored, _ = StoredObject.objects.get_or_create(
+            sha256=sha256, defaults={"s3_key": key, "size": len(file_bytes)}
+        )
+    elif stored.ref_count == 0:
+        # A collector that died after deleting the bytes leaves the row behind.
+        storage.upload(BytesIO(file_bytes), stored.s3_key)
+    StoredObject.objects.filter(pk=stored.pk).update(ref_count=F("ref_count") + 1, released_at=None)
+    stored.refresh_from_db(fields=["ref_count", "released_at"])
+    return stored
+
+
+def release_reference(sha256: str, s3_key: str) -> None:
+    """Drop one reference, stamping ``released_at`` when nothing points at the bytes."""
+    with transaction.atomic():
+        stored = (
+            StoredObject.objects.select_for_update().filter(sha256=sha256, s3_key=s3_key).first()
+        )
+        if stored is None or stored.ref_count == 0:
+            return
+        updates = {"ref_count": F("ref_count") - 1}
+        if stored.ref_count == 1:
+            updates["released_at"] = timezone.now()
+        StoredObject.objects.filter(pk=stored.pk).update(**updates)
+
+
+def collect_unreferenced(grace_seconds: int, limit: int) -> int:
+    """Delete up to ``limit`` objects unreferenced for ``grace_seconds``; return how many.
+
+    Each object is deleted from storage while its row is locked and before the
+    row goes, so an upload of the same bytes either waits and re-uploads them
+    or has already taken the row back and is skipped here.
+    """
+    cutoff = timezone.now() - timedelta(seconds=grace_seconds)
+    unreferenced = StoredObject.objects.filter(ref_count=0, released_at__lt=cutoff)
+    candidates = list(unreferenced.order_by("released_at").values_list("sha256", flat=True)[:limit])
+    storage = S3StorageService()
+    collected = 0
+    for sha256 in candidates:
+        with transaction.atomic():
+            stored = unreferenced.select_for_update(skip_locked=True).filter(sha256=sha256).first()
+            if stored is None:
+                continue
+            try:
+                _delete_stored_bytes(storage, stored)
+            except StorageError:
+                logger.exception("Failed to delete unreferenced stored object %s", stored.s3_key)
+                continue
+            stored.delete()
+        collected += 1
+    return collected
+
+
+def _delete_stored_bytes(storage: S3StorageService, stored: StoredObject) -> None:
+    # Derived objects first: if the source delete fails the row stays and the
+    # next run retries all of them.
+    storage.delete(model_input_key(stored.sha256))
+    storage.delete(model_input_info_key(stored.sha256))
+    storage.delete_prefix(preview_key(stored.s3_key, ""))
+    storage.delete(stored.s3_key)
@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand
+
+from apps.imaging.models import PROMOTED_METADATA_KEYS, MedicalImage, promoted_columns
+
+PROMOTED_FIELDS = list(PROMOTED_METADATA_KEYS.values())
+
+
+class Command(BaseCommand):
+    help = "Copy promoted metadata keys (hashes, AI results) into their MedicalImage columns."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Report how many images would change without writing them.",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        images = MedicalImage.objects.only("id", "metadata", *PROMOTED_FIELDS).order_by("id")
+        scanned = updated = 0
+        last_id = None
+        while True:
+            batch = list((images.filter(id__gt=last_id) if last_id else images)[:batch_size])
+            if not batch:
+                break
+            last_id = batch[-1].id
+            scanned += len(batch)
+            changed = []
+            for image in batch:
+                columns = promoted_columns(image.metadata or {})
+                if any(getattr(image, field) != value for field, value in columns.items()):
+                    for field, value in columns.items():
+                        setattr(image, field, value)
+                    changed.append(image)
+            updated += len(changed)
+            if changed and not options["dry_run"]:
+                # bulk_update skips save signals, so the dashboard rollups are untouched.
+                MedicalImage.objects.bulk_update(changed, PROMOTED_FIELDS)
+
+        action = "would update" if options["dry_run"] else "updated"
+        self.stdout.write(
+            self.style.SUCCESS(f"Image columns: scanned {scanned} images, {action} {updated}.")
+        )
@@ -0,0 +1,51 @@
+# Generated by Django 5.2.11 on 2026-10-19 13:40
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("imaging", "0001_initial"),
+        ("patients", "0002_patientprofile_patient_created_id_idx"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="medicalimage",
+            name="ai_anomaly_probability",
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="medicalimage",
+            name="ai_is_anomalous",
+            field=models.BooleanField(blank=True, db_index=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="medicalimage",
+            name="ai_model_version",
+            field=models.CharField(blank=True, db_index=True, max_length=128),
+        ),
+        migrations.AddField(
+            model_name="medicalimage",
+            name="processed_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="medicalimage",
+            name="stored_sha256",
+            field=models.CharField(blank=True, db_index=True, max_length=64),
+        ),
+        migrations.AddIndex(
+            model_name="medicalimage",
+            index=models.Index(
+                fields=["patient", "uploaded_at"], name="image_patient_uploaded_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="medicalimage",
+            index=models.Index(fields=["status", "uploaded_at"], name="image_status_uploaded_idx"),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.11 on 2026-10-19 13:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("imaging", "0002_promote_metadata_columns"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="StoredObject",
+            fields=[
+                ("sha256", models.CharField(max_length=64, primary_key=True, serialize=False)),
+                ("s3_key", models.CharField(max_length=512, unique=True)),
+                ("size", models.PositiveBigIntegerField()),
+                ("ref_count", models.PositiveIntegerField(default=0)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.11 on 2026-10-19 13:50
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("imaging", "0003_stored_object"),
+        ("patients", "0002_patientprofile_patient_created_id_idx"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="medicalimage",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddIndex(
+            model_name="medicalimage",
+            index=models.Index(fields=["status", "updated_at"], name="image_status_updated_idx"),
+        ),
+    ]
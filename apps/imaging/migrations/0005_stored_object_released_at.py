@@ -0,0 +1,18 @@
+# Generated by Django 5.2.11 on 2026-10-19 14:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("imaging", "0004_image_updated_at"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="storedobject",
+            name="released_at",
+            field=models.DateTimeField(blank=True, db_index=True, null=True),
+        ),
+    ]
@@ -4,10 +4,55 @@ import uuid
 
 from django.db import models
 from django.urls import reverse
+from django.utils.dateparse import parse_datetime
 
 from apps.authentication.models import User
 from apps.patients.models import PatientProfile
 
+# metadata key -> MedicalImage column it is promoted to.
+PROMOTED_METADATA_KEYS = {
+    "stored_sha256": "stored_sha256",
+    "ai_model_version": "ai_model_version",
+    "ai_anomaly_probability": "ai_anomaly_probability",
+    "ai_is_anomalous": "ai_is_anomalous",
+    "inference_completed_at": "processed_at",
+}
+
+
+def promoted_columns(metadata: dict) -> dict:
+    """Column values for the promoted keys present in ``metadata``."""
+    columns = {}
+    for key, field in PROMOTED_METADATA_KEYS.items():
+        if key not in metadata:
+            continue
+        value = metadata[key]
+        if field == "processed_at":
+            value = parse_datetime(value) if isinstance(value, str) else None
+        elif field == "ai_anomaly_probability":
+            value = float(value) if isinstance(value, (int, float)) else None
+        elif field == "ai_is_anomalous":
+            value = value if isinstance(value, bool) else None
+        else:
+            value = value if isinstance(value, str) else ""
+        columns[field] = value
+    return columns
+
+
+class StoredObject(models.Model):
+    """One stored copy of de-identified image bytes, shared by every image with that content."""
+
+    sha256 = models.CharField(max_length=64, primary_key=True)
+    s3_key = models.CharField(max_length=512, unique=True)
+    size = models.PositiveBigIntegerField()
+    # Number of MedicalImage rows whose s3_key is this object.
+    ref_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    # When ref_count last dropped to zero; cleared when it is referenced again.
+    released_at = models.DateTimeField(null=True, blank=True, db_index=True)
+
+    def __str__(self) -> str:
+        return f"StoredObject({self.sha256[:12]}, refs={self.ref_count})"
+
 
 class MedicalImage(models.Model):
     class Status(models.TextChoices):
@@ -27,8 +72,23 @@ class MedicalImage(models.Model):
     content_type = models.CharField(max_length=128)
     file_size = models.PositiveIntegerField()
     metadata = models.JSONField(default=dict, blank=True)
+    # Copied out of ``metadata`` by the pipeline so they can be filtered and
+    # indexed; the metadata keys of the same name are kept for API clients.
+    stored_sha256 = models.CharField(max_length=64, blank=True, db_index=True)
+    ai_model_version = models.CharField(max_length=128, blank=True, db_index=True)
+    ai_anomaly_probability = models.FloatField(null=True, blank=True)
+    ai_is_anomalous = models.BooleanField(null=True, blank=True, db_index=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
     status = models.CharField(max_length=16, choices=Status.choices, default=Status.UPLOADED)
     uploaded_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["patient", "uploaded_at"], name="image_patient_uploaded_idx"),
+            models.Index(fields=["status", "uploaded_at"], name="image_status_uploaded_idx"),
+            models.Index(fields=["status", "updated_at"], name="image_status_updated_idx"),
+        ]
 
     def __str__(self) -> str:
         return f"MedicalImage({self.file_name})"
@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import json
+import os
+from io import BytesIO
+
+import numpy as np
+from PIL import Image
+
+from apps.imaging.models import MedicalImage
+from apps.imaging.previews import decode_source_frames
+from apps.imaging.storage import S3StorageService
+
+# Must match MODEL_INPUT_SIZE in the AI service, which rejects other shapes.
+MODEL_INPUT_SIZE = 224
+MODEL_INPUT_MAX_FRAMES = max(0, int(os.getenv("IMAGE_MODEL_INPUT_MAX_FRAMES", "256")))
+MODEL_INPUT_CONTENT_TYPE = "application/x-npy"
+_IMAGENET_MEAN = np.array([0.485, 0.456, 0.406], dtype=np.float32)
+_IMAGENET_STD = np.array([0.229, 0.224, 0.225], dtype=np.float32)
+
+
+def model_input_key(stored_sha256: str) -> str:
+    return f"preprocessed/{stored_sha256}-{MODEL_INPUT_SIZE}.npy"
+
+
+def model_input_info_key(stored_sha256: str) -> str:
+    # Sidecar holding the source frame count, which the sampled tensor cannot carry.
+    return f"preprocessed/{stored_sha256}-{MODEL_INPUT_SIZE}.json"
+
+
+def build_model_input(image_bytes: bytes) -> tuple[np.ndarray, int]:
+    """Return a ``(frames, 3, size, size)`` float16 tensor and the source frame count.
+
+    Mirrors the AI service transform (bilinear resize, ImageNet normalization)
+    so scores match whether the service decodes the original or this array.
+    """
+    frames, frame_count = decode_source_frames(
+        image_bytes,
+        max_frames=MODEL_INPUT_MAX_FRAMES,
+        # The AI service does not invert MONOCHROME1 pixels; keep its view of the data.
+        invert_monochrome1=False,
+    )
+    tensor = np.empty((len(frames), 3, MODEL_INPUT_SIZE, MODEL_INPUT_SIZE), dtype=np.float16)
+    for slot, frame in enumerate(frames):
+        resized = frame.convert("RGB").resize(
+            (MODEL_INPUT_SIZE, MODEL_INPUT_SIZE),
+            Image.Resampling.BILINEAR,
+        )
+        pixels = np.asarray(resized, dtype=np.float32) / 255.0
+        tensor[slot] = ((pixels - _IMAGENET_MEAN) / _IMAGENET_STD).transpose(2, 0, 1)
+    return tensor, frame_count
+
+
+def encode_model_input(tensor: np.ndarray) -> bytes:
+    buffer = BytesIO()
+    np.save(buffer, tensor, allow_pickle=False)
+    return buffer.getvalue()
+
+
+def ensure_model_input(image: MedicalImage, storage: S3StorageService) -> dict:
+    """Store the model-ready tensor for ``image`` unless one already exists.
+
+    Tensors are keyed by the stored SHA-256, so duplicate uploads, retries and
+    re-scoring reuse one array instead of decoding the original again.
+    """
+    if not image.stored_sha256:
+        raise ValueError("Image has no stored_sha256 to key the model input on.")
+    key = model_input_key(image.stored_sha256)
+    info_key = model_input_info_key(image.stored_sha256)
+    # The sidecar is written after the tensor, so it marks a complete entry;
+    # tensors stored before it existed are rebuilt once.
+    if storage.exists(info_key):
+        info = json.loads(storage.download(info_key))
+        return {
+            "model_input_key": key,
+            "model_input_cached": True,
+            "model_input_frame_count": info["frame_count"],
+            "model_input_shape": info["shape"],
+        }
+    tensor, frame_count = build_model_input(storage.download(image.s3_key))
+    storage.upload(BytesIO(encode_model_input(tensor)), key, content_type=MODEL_INPUT_CONTENT_TYPE)
+    info = {"frame_count": frame_count, "shape": list(tensor.shape)}
+    storage.upload(
+        BytesIO(json.dumps(info).encode("utf-8")), info_key, content_type="application/json"
+    )
+    return {
+        "model_input_key": key,
+        "model_input_cached": False,
+        "model_input_frame_count": frame_count,
+        "model_input_shape": info["shape"],
+    }
@@ -0,0 +1,238 @@
+from __future__ import annotations
+
+import hashlib
+import math
+import os
+from collections.abc import Callable, Iterator
+from io import BytesIO
+
+import numpy as np
+import pydicom
+from django.http import HttpRequest, HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from PIL import Image, ImageOps
+
+from apps.imaging.models import MedicalImage
+from apps.imaging.storage import S3StorageService
+from backend.ai_service_fastapi.utils import dicom_display_options, normalize_to_uint8
+
+PREVIEW_SIZES = tuple(
+    sorted(
+        {
+            int(size)
+            for size in os.getenv("IMAGE_PREVIEW_SIZES", "128,256,512").split(",")
+            if size.strip()
+        }
+    )
+)
+PREVIEW_FORMAT = os.getenv("IMAGE_PREVIEW_FORMAT", "webp").lower()
+PREVIEW_QUALITY = int(os.getenv("IMAGE_PREVIEW_QUALITY", "80"))
+PREVIEW_TILE_SIZE = int(os.getenv("IMAGE_PREVIEW_TILE_SIZE", "256"))
+PREVIEW_TILE_MIN_PX = int(os.getenv("IMAGE_PREVIEW_TILE_MIN_PX", "4096"))
+PREVIEW_CACHE_MAX_AGE = 365 * 24 * 60 * 60
+
+_FORMATS = {
+    "webp": ("WEBP", "image/webp", "webp"),
+    "jpeg": ("JPEG", "image/jpeg", "jpg"),
+}
+
+
+def _output_format() -> tuple[str, str, str]:
+    return _FORMATS.get(PREVIEW_FORMAT, _FORMATS["jpeg"])
+
+
+def sample_frame_indices(frame_count: int, max_frames: int | None) -> list[int]:
+    if not max_frames or frame_count <= max_frames:
+        return list(range(frame_count))
+    return sorted({int(index) for index in np.linspace(0, frame_count - 1, max_frames)})
+
+
+def _decode_dicom_frames(
+    image_bytes: bytes,
+    frame_indices: Callable[[int], list[int]],
+    invert_monochrome1: bool,
+) -> tuple[list[Image.Image], int]:
+    dataset = pydicom.dcmread(BytesIO(image_bytes))
+    pixels = dataset.pixel_array
+    samples_per_pixel = int(getattr(dataset, "SamplesPerPixel", 1) or 1)
+    frame_count = int(getattr(dataset, "NumberOfFrames", 1) or 1)
+    if frame_count <= 1 or pixels.ndim != (4 if samples_per_pixel > 1 else 3):
+        pixels = pixels[np.newaxis]
+        frame_count = 1
+    display_options = dicom_display_options(dataset)
+    invert = invert_monochrome1 and dataset.get("PhotometricInterpretation") == "MONOCHROME1"
+    frames = []
+    # Frames are normalized one at a time so a volume never needs a float copy.
+    for index in frame_indices(frame_count):
+        frame = normalize_to_uint8(pixels[index], **display_options)
+        if invert:
+            frame = 255 - frame
+        frames.append(Image.fromarray(frame, mode="RGB" if frame.ndim == 3 else "L"))
+    return frames, frame_count
+
+
+def _decode_raster(image_bytes: bytes) -> Image.Image:
+    image = Image.open(BytesIO(image_bytes))
+    image = ImageOps.exif_transpose(image) or image
+    if image.mode in ("I", "I;16", "I;16B", "F"):
+        return Image.fromarray(normalize_to_uint8(np.asarray(image)), mode="L")
+    return image.convert("RGB" if image.mode not in ("L", "RGB") else image.mode)
+
+
+def decode_source_frames(
+    image_bytes: bytes,
+    *,
+    max_frames: int | None = None,
+    invert_monochrome1: bool = True,
+) -> tuple[list[Image.Image], int]:
+    """Decode a stored upload into 8-bit PIL frames plus the source frame count.
+
+    Multi-frame DICOM volumes are sampled evenly down to ``max_frames`` before
+    any frame is normalized.
+    """
+    if image_bytes[128:132] == b"DICM":
+        return _decode_dicom_frames(
+            image_bytes,
+            lambda frame_count: sample_frame_indices(frame_count, max_frames),
+            invert_monochrome1,
+        )
+    return [_decode_raster(image_bytes)], 1
+
+
+def decode_preview_source(image_bytes: bytes) -> Image.Image:
+    """Decode a stored upload (DICOM or raster) into an 8-bit PIL image."""
+    if image_bytes[128:132] == b"DICM":
+        # The middle slice is the most representative thumbnail for a volume.
+        frames, _frame_count = _decode_dicom_frames(
+            image_bytes,
+            lambda frame_count: [frame_count // 2],
+            invert_monochrome1=True,
+        )
+        return frames[0]
+    return _decode_raster(image_bytes)
+
+
+def _encode(image: Image.Image) -> bytes:
+    pil_format = _output_format()[0]
+    buffer = BytesIO()
+    image.save(buffer, format=pil_format, quality=PREVIEW_QUALITY)
+    return buffer.getvalue()
+
+
+def render_previews(image: Image.Image) -> dict[int, bytes]:
+    """Render one encoded preview per configured size, largest first.
+
+    Each size is downscaled from the previous one rather than from the
+    original, so a large source is only resampled once at full resolution.
+    """
+    rendered: dict[int, bytes] = {}
+    current = image
+    for size in sorted(PREVIEW_SIZES, reverse=True):
+        current = current.copy()
+        current.thumbnail((size, size), Image.Resampling.LANCZOS)
+        rendered[size] = _encode(current)
+    return rendered
+
+
+def tile_pyramid_levels(width: int, height: int) -> int:
+    return max(0, math.ceil(math.log2(max(width, height) / PREVIEW_TILE_SIZE))) + 1
+
+
+def iter_tile_pyramid(image: Image.Image) -> Iterator[tuple[int, int, int, bytes]]:
+    """Yield ``(level, column, row, tile_bytes)`` from full resolution downward.
+
+    The top level is the original resolution and level 0 fits in one tile;
+    each level is produced by halving the one above it.
+    """
+    level = tile_pyramid_levels(*image.size) - 1
+    current = image
+    while level >= 0:
+        width, height = current.size
+        for row in range(math.ceil(height / PREVIEW_TILE_SIZE)):
+            for column in range(math.ceil(width / PREVIEW_TILE_SIZE)):
+                left = column * PREVIEW_TILE_SIZE
+                top = row * PREVIEW_TILE_SIZE
+                tile = current.crop(
+                    (
+                        left,
+                        top,
+                        min(left + PREVIEW_TILE_SIZE, width),
+                        min(top + PREVIEW_TILE_SIZE, height),
+                    )
+                )
+                yield level, column, row, _encode(tile)
+        if level:
+            current = current.reduce(2)
+        level -= 1
+
+
+def preview_key(source_key: str, name: str) -> str:
+    return f"{source_key}.previews/{name}"
+
+
+def tile_key(source_key: str, level: int, column: int, row: int, extension: str) -> str:
+    return preview_key(source_key, f"tiles/{level}/{column}_{row}.{extension}")
+
+
+def generate_image_previews(image: MedicalImage, storage: S3StorageService) -> dict:
+    """Render and store previews for ``image``; return the metadata to persist."""
+    source = decode_preview_source(storage.download(image.s3_key))
+    _pil_format, content_type, extension = _output_format()
+    sizes = {}
+    for size, data in render_previews(source).items():
+        key = preview_key(image.s3_key, f"{size}.{extension}")
+        storage.upload(BytesIO(data), key, content_type=content_type)
+        sizes[str(size)] = {"key": key, "etag": hashlib.sha256(data).hexdigest()[:32]}
+
+    metadata: dict = {
+        "content_type": content_type,
+        "width": source.width,
+        "height": source.height,
+        "sizes": dict(sorted(sizes.items(), key=lambda item: int(item[0]))),
+    }
+    if max(source.size) >= PREVIEW_TILE_MIN_PX:
+        for level, column, row, data in iter_tile_pyramid(source):
+            storage.upload(
+                BytesIO(data),
+                tile_key(image.s3_key, level, column, row, extension),
+                content_type=content_type,
+            )
+        source_sha256 = (
+            image.stored_sha256 or hashlib.sha256(image.s3_key.encode("utf-8")).hexdigest()
+        )
+        metadata["tiles"] = {
+            "levels": tile_pyramid_levels(*source.size),
+            "tile_size": PREVIEW_TILE_SIZE,
+            "extension": extension,
+            "etag_prefix": f"{source_sha256[:24]}-{extension}-{PREVIEW_TILE_SIZE}",
+        }
+    return metadata
+
+
+def available_preview_sizes(image: MedicalImage) -> list[int]:
+    previews = (image.metadata or {}).get("previews") or {}
+    return [int(size) for size in previews.get("sizes", {})]
+
+
+def build_preview_response(
+    request: HttpRequest,
+    *,
+    key: str,
+    etag: str,
+    content_type: str,
+    storage: S3StorageService | None = None,
+) -> HttpResponse:
+    """Serve a stored preview with an ETag and immutable private caching.
+
+    A matching ``If-None-Match`` short-circuits to 304 before storage is read.
+    """
+    quoted_etag = f'"{etag}"'
+    response = get_conditional_response(request, etag=quoted_etag)
+    if response is None:
+        response = HttpResponse(
+            (storage or S3StorageService()).download(key),
+            content_type=content_type,
+        )
+    response["ETag"] = quoted_etag
+    patch_cache_control(response, private=True, max_age=PREVIEW_CACHE_MAX_AGE, immutable=True)
+    return response
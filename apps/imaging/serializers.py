@@ -2,6 +2,7 @@ from django.urls import reverse
 from rest_framework import serializers
 
 from apps.imaging.models import MedicalImage
+from apps.imaging.previews import available_preview_sizes
 
 
 class ImageUploadRequestSerializer(serializers.Serializer):
@@ -11,6 +12,7 @@ class ImageUploadRequestSerializer(serializers.Serializer):
 
 class MedicalImageSerializer(serializers.ModelSerializer):
     download_url = serializers.SerializerMethodField()
+    preview_urls = serializers.SerializerMethodField()
 
     class Meta:
         model = MedicalImage
@@ -26,12 +28,23 @@ class MedicalImageSerializer(serializers.ModelSerializer):
             "status",
             "uploaded_at",
             "download_url",
+            "preview_urls",
         )
-        read_only_fields = ("id", "uploaded_at", "status", "download_url")
+        read_only_fields = ("id", "uploaded_at", "status", "download_url", "preview_urls")
 
-    def get_download_url(self, obj: MedicalImage) -> str:
-        path = reverse("image-download", kwargs={"image_id": obj.id})
+    def _absolute_url(self, path: str) -> str:
         request = self.context.get("request")
         if request is None:
             return path
         return request.build_absolute_uri(path)
+
+    def get_download_url(self, obj: MedicalImage) -> str:
+        return self._absolute_url(reverse("image-download", kwargs={"image_id": obj.id}))
+
+    def get_preview_urls(self, obj: MedicalImage) -> dict[str, str]:
+        return {
+            str(size): self._absolute_url(
+                reverse("image-preview", kwargs={"image_id": obj.id, "size": size})
+            )
+            for size in available_preview_sizes(obj)
+        }
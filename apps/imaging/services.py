@@ -3,18 +3,19 @@ from __future__ import annotations
 import hashlib
 import logging
 import os
-from io import BytesIO
 
 from django.conf import settings
 from django.core.files.uploadedfile import UploadedFile
+from django.db import transaction
 from django.http import HttpRequest
 
 from apps.ai_engine.mongo import store_image_metadata, store_processing_log
 from apps.audit_logs.utils import log_action
 from apps.authentication.models import User
+from apps.imaging.content_store import acquire_stored_object
 from apps.imaging.models import MedicalImage
 from apps.imaging.storage import S3StorageService, StorageError
-from apps.imaging.tasks import queue_image_processing
+from apps.imaging.tasks import queue_image_processing, reuse_prior_result
 from apps.imaging.utils import (
     deidentify_dicom_bytes,
     is_dicom_upload,
@@ -40,6 +41,7 @@ def handle_image_upload(
     file_bytes = upload.read()
     metadata: dict[str, str] = {
         "upload_sha256": hashlib.sha256(file_bytes).hexdigest(),
+        "original_file_name": upload.name,
         "original_content_type": upload.content_type or "application/octet-stream",
     }
     resolved_modality = modality
@@ -53,25 +55,25 @@ def handle_image_upload(
     metadata["stored_sha256"] = hashlib.sha256(file_bytes).hexdigest()
 
     storage = S3StorageService()
-    key = storage.build_key(upload.name)
     try:
-        stored_key = storage.upload(BytesIO(file_bytes), key)
+        with transaction.atomic():
+            stored = acquire_stored_object(storage, file_bytes, metadata["stored_sha256"])
+            image = MedicalImage.objects.create(
+                patient=patient_profile,
+                uploaded_by=user,
+                file_name=upload.name,
+                s3_key=stored.s3_key,
+                modality=resolved_modality,
+                content_type=upload.content_type or "application/octet-stream",
+                file_size=upload.size,
+                metadata=metadata,
+                stored_sha256=metadata["stored_sha256"],
+                status=MedicalImage.Status.UPLOADED,
+            )
     except StorageError as exc:
         logger.exception("Failed to store image %s", upload.name)
         raise ValueError("Unable to store the uploaded image right now.") from exc
 
-    image = MedicalImage.objects.create(
-        patient=patient_profile,
-        uploaded_by=user,
-        file_name=upload.name,
-        s3_key=stored_key,
-        modality=resolved_modality,
-        content_type=upload.content_type or "application/octet-stream",
-        file_size=upload.size,
-        metadata=metadata,
-        status=MedicalImage.Status.UPLOADED,
-    )
-
     try:
         store_processing_log(
             str(image.id),
@@ -104,7 +106,8 @@ def handle_image_upload(
         except Exception:
             logger.exception("Failed to store metadata for image %s", image.id)
 
-    if not settings.CELERY_TASK_ALWAYS_EAGER:
+    # A duplicate upload already scored by the current model needs no processing.
+    if not reuse_prior_result(image) and not settings.CELERY_TASK_ALWAYS_EAGER:
         try:
             queue_image_processing(str(image.id))
         except Exception:
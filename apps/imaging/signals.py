@@ -0,0 +1,14 @@
+from __future__ import annotations
+
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+
+from apps.imaging.content_store import release_reference
+from apps.imaging.models import MedicalImage
+
+
+# References are taken by acquire_stored_object under the StoredObject row lock.
+@receiver(post_delete, sender=MedicalImage)
+def release_stored_object(sender, instance, **kwargs):
+    if instance.stored_sha256:
+        release_reference(instance.stored_sha256, instance.s3_key)
@@ -38,15 +38,23 @@ class S3StorageService:
         safe_name = Path(filename).name.replace(" ", "_")
         return f"medical-images/{uuid.uuid4()}-{safe_name}"
 
-    def upload(self, file_obj, key: str) -> str:
+    def build_content_key(self, sha256: str) -> str:
+        # Bytes only: uploads of the same content under other names or types share
+        # the object, and each image keeps its own name and type in its metadata.
+        return f"medical-images/sha256/{sha256}"
+
+    def upload(self, file_obj, key: str, content_type: str | None = None) -> str:
         if self.use_s3:
+            extra_args = {"ServerSideEncryption": "AES256"}
+            if content_type:
+                extra_args["ContentType"] = content_type
             try:
                 file_obj.seek(0)
                 self.client.upload_fileobj(
                     file_obj,
                     self.bucket,
                     key,
-                    ExtraArgs={"ServerSideEncryption": "AES256"},
+                    ExtraArgs=extra_args,
                 )
                 return key
             except (BotoCoreError, ClientError) as exc:
@@ -71,6 +79,52 @@ class S3StorageService:
         target = self.local_path(key)
         return target.read_bytes()
 
+    def exists(self, key: str) -> bool:
+        if self.use_s3:
+            try:
+                self.client.head_object(Bucket=self.bucket, Key=key)
+                return True
+            except ClientError as exc:
+                if exc.response.get("Error", {}).get("Code") in {"404", "NoSuchKey", "NotFound"}:
+                    return False
+                raise StorageError(str(exc)) from exc
+            except BotoCoreError as exc:
+                raise StorageError(str(exc)) from exc
+        return self.local_path(key).exists()
+
+    def delete(self, key: str) -> None:
+        if self.use_s3:
+            try:
+                self.client.delete_object(Bucket=self.bucket, Key=key)
+            except (BotoCoreError, ClientError) as exc:
+                raise StorageError(str(exc)) from exc
+            return
+        self.local_path(key).unlink(missing_ok=True)
+
+    def delete_prefix(self, prefix: str) -> int:
+        if self.use_s3:
+            deleted = 0
+            try:
+                paginator = self.client.get_paginator("list_objects_v2")
+                for page in paginator.paginate(Bucket=self.bucket, Prefix=prefix):
+                    objects = [{"Key": item["Key"]} for item in page.get("Contents", [])]
+                    if objects:
+                        self.client.delete_objects(
+                            Bucket=self.bucket, Delete={"Objects": objects, "Quiet": True}
+                        )
+                        deleted += len(objects)
+            except (BotoCoreError, ClientError) as exc:
+                raise StorageError(str(exc)) from exc
+            return deleted
+        paths = [
+            path
+            for path in self.local_root.iterdir()
+            if path.name.startswith(prefix.replace("/", "_"))
+        ]
+        for path in paths:
+            path.unlink(missing_ok=True)
+        return len(paths)
+
     def presigned_url(self, key: str, expires: int = 3600) -> str:
         if not self.use_s3:
             return f"{settings.MEDIA_URL}uploads/{key.replace('/', '_')}"
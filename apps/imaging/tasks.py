@@ -1,20 +1,46 @@
 import logging
 import os
 import time
+import uuid
+
+from datetime import timedelta
+from functools import partial
 
 from celery import chain, shared_task
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
 from django.utils import timezone
 
-from apps.ai_engine.mongo import store_processing_log
+from apps.ai_engine.mongo import get_ai_result_by_image, store_ai_result, store_processing_log
 from apps.ai_engine.service import AIServiceRequestError, request_inference
-from apps.imaging.models import MedicalImage
+from apps.imaging.content_store import collect_unreferenced
+from apps.imaging.models import MedicalImage, promoted_columns
+from apps.imaging.preprocessing import MODEL_INPUT_CONTENT_TYPE, ensure_model_input
+from apps.imaging.previews import generate_image_previews
 from apps.imaging.storage import S3StorageService, StorageError
+from apps.reports.work_queue import raise_ai_priority
+from curamind_core.metrics import (
+    IMAGE_DUPLICATE_SUPPRESSED_METRIC,
+    IMAGE_STAGE_SKIPPED_METRIC,
+    IMAGE_SWEEP_ABANDONED_METRIC,
+    IMAGE_SWEEP_REQUEUED_METRIC,
+    IMAGE_SWEEP_RUNS_METRIC,
+    increment,
+)
 
 logger = logging.getLogger(__name__)
 IMAGE_PROCESSING_MAX_ATTEMPTS = max(1, int(os.getenv("IMAGE_PROCESSING_MAX_ATTEMPTS", "3")))
 IMAGE_PROCESSING_RETRY_BACKOFF_SECONDS = float(
     os.getenv("IMAGE_PROCESSING_RETRY_BACKOFF_SECONDS", "2")
 )
+# Metadata from preprocessing, previews and inference that depends only on the
+# stored bytes (and, for ai_* keys, the model version).
+REUSABLE_METADATA_KEYS = ("model_input_key", "model_input_frame_count", "previews", "image_sha256")
+IMAGE_PROCESSING_QUEUES = {
+    "urgent": "imaging-interactive",
+    "bulk": "imaging-bulk",
+}
 
 
 def _log_processing_event(
@@ -36,14 +62,115 @@ def _update_image_metadata(
     metadata_updates: dict | None = None,
     metadata_remove_keys: list[str] | None = None,
 ) -> None:
-    image.metadata = {**image.metadata, **(metadata_updates or {})}
-    for key in metadata_remove_keys or []:
-        image.metadata.pop(key, None)
-    update_fields = ["metadata"]
-    if status is not None:
-        image.status = status
-        update_fields.append("status")
-    image.save(update_fields=update_fields)
+    with transaction.atomic():
+        # Merge into the stored metadata under a row lock rather than the copy
+        # loaded with ``image``, so a concurrent stage's keys are not overwritten.
+        stored_metadata = (
+            MedicalImage.objects.select_for_update()
+            .values_list("metadata", flat=True)
+            .get(pk=image.pk)
+        )
+        image.metadata = {**(stored_metadata or {}), **(metadata_updates or {})}
+        for key in metadata_remove_keys or []:
+            image.metadata.pop(key, None)
+        update_fields = ["metadata", "updated_at"]
+        for field, value in promoted_columns(metadata_updates or {}).items():
+            setattr(image, field, value)
+            update_fields.append(field)
+        if status is not None:
+            image.status = status
+            update_fields.append("status")
+        image.save(update_fields=update_fields)
+
+
+def _lease_key(image_id: str, stored_sha256: str) -> str:
+    return f"imaging-lease:{image_id}:{stored_sha256}"
+
+
+def acquire_processing_lease(image_id: str, stored_sha256: str) -> dict[str, str] | None:
+    """Take the image's processing lease; None if another chain holds it.
+
+    The lease lives in the shared cache, so it covers every web and worker
+    process. It is passed down the chain, renewed as each stage starts and
+    released by the last stage, an early exit or the chain's ``link_error``.
+    If a chain dies it expires after ``IMAGE_PROCESSING_LEASE_SECONDS``. If
+    the cache is unreachable the chain runs anyway, because the stage checks
+    still prevent repeated work.
+    """
+    lease = {"key": _lease_key(image_id, stored_sha256), "token": uuid.uuid4().hex}
+    try:
+        added = cache.add(
+            lease["key"], lease["token"], timeout=settings.IMAGE_PROCESSING_LEASE_SECONDS
+        )
+    except Exception:
+        logger.warning("Processing lease unavailable for image %s", image_id, exc_info=True)
+        return lease
+    return lease if added else None
+
+
+def _renew_lease(lease: dict[str, str] | None) -> bool:
+    """Extend ``lease`` as a stage starts; False if another chain now holds the image."""
+    if lease is None:
+        return True
+    try:
+        holder = cache.get(lease["key"])
+        if holder == lease["token"]:
+            cache.touch(lease["key"], settings.IMAGE_PROCESSING_LEASE_SECONDS)
+            return True
+        if holder is None:
+            return bool(
+                cache.add(
+                    lease["key"], lease["token"], timeout=settings.IMAGE_PROCESSING_LEASE_SECONDS
+                )
+            )
+        return False
+    except Exception:
+        logger.warning("Failed to renew processing lease %s", lease["key"], exc_info=True)
+        return True
+
+
+def release_processing_lease(lease: dict[str, str] | None) -> None:
+    if lease is None:
+        return
+    try:
+        # Only the chain holding the lease may free it.
+        if cache.get(lease["key"]) == lease["token"]:
+            cache.delete(lease["key"])
+    except Exception:
+        logger.warning("Failed to release processing lease %s", lease["key"], exc_info=True)
+
+
+@shared_task
+def release_processing_lease_on_error(request, exc, traceback, lease=None) -> None:
+    """``link_error`` of every stage, so a chain that raises frees its image at once."""
+    release_processing_lease(lease)
+
+
+def _suppress_duplicate(image_id: str, stage: str) -> None:
+    increment(IMAGE_DUPLICATE_SUPPRESSED_METRIC)
+    _log_processing_event(
+        image_id, stage, "suppressed", {"reason": "another chain holds the lease"}
+    )
+
+
+def _stage_completed(image: MedicalImage, stage: str) -> bool:
+    if stage == "preprocess":
+        return bool(
+            image.metadata.get("preprocess_completed_at") and image.metadata.get("model_input_key")
+        )
+    if stage == "previews":
+        return "previews" in image.metadata
+    # Inference is only current for the configured model version; a bulk
+    # re-score after a model upgrade runs it again.
+    return (
+        image.status == MedicalImage.Status.PROCESSED
+        and image.ai_model_version == settings.AI_MODEL_VERSION
+    )
+
+
+def _skip_stage(image: MedicalImage, stage: str) -> None:
+    increment(IMAGE_STAGE_SKIPPED_METRIC)
+    _log_processing_event(str(image.id), stage, "skipped", {"reason": "already completed"})
 
 
 def _mark_processing_failure(
@@ -72,10 +199,17 @@ def _mark_processing_failure(
 
 
 @shared_task
-def preprocess_image_task(image_id: str) -> str | None:
+def preprocess_image_task(image_id: str, lease: dict[str, str] | None = None) -> str | None:
     image = MedicalImage.objects.filter(id=image_id).first()
     if not image:
+        release_processing_lease(lease)
+        return None
+    if not _renew_lease(lease):
+        _suppress_duplicate(image_id, "preprocess")
         return None
+    if _stage_completed(image, "preprocess"):
+        _skip_stage(image, "preprocess")
+        return str(image.id)
     started_at = time.perf_counter()
     _log_processing_event(image_id, "preprocess", "started")
     _update_image_metadata(
@@ -83,22 +217,104 @@ def preprocess_image_task(image_id: str) -> str | None:
         status=str(MedicalImage.Status.PROCESSING),
         metadata_updates={"preprocess_started_at": timezone.now().isoformat()},
     )
+    try:
+        model_input = ensure_model_input(image, S3StorageService())
+    except Exception as exc:
+        # Inference falls back to sending the original file to the AI service.
+        logger.exception("Preprocessing failed for image %s", image.id)
+        _update_image_metadata(
+            image,
+            metadata_updates={"preprocess_error": str(exc)},
+            metadata_remove_keys=["model_input_key"],
+        )
+        _log_processing_event(image_id, "preprocess", "failed", {"error": str(exc)})
+        return str(image.id)
+
     _update_image_metadata(
         image,
         metadata_updates={
+            **model_input,
             "preprocess_completed_at": timezone.now().isoformat(),
             "preprocess_duration_ms": round((time.perf_counter() - started_at) * 1000, 2),
         },
+        metadata_remove_keys=["preprocess_error"],
+    )
+    _log_processing_event(
+        image_id,
+        "preprocess",
+        "completed",
+        {"cached": model_input["model_input_cached"]},
     )
-    _log_processing_event(image_id, "preprocess", "completed")
     return str(image.id)
 
 
 @shared_task
-def ai_inference_task(image_id: str) -> None:
-    image = MedicalImage.objects.filter(id=image_id).first()
+def generate_previews_task(image_id: str | None, lease: dict[str, str] | None = None) -> str | None:
+    image = MedicalImage.objects.filter(id=image_id).first() if image_id else None
     if not image:
-        return
+        release_processing_lease(lease)
+        return None
+    if not _renew_lease(lease):
+        _suppress_duplicate(str(image.id), "previews")
+        return None
+    try:
+        if _stage_completed(image, "previews"):
+            _skip_stage(image, "previews")
+            return str(image.id)
+        return _render_previews(image)
+    finally:
+        # Last stage of the chain, so the next queue_image_processing may run.
+        release_processing_lease(lease)
+
+
+def _render_previews(image: MedicalImage) -> str:
+    started_at = time.perf_counter()
+    _log_processing_event(str(image.id), "previews", "started")
+    try:
+        previews = generate_image_previews(image, S3StorageService())
+    except Exception as exc:
+        # Previews are a convenience; a render failure only leaves them missing.
+        logger.exception("Preview generation failed for image %s", image.id)
+        _update_image_metadata(image, metadata_updates={"preview_error": str(exc)})
+        _log_processing_event(str(image.id), "previews", "failed", {"error": str(exc)})
+        return str(image.id)
+
+    _update_image_metadata(
+        image,
+        metadata_updates={
+            "previews": previews,
+            "previews_generated_at": timezone.now().isoformat(),
+            "previews_duration_ms": round((time.perf_counter() - started_at) * 1000, 2),
+        },
+        metadata_remove_keys=["preview_error"],
+    )
+    _log_processing_event(
+        str(image.id),
+        "previews",
+        "completed",
+        {"sizes": list(previews["sizes"]), "tiled": "tiles" in previews},
+    )
+    return str(image.id)
+
+
+@shared_task
+def ai_inference_task(image_id: str | None, lease: dict[str, str] | None = None) -> str | None:
+    image = MedicalImage.objects.filter(id=image_id).first() if image_id else None
+    if not image:
+        release_processing_lease(lease)
+        return None
+    if not _renew_lease(lease):
+        _suppress_duplicate(str(image.id), "inference")
+        return None
+    if _stage_completed(image, "inference"):
+        _skip_stage(image, "inference")
+    else:
+        _run_inference(image)
+    return str(image.id)
+
+
+def _run_inference(image: MedicalImage) -> None:
+    image_id = str(image.id)
     storage = S3StorageService()
     for attempt in range(1, IMAGE_PROCESSING_MAX_ATTEMPTS + 1):
         started_at = time.perf_counter()
@@ -117,8 +333,18 @@ def ai_inference_task(image_id: str) -> None:
             },
         )
         try:
-            image_bytes = storage.download(image.s3_key)
-            result = request_inference(image_bytes, str(image.id))
+            model_input_key = image.metadata.get("model_input_key")
+            if model_input_key:
+                result = request_inference(
+                    storage.download(model_input_key),
+                    str(image.id),
+                    content_type=MODEL_INPUT_CONTENT_TYPE,
+                    image_sha256=image.stored_sha256,
+                    frame_count=image.metadata.get("model_input_frame_count"),
+                )
+            else:
+                image_bytes = storage.download(image.s3_key)
+                result = request_inference(image_bytes, str(image.id))
         except (AIServiceRequestError, StorageError) as exc:
             retry_in_seconds = round(
                 IMAGE_PROCESSING_RETRY_BACKOFF_SECONDS * (2 ** (attempt - 1)),
@@ -162,14 +388,17 @@ def ai_inference_task(image_id: str) -> None:
                 "ai_weights_sha256": result.get("weights_sha256", ""),
                 "ai_device": result.get("device", ""),
                 "ai_anomaly_threshold": result.get("anomaly_threshold"),
+                "ai_anomaly_probability": result.get("anomaly_probability"),
                 "ai_is_anomalous": result.get("is_anomalous"),
+                "ai_frame_count": result.get("frame_count", 1),
                 "ai_service_processing_ms": result.get("service_processing_ms"),
-                "image_sha256": result.get("input_sha256", image.metadata.get("stored_sha256", "")),
+                "image_sha256": result.get("input_sha256", image.stored_sha256),
                 "inference_completed_at": timezone.now().isoformat(),
                 "inference_duration_ms": round((time.perf_counter() - started_at) * 1000, 2),
             },
             metadata_remove_keys=["processing_error", "last_processing_error"],
         )
+        raise_ai_priority(image.patient_id, result.get("anomaly_probability"))
         _log_processing_event(
             image_id,
             "inference",
@@ -182,11 +411,185 @@ def ai_inference_task(image_id: str) -> None:
                 "model_registry": result.get("model_registry"),
                 "anomaly_threshold": result.get("anomaly_threshold"),
                 "is_anomalous": result.get("is_anomalous"),
+                "frame_count": result.get("frame_count", 1),
                 "service_processing_ms": result.get("service_processing_ms"),
             },
         )
         return
 
 
-def queue_image_processing(image_id: str):
-    return chain(preprocess_image_task.s(image_id), ai_inference_task.s())()
+def reuse_prior_result(image: MedicalImage) -> bool:
+    """Mark ``image`` processed with the result of an earlier upload of the same bytes.
+
+    Only results from the configured ``AI_MODEL_VERSION`` are reused; returns
+    False when there is none and the image needs the processing chain.
+    """
+    if not image.stored_sha256:
+        return False
+    prior = (
+        MedicalImage.objects.filter(
+            stored_sha256=image.stored_sha256,
+            status=MedicalImage.Status.PROCESSED,
+            ai_model_version=settings.AI_MODEL_VERSION,
+        )
+        .exclude(id=image.id)
+        .order_by("-processed_at")
+        .first()
+    )
+    if prior is None:
+        return False
+    reused = {
+        key: value
+        for key, value in prior.metadata.items()
+        if key.startswith("ai_") or key in REUSABLE_METADATA_KEYS
+    }
+    _update_image_metadata(
+        image,
+        status=str(MedicalImage.Status.PROCESSED),
+        metadata_updates={
+            **reused,
+            "ai_result_reused_from": str(prior.id),
+            "inference_completed_at": timezone.now().isoformat(),
+        },
+    )
+    try:
+        document = get_ai_result_by_image(str(prior.id))
+        if document:
+            store_ai_result(str(image.id), document["result"])
+    except Exception:
+        logger.exception("Failed to copy AI result from image %s to %s", prior.id, image.id)
+    raise_ai_priority(image.patient_id, image.ai_anomaly_probability)
+    _log_processing_event(
+        str(image.id),
+        "inference",
+        "reused",
+        {"source_image_id": str(prior.id), "model_version": image.ai_model_version},
+    )
+    return True
+
+
+def queue_image_processing(image_id: str, priority: str = "urgent"):
+    """Start the processing chain on the queue for ``priority``.
+
+    ``"urgent"`` is for uploads someone is waiting on; ``"bulk"`` is for
+    backfills and re-scoring, which run on their own workers. Returns None
+    without queueing when a chain for the same image is already running.
+    """
+    queue = IMAGE_PROCESSING_QUEUES.get(priority)
+    if queue is None:
+        raise ValueError(f"Unknown image processing priority: {priority}")
+    stored_sha256 = (
+        MedicalImage.objects.filter(id=image_id).values_list("stored_sha256", flat=True).first()
+    )
+    lease = acquire_processing_lease(image_id, stored_sha256 or "")
+    if lease is None:
+        _suppress_duplicate(image_id, "queue")
+        return None
+    return _start_chain(image_id, queue, lease)
+
+
+def _start_chain(image_id: str, queue: str, lease: dict[str, str]):
+    on_error = release_processing_lease_on_error.s(lease=lease)
+    try:
+        return chain(
+            preprocess_image_task.s(image_id, lease=lease).set(queue=queue).on_error(on_error),
+            # Previews come last so they never delay the AI result.
+            ai_inference_task.s(lease=lease).set(queue=queue).on_error(on_error),
+            generate_previews_task.s(lease=lease).set(queue=queue).on_error(on_error),
+        )()
+    except Exception:
+        release_processing_lease(lease)
+        raise
+
+
+def _requeue_swept_image(image_id: str, lease: dict[str, str]) -> None:
+    try:
+        _start_chain(image_id, IMAGE_PROCESSING_QUEUES["bulk"], lease)
+    except Exception:
+        # The row was already reset, so the next sweep that finds it stale retries.
+        logger.exception("Failed to requeue stuck image %s", image_id)
+        return
+    _log_processing_event(image_id, "sweep", "requeued")
+
+
+@shared_task
+def sweep_stuck_images() -> dict[str, int]:
+    """Requeue images left in ``uploaded`` or ``processing`` by a lost enqueue or worker.
+
+    An image is stuck once it has not been written for ``IMAGE_STUCK_AFTER_SECONDS``.
+    Each sweep requeues at most ``IMAGE_SWEEP_BATCH_SIZE`` of them on the bulk
+    queue, oldest first, and marks an image failed once it has been requeued
+    ``IMAGE_SWEEP_MAX_REQUEUES`` times without finishing. An image whose
+    processing lease is still held has a live chain (perhaps waiting in a
+    backlogged queue) and is left untouched.
+    """
+    cutoff = timezone.now() - timedelta(seconds=settings.IMAGE_STUCK_AFTER_SECONDS)
+    limit = settings.IMAGE_SWEEP_BATCH_SIZE
+    requeued = abandoned = busy = 0
+    with transaction.atomic():
+        stuck: list[MedicalImage] = []
+        # One range scan of the (status, updated_at) index per status.
+        for stuck_status in (MedicalImage.Status.UPLOADED, MedicalImage.Status.PROCESSING):
+            stuck += list(
+                MedicalImage.objects.filter(status=stuck_status, updated_at__lt=cutoff)
+                .order_by("updated_at")
+                .select_for_update(skip_locked=True)[: limit - len(stuck)]
+            )
+            if len(stuck) >= limit:
+                break
+        for image in stuck:
+            # Taken before the row is changed, so a running chain is never reset.
+            lease = acquire_processing_lease(str(image.id), image.stored_sha256)
+            if lease is None:
+                busy += 1
+                continue
+            attempts = int(image.metadata.get("sweep_requeues", 0))
+            if attempts >= settings.IMAGE_SWEEP_MAX_REQUEUES:
+                _mark_processing_failure(
+                    image,
+                    stage="sweep",
+                    attempt=attempts,
+                    error=RuntimeError(
+                        f"Image was still {image.status} after {attempts} requeues."
+                    ),
+                )
+                release_processing_lease(lease)
+                abandoned += 1
+                continue
+            # Reset under the row lock and the lease, before the chain exists, so
+            # a chain that finishes quickly is never set back to uploaded. Saving
+            # bumps updated_at, so the next sweep leaves the image alone for
+            # another full IMAGE_STUCK_AFTER_SECONDS.
+            _update_image_metadata(
+                image,
+                status=str(MedicalImage.Status.UPLOADED),
+                metadata_updates={
+                    "sweep_requeues": attempts + 1,
+                    "sweep_requeued_at": timezone.now().isoformat(),
+                },
+            )
+            transaction.on_commit(partial(_requeue_swept_image, str(image.id), lease))
+            requeued += 1
+
+    increment(IMAGE_SWEEP_RUNS_METRIC)
+    increment(IMAGE_SWEEP_REQUEUED_METRIC, requeued)
+    increment(IMAGE_SWEEP_ABANDONED_METRIC, abandoned)
+    if requeued or abandoned or busy:
+        logger.info(
+            "Image sweep requeued %s, abandoned %s, left %s with live chains",
+            requeued,
+            abandoned,
+            busy,
+        )
+    return {"requeued": requeued, "abandoned": abandoned, "busy": busy}
+
+
+@shared_task
+def collect_unreferenced_objects() -> int:
+    """Delete stored objects nothing has referenced for ``STORED_OBJECT_GC_GRACE_SECONDS``."""
+    collected = collect_unreferenced(
+        settings.STORED_OBJECT_GC_GRACE_SECONDS, settings.STORED_OBJECT_GC_BATCH_SIZE
+    )
+    if collected:
+        logger.info("Collected %s unreferenced stored objects", collected)
+    return collected
@@ -1,8 +1,23 @@
 from django.urls import path
 
-from apps.imaging.views import ImageDownloadView, ImageUploadView
+from apps.imaging.views import (
+    ImageDownloadView,
+    ImagePreviewTileView,
+    ImagePreviewView,
+    ImageUploadView,
+)
 
 urlpatterns = [
     path("<uuid:image_id>/download", ImageDownloadView.as_view(), name="image-download"),
+    path(
+        "<uuid:image_id>/preview/<int:size>",
+        ImagePreviewView.as_view(),
+        name="image-preview",
+    ),
+    path(
+        "<uuid:image_id>/tiles/<int:level>/<int:column>_<int:row>",
+        ImagePreviewTileView.as_view(),
+        name="image-preview-tile",
+    ),
     path("upload", ImageUploadView.as_view(), name="image-upload"),
 ]
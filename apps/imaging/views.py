@@ -11,9 +11,10 @@ from rest_framework.views import APIView
 from apps.audit_logs.utils import log_action
 from apps.authentication.permissions import IsPatient
 from apps.imaging.access import get_authorized_image_for_user
+from apps.imaging.previews import build_preview_response, tile_key
 from apps.imaging.serializers import ImageUploadRequestSerializer, MedicalImageSerializer
 from apps.imaging.services import handle_image_upload
-from apps.imaging.storage import S3StorageService
+from apps.imaging.storage import S3StorageService, StorageError
 
 
 class ImageUploadView(APIView):
@@ -68,3 +69,64 @@ class ImageDownloadView(APIView):
             filename=image.file_name,
         )
         return response
+
+
+class ImagePreviewView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    @extend_schema(
+        responses={
+            200: OpenApiResponse(
+                response=OpenApiTypes.BINARY,
+                description="Rendered preview of a medical image, cacheable by ETag.",
+            ),
+            304: OpenApiResponse(description="Preview unchanged since the given ETag."),
+        }
+    )
+    def get(self, request, image_id: str, size: int):
+        image = get_authorized_image_for_user(request.user, image_id)
+        previews = (image.metadata.get("previews") or {}) if image else {}
+        preview = previews.get("sizes", {}).get(str(size))
+        if not image or not preview:
+            return Response({"detail": "Preview not available"}, status=status.HTTP_404_NOT_FOUND)
+        try:
+            response = build_preview_response(
+                request,
+                key=preview["key"],
+                etag=preview["etag"],
+                content_type=previews["content_type"],
+            )
+        except (StorageError, OSError):
+            return Response({"detail": "Preview not available"}, status=status.HTTP_404_NOT_FOUND)
+        if response.status_code == status.HTTP_200_OK:
+            log_action(request.user, "image_preview", request, resource_id=str(image.id))
+        return response
+
+
+class ImagePreviewTileView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    @extend_schema(
+        responses={
+            200: OpenApiResponse(
+                response=OpenApiTypes.BINARY,
+                description="One tile of the preview pyramid for a very large image.",
+            ),
+            304: OpenApiResponse(description="Tile unchanged since the given ETag."),
+        }
+    )
+    def get(self, request, image_id: str, level: int, column: int, row: int):
+        image = get_authorized_image_for_user(request.user, image_id)
+        previews = (image.metadata.get("previews") or {}) if image else {}
+        tiles = previews.get("tiles")
+        if not image or not tiles or level >= tiles["levels"]:
+            return Response({"detail": "Tile not available"}, status=status.HTTP_404_NOT_FOUND)
+        try:
+            return build_preview_response(
+                request,
+                key=tile_key(image.s3_key, level, column, row, tiles["extension"]),
+                etag=f"{tiles['etag_prefix']}-{level}-{column}-{row}",
+                content_type=previews["content_type"],
+            )
+        except (StorageError, OSError):
+            return Response({"detail": "Tile not available"}, status=status.HTTP_404_NOT_FOUND)
@@ -30,11 +30,17 @@ class MedicalRecordAdmin(admin.ModelAdmin):
     inlines = (DiagnosisInline, PrescriptionInline)
     readonly_fields = ("created_at",)
 
+    def get_queryset(self, request):
+        # MedicalRecord.__str__ reads patient.user, and autocomplete results render it per
+        # row. The changelist skips list_select_related once a join is set, so reuse it here.
+        return super().get_queryset(request).select_related(*self.list_select_related)
+
 
 @admin.register(Diagnosis)
 class DiagnosisAdmin(admin.ModelAdmin):
     list_display = ("medical_record", "created_at")
     search_fields = ("medical_record__patient__user__email", "text")
+    list_select_related = ("medical_record__patient__user",)
     autocomplete_fields = ("medical_record",)
     readonly_fields = ("created_at",)
 
@@ -48,5 +54,6 @@ class PrescriptionAdmin(admin.ModelAdmin):
         "dosage",
         "instructions",
     )
+    list_select_related = ("medical_record__patient__user",)
     autocomplete_fields = ("medical_record",)
     readonly_fields = ("created_at",)
@@ -0,0 +1,66 @@
+from django.contrib.contenttypes.models import ContentType
+from django.core.management.base import BaseCommand
+from guardian.models import UserObjectPermission
+
+from apps.medical_records.models import MedicalRecord
+from apps.reports.models import Report
+from curamind_core.object_permissions import derived_codenames
+
+# The relations derived_codenames() reads, loaded up front for each batch.
+RELATED_FIELDS = {
+    MedicalRecord: ("doctor", "patient"),
+    Report: ("medical_record__patient",),
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete guardian object permissions on medical records and reports that are "
+        "now derived from the objects' relationships, or whose object no longer exists."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Report what would be deleted without deleting it.",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        derived = orphaned = kept = 0
+        for model, related in RELATED_FIELDS.items():
+            grants = UserObjectPermission.objects.filter(
+                content_type=ContentType.objects.get_for_model(model)
+            ).select_related("permission", "user")
+            last_id = 0
+            while True:
+                batch = list(grants.filter(id__gt=last_id).order_by("id")[:batch_size])
+                if not batch:
+                    break
+                last_id = batch[-1].id
+                objects = model.objects.select_related(*related).in_bulk(
+                    {grant.object_pk for grant in batch}
+                )
+                stale = []
+                for grant in batch:
+                    obj = objects.get(model._meta.pk.to_python(grant.object_pk))
+                    if obj is None:
+                        orphaned += 1
+                    elif grant.permission.codename in derived_codenames(grant.user, obj):
+                        derived += 1
+                    else:
+                        kept += 1
+                        continue
+                    stale.append(grant.id)
+                if stale and not options["dry_run"]:
+                    UserObjectPermission.objects.filter(id__in=stale).delete()
+
+        action = "would delete" if options["dry_run"] else "deleted"
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Object permissions: {action} {derived} derived and {orphaned} orphaned grants, "
+                f"kept {kept}."
+            )
+        )
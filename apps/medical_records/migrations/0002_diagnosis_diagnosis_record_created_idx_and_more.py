@@ -0,0 +1,27 @@
+# Generated by Django 5.2.11 on 2026-10-19 12:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("doctors", "0001_initial"),
+        ("medical_records", "0001_initial"),
+        ("patients", "0002_patientprofile_patient_created_id_idx"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="diagnosis",
+            index=models.Index(
+                fields=["medical_record", "created_at", "id"], name="diagnosis_record_created_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="medicalrecord",
+            index=models.Index(
+                fields=["patient", "created_at", "id"], name="record_patient_created_idx"
+            ),
+        ),
+    ]
@@ -20,6 +20,11 @@ class MedicalRecord(models.Model):
     ai_analysis = models.JSONField(default=dict, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["patient", "created_at", "id"], name="record_patient_created_idx"),
+        ]
+
     def __str__(self) -> str:
         return f"MedicalRecord({self.patient.user.email})"
 
@@ -32,6 +37,13 @@ class Diagnosis(models.Model):
     text = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["medical_record", "created_at", "id"], name="diagnosis_record_created_idx"
+            ),
+        ]
+
 
 class Prescription(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
@@ -1,6 +1,7 @@
 from rest_framework import serializers
 
 from apps.medical_records.models import Diagnosis, MedicalRecord, Prescription
+from curamind_core.query_plans import QueryPlanMixin
 
 
 class DiagnosisSerializer(serializers.ModelSerializer):
@@ -17,10 +18,12 @@ class PrescriptionSerializer(serializers.ModelSerializer):
         read_only_fields = ("id", "created_at")
 
 
-class MedicalRecordSerializer(serializers.ModelSerializer):
+class MedicalRecordSerializer(QueryPlanMixin, serializers.ModelSerializer):
     diagnoses = DiagnosisSerializer(many=True, read_only=True)
     prescriptions = PrescriptionSerializer(many=True, read_only=True)
 
+    prefetch_related_fields = ("diagnoses", "prescriptions")
+
     class Meta:
         model = MedicalRecord
         fields = (
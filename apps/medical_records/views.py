@@ -1,6 +1,4 @@
-from apps.appointments.models import Appointment
 from drf_spectacular.utils import extend_schema
-from guardian.shortcuts import assign_perm
 from rest_framework import status
 from rest_framework.response import Response
 from rest_framework.views import APIView
@@ -8,6 +6,7 @@ from rest_framework.views import APIView
 from apps.audit_logs.utils import log_action
 from apps.authentication.models import User
 from apps.authentication.permissions import IsDoctor, IsPatient
+from apps.doctors.care_team import is_care_team_member
 from apps.medical_records.models import Diagnosis, MedicalRecord, Prescription
 from apps.medical_records.serializers import (
     DiagnosisCreateSerializer,
@@ -18,6 +17,8 @@ from apps.medical_records.serializers import (
     PrescriptionSerializer,
 )
 from apps.patients.models import PatientProfile
+from curamind_core.pagination import KEYSET_PARAMETERS, KeysetPagination
+from curamind_core.values_serializers import ValuesListMixin
 
 
 def _patient_profile_or_response(user):
@@ -57,22 +58,20 @@ def _get_record_for_user(user, record_id: str) -> MedicalRecord | None:
     return record
 
 
-class PatientRecordsView(APIView):
+class PatientRecordsView(ValuesListMixin, APIView):
     permission_classes = [IsPatient]
     serializer_class = MedicalRecordSerializer
 
-    @extend_schema(responses=MedicalRecordSerializer(many=True))
+    @extend_schema(parameters=KEYSET_PARAMETERS, responses=MedicalRecordSerializer(many=True))
     def get(self, request):
         patient_profile, error = _patient_profile_or_response(request.user)
         if error:
             return error
-        records = (
-            MedicalRecord.objects.filter(patient=patient_profile)
-            .select_related("patient", "doctor")
-            .order_by("-created_at")
-        )
+        records = MedicalRecord.objects.filter(patient=patient_profile)
+        paginator = KeysetPagination(ordering=("-created_at", "-id"))
+        page = paginator.paginate_queryset(records, request, view=self)
         log_action(request.user, "record_view", request)
-        return Response(MedicalRecordSerializer(records, many=True).data, status=status.HTTP_200_OK)
+        return paginator.get_paginated_response(self.list_data(MedicalRecordSerializer, page))
 
 
 class MedicalRecordCreateView(APIView):
@@ -89,11 +88,7 @@ class MedicalRecordCreateView(APIView):
         patient = PatientProfile.objects.filter(id=serializer.validated_data["patient_id"]).first()
         if not patient:
             return Response({"detail": "Patient not found"}, status=status.HTTP_404_NOT_FOUND)
-        is_assigned_patient = (
-            Appointment.objects.filter(doctor=doctor_profile, patient=patient).exists()
-            or MedicalRecord.objects.filter(doctor=doctor_profile, patient=patient).exists()
-        )
-        if not is_assigned_patient:
+        if not is_care_team_member(request.user, patient.id):
             return Response(
                 {"detail": "You can only create records for assigned patients."},
                 status=status.HTTP_403_FORBIDDEN,
@@ -104,17 +99,14 @@ class MedicalRecordCreateView(APIView):
             diagnosis_text=serializer.validated_data["diagnosis_text"],
             ai_analysis=serializer.validated_data.get("ai_analysis", {}),
         )
-        assign_perm("view_medicalrecord", request.user, record)
-        assign_perm("change_medicalrecord", request.user, record)
-        assign_perm("view_medicalrecord", patient.user, record)
         log_action(request.user, "record_create", request, resource_id=str(record.id))
         return Response(MedicalRecordSerializer(record).data, status=status.HTTP_201_CREATED)
 
 
-class RecordDiagnosesView(APIView):
+class RecordDiagnosesView(ValuesListMixin, APIView):
     serializer_class = DiagnosisSerializer
 
-    @extend_schema(responses=DiagnosisSerializer(many=True))
+    @extend_schema(parameters=KEYSET_PARAMETERS, responses=DiagnosisSerializer(many=True))
     def get(self, request, record_id: str):
         record = _get_record_for_user(request.user, record_id)
         if not record:
@@ -122,9 +114,10 @@ class RecordDiagnosesView(APIView):
                 {"detail": "Medical record not found"}, status=status.HTTP_404_NOT_FOUND
             )
 
-        diagnoses = record.diagnoses.order_by("-created_at")
+        paginator = KeysetPagination(ordering=("-created_at", "-id"))
+        page = paginator.paginate_queryset(record.diagnoses.all(), request, view=self)
         log_action(request.user, "diagnosis_view", request, resource_id=record_id)
-        return Response(DiagnosisSerializer(diagnoses, many=True).data, status=status.HTTP_200_OK)
+        return paginator.get_paginated_response(self.list_data(DiagnosisSerializer, page))
 
     @extend_schema(request=DiagnosisCreateSerializer, responses=DiagnosisSerializer)
     def post(self, request, record_id: str):
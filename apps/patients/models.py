@@ -16,5 +16,8 @@ class PatientProfile(models.Model):
     emergency_contact = models.CharField(max_length=128, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [models.Index(fields=["created_at", "id"], name="patient_created_id_idx")]
+
     def __str__(self) -> str:
         return f"PatientProfile({self.user.email})"
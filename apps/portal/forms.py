@@ -4,12 +4,12 @@ import os
 
 from django import forms
 from django.contrib.auth import authenticate
-from django.db.models import Q
 from django.utils import timezone
 
 from apps.authentication.models import User
 from apps.authentication.roles import get_self_assignable_role_choices
 from apps.appointments.models import Appointment
+from apps.doctors.care_team import care_team_patients
 from apps.doctors.models import DoctorProfile
 from apps.medical_records.models import MedicalRecord
 from apps.patients.models import PatientProfile
@@ -170,9 +170,7 @@ class MedicalRecordCreateForm(forms.ModelForm):
         queryset = PatientProfile.objects.none()
         if user and getattr(user, "doctor_profile", None):
             doctor_profile = user.doctor_profile
-            queryset = PatientProfile.objects.filter(
-                Q(appointments__doctor=doctor_profile) | Q(medical_records__doctor=doctor_profile)
-            ).distinct()
+            queryset = care_team_patients(doctor_profile)
         self.fields["patient"] = PatientChoiceField(
             queryset=queryset.select_related("user"),
             empty_label="Choose a patient",
@@ -230,6 +228,10 @@ class ReportApproveForm(forms.Form):
     approve = forms.BooleanField(required=False)
 
 
+class ReportClaimForm(forms.Form):
+    count = forms.IntegerField(min_value=1, max_value=50, initial=5)
+
+
 class DiagnosisCreateForm(forms.Form):
     medical_record = MedicalRecordChoiceField(
         queryset=MedicalRecord.objects.none(),
@@ -244,7 +246,7 @@ class DiagnosisCreateForm(forms.Form):
         queryset = MedicalRecord.objects.none()
         if user and getattr(user, "doctor_profile", None):
             queryset = MedicalRecord.objects.filter(doctor=user.doctor_profile)
-        self.fields["medical_record"].queryset = queryset.select_related("patient", "doctor")
+        self.fields["medical_record"].queryset = queryset.select_related("patient__user")
 
     def clean_medical_record(self):
         medical_record = self.cleaned_data["medical_record"]
@@ -278,7 +280,7 @@ class PrescriptionCreateForm(forms.Form):
         queryset = MedicalRecord.objects.none()
         if user and getattr(user, "doctor_profile", None):
             queryset = MedicalRecord.objects.filter(doctor=user.doctor_profile)
-        self.fields["medical_record"].queryset = queryset.select_related("patient", "doctor")
+        self.fields["medical_record"].queryset = queryset.select_related("patient__user")
 
     def clean_medical_record(self):
         medical_record = self.cleaned_data["medical_record"]
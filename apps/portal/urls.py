@@ -6,17 +6,20 @@ from apps.portal.views import (
     approve_report,
     book_appointment,
     cancel_appointment,
+    claim_reports,
     create_medical_record,
     create_report,
     dashboard,
     download_image,
     download_report,
+    image_preview,
     home,
     login_view,
     logout_view,
     mfa_login_view,
     mfa_settings_view,
     register_view,
+    release_report,
     update_appointment_status,
     upload_image,
 )
@@ -30,6 +33,11 @@ urlpatterns = [
     path("dashboard", dashboard, name="portal-dashboard"),
     path("dashboard/security/mfa", mfa_settings_view, name="portal-mfa-settings"),
     path("dashboard/images/<uuid:image_id>/download", download_image, name="portal-download-image"),
+    path(
+        "dashboard/images/<uuid:image_id>/preview/<int:size>",
+        image_preview,
+        name="portal-image-preview",
+    ),
     path("dashboard/appointments/book", book_appointment, name="portal-book-appointment"),
     path(
         "dashboard/appointments/<uuid:appointment_id>/cancel",
@@ -49,6 +57,12 @@ urlpatterns = [
         name="portal-add-prescription",
     ),
     path("dashboard/reports/create", create_report, name="portal-create-report"),
+    path("dashboard/reports/claim", claim_reports, name="portal-claim-reports"),
+    path(
+        "dashboard/reports/<uuid:report_id>/release",
+        release_report,
+        name="portal-release-report",
+    ),
     path(
         "dashboard/reports/<uuid:report_id>/download",
         download_report,
@@ -5,27 +5,34 @@ from django.contrib.auth import login, logout
 from django.contrib.auth.decorators import login_required
 from django.core.cache import cache
 from django.core.exceptions import ValidationError
-from django.http import FileResponse, HttpRequest, HttpResponse, HttpResponseRedirect
-from django.db.models import Q
+from django.http import (
+    FileResponse,
+    Http404,
+    HttpRequest,
+    HttpResponse,
+    HttpResponseRedirect,
+)
 from django.shortcuts import redirect, render
 from django.utils import timezone
 from django.views.decorators.http import require_POST
 
 from apps.ai_engine.mongo import get_ai_result_by_image
+from apps.analytics.rollups import statistics_snapshot
 from apps.appointments.models import Appointment
 from apps.audit_logs.models import AuditLog
-from apps.audit_logs.utils import log_action
+from apps.audit_logs.utils import filter_audit_logs, log_action
 from apps.authentication.mfa import build_mfa_provisioning_uri, generate_mfa_secret, verify_mfa_code
 from apps.authentication.models import LoginAttempt, User
 from apps.authentication.serializers import RegisterSerializer
 from apps.authentication.views import LOGIN_ATTEMPT_TTL, MAX_LOGIN_ATTEMPTS, _attempt_key
+from apps.doctors.care_team import care_team_patients
 from apps.imaging.access import get_authorized_image_for_user
 from apps.imaging.models import MedicalImage
+from apps.imaging.previews import available_preview_sizes, build_preview_response
 from apps.imaging.services import handle_image_upload
-from apps.imaging.storage import S3StorageService
+from apps.imaging.storage import S3StorageService, StorageError
 from apps.medical_records.models import MedicalRecord
 from apps.notifications.tasks import send_email_notification
-from apps.patients.models import PatientProfile
 from apps.portal.forms import (
     AppointmentCancelForm,
     AppointmentCreateForm,
@@ -39,9 +46,19 @@ from apps.portal.forms import (
     PrescriptionCreateForm,
     RegisterForm,
     ReportApproveForm,
+    ReportClaimForm,
     ReportCreateForm,
 )
 from apps.reports.models import Report
+from apps.reports.work_queue import (
+    approve_draft,
+    claim_next_reports,
+    claimable_drafts,
+    claimed_reports,
+    is_claimed_by_other,
+    patient_ai_priority,
+    release_claim,
+)
 
 PENDING_PORTAL_MFA_USER_ID = "pending_portal_mfa_user_id"
 PENDING_PORTAL_MFA_BACKEND = "pending_portal_mfa_backend"
@@ -309,16 +326,25 @@ def dashboard(request: HttpRequest):
                     "Please contact support or an administrator before booking care."
                 ),
             )
-        appointments = Appointment.objects.filter(patient=patient).order_by("-scheduled_time")
+        appointments = (
+            Appointment.objects.filter(patient=patient)
+            .select_related("doctor__user")
+            .order_by("-scheduled_time")
+        )
         records = (
             MedicalRecord.objects.filter(patient=patient)
+            .select_related("doctor__user")
             .prefetch_related("diagnoses", "prescriptions")
             .order_by("-created_at")
         )
-        reports = Report.objects.filter(
-            medical_record__patient=patient,
-            status=Report.Status.APPROVED,
-        ).order_by("-created_at")
+        reports = (
+            Report.objects.filter(
+                medical_record__patient=patient,
+                status=Report.Status.APPROVED,
+            )
+            .select_related("author")
+            .order_by("-created_at")
+        )
         images = MedicalImage.objects.filter(patient=patient).order_by("-uploaded_at")
         for image in images:
             image.ai_result = get_ai_result_by_image(str(image.id)) or {}
@@ -326,6 +352,7 @@ def dashboard(request: HttpRequest):
             image.ai_probability = result_payload.get("anomaly_probability")
             image.ai_probability_available = image.ai_probability is not None
             image.ai_model = result_payload.get("model", "")
+            image.thumbnail_size = min(available_preview_sizes(image), default=None)
         context = {
             "appointments": appointments,
             "records": records,
@@ -348,20 +375,23 @@ def dashboard(request: HttpRequest):
                     "to finish provisioning before managing patients."
                 ),
             )
-        appointments = Appointment.objects.filter(doctor=doctor).order_by("-scheduled_time")
+        appointments = (
+            Appointment.objects.filter(doctor=doctor)
+            .select_related("patient__user")
+            .order_by("-scheduled_time")
+        )
         records = (
             MedicalRecord.objects.filter(doctor=doctor)
+            .select_related("patient__user")
             .prefetch_related("diagnoses", "prescriptions")
             .order_by("-created_at")
         )
-        reports = Report.objects.filter(author=user).order_by("-created_at")
-        assigned_patients = (
-            PatientProfile.objects.filter(
-                Q(appointments__doctor=doctor) | Q(medical_records__doctor=doctor)
-            )
-            .select_related("user")
-            .distinct()
+        reports = (
+            Report.objects.filter(author=user)
+            .select_related("medical_record__patient__user")
+            .order_by("-created_at")
         )
+        assigned_patients = care_team_patients(doctor).select_related("user")
         context = {
             "appointments": appointments,
             "records": records,
@@ -376,9 +406,10 @@ def dashboard(request: HttpRequest):
         return _render_dashboard(request, "portal/dashboard_doctor.html", context)
 
     if user.role == User.Role.RADIOLOGIST:
-        reports = Report.objects.filter(status=Report.Status.DRAFT).order_by("-created_at")
         context = {
-            "reports": reports,
+            "reports": claimed_reports(user),
+            "open_drafts": claimable_drafts().count(),
+            "claim_form": ReportClaimForm(),
             "approve_form": ReportApproveForm(),
         }
         return _render_dashboard(request, "portal/dashboard_radiologist.html", context)
@@ -392,20 +423,22 @@ def dashboard(request: HttpRequest):
     action_filter = request.GET.get("action", "").strip()
     email_filter = request.GET.get("email", "").strip()
     resource_filter = request.GET.get("resource_id", "").strip()
-    recent_audit_logs = AuditLog.objects.select_related("user").all()
-    if action_filter:
-        recent_audit_logs = recent_audit_logs.filter(action__icontains=action_filter)
-    if email_filter:
-        recent_audit_logs = recent_audit_logs.filter(user__email__icontains=email_filter)
-    if resource_filter:
-        recent_audit_logs = recent_audit_logs.filter(resource_id=resource_filter)
+    recent_audit_logs = filter_audit_logs(
+        AuditLog.objects.select_related("user").all(),
+        action=action_filter,
+        email=email_filter,
+        resource_id=resource_filter,
+    )
 
+    statistics = statistics_snapshot(days=7)
+    counters = statistics["counters"]
     context = {
-        "user_count": User.objects.count(),
-        "appointments": Appointment.objects.count(),
-        "records": MedicalRecord.objects.count(),
-        "reports": Report.objects.count(),
-        "images": MedicalImage.objects.count(),
+        "user_count": counters["users"],
+        "appointments": counters["appointments"],
+        "records": counters["medical_records"],
+        "reports": counters["reports"],
+        "images": counters["images"],
+        "activity": statistics["activity"],
         "recent_audit_logs": recent_audit_logs[:50],
         "audit_filters": {
             "action": action_filter,
@@ -495,6 +528,27 @@ def download_image(request: HttpRequest, image_id: str):
     )
 
 
+@login_required
+def image_preview(request: HttpRequest, image_id: str, size: int):
+    image = get_authorized_image_for_user(request.user, image_id)
+    previews = (image.metadata.get("previews") or {}) if image else {}
+    preview = previews.get("sizes", {}).get(str(size))
+    if not image or not preview:
+        raise Http404("Preview not available")
+    try:
+        response = build_preview_response(
+            request,
+            key=preview["key"],
+            etag=preview["etag"],
+            content_type=previews["content_type"],
+        )
+    except (StorageError, OSError) as exc:
+        raise Http404("Preview not available") from exc
+    if response.status_code == 200:
+        log_action(request.user, "image_preview", request, resource_id=str(image.id))
+    return response
+
+
 @login_required
 @require_POST
 def update_appointment_status(request: HttpRequest, appointment_id: str):
@@ -656,6 +710,7 @@ def create_report(request: HttpRequest):
         report = form.save(commit=False)
         report.author = request.user
         report.status = Report.Status.DRAFT
+        report.ai_priority = patient_ai_priority(report.medical_record)
         report.save()
         log_action(request.user, "report_create", request, resource_id=str(report.id))
         send_email_notification.delay(
@@ -686,9 +741,12 @@ def approve_report(request: HttpRequest, report_id: str):
         if report.status != Report.Status.DRAFT:
             messages.error(request, "Only draft reports can be approved")
             return redirect("portal-dashboard")
-        report.status = Report.Status.APPROVED
-        report.approved_at = timezone.now()
-        report.save(update_fields=["status", "approved_at"])
+        if is_claimed_by_other(report, request.user):
+            messages.error(request, "Another radiologist is reviewing this report")
+            return redirect("portal-dashboard")
+        if not approve_draft(report, request.user):
+            messages.error(request, "This report was approved or claimed by someone else")
+            return redirect("portal-dashboard")
         log_action(request.user, "report_approve", request, resource_id=str(report.id))
         send_email_notification.delay(
             report.medical_record.patient.user.email,
@@ -701,6 +759,39 @@ def approve_report(request: HttpRequest, report_id: str):
     return redirect("portal-dashboard")
 
 
+@login_required
+@require_POST
+def claim_reports(request: HttpRequest):
+    if request.user.role != User.Role.RADIOLOGIST:
+        messages.error(request, "Not authorized")
+        return redirect("portal-dashboard")
+
+    form = ReportClaimForm(request.POST)
+    if form.is_valid():
+        claimed = claim_next_reports(request.user, form.cleaned_data["count"])
+        if claimed:
+            messages.success(request, f"Claimed {claimed} report{'s' if claimed != 1 else ''}")
+        else:
+            messages.info(request, "No draft reports are waiting right now")
+    else:
+        _flash_form_errors(request, form, "Unable to claim reports.")
+    return redirect("portal-dashboard")
+
+
+@login_required
+@require_POST
+def release_report(request: HttpRequest, report_id: str):
+    if request.user.role != User.Role.RADIOLOGIST:
+        messages.error(request, "Not authorized")
+        return redirect("portal-dashboard")
+
+    if release_claim(request.user, report_id):
+        messages.success(request, "Report returned to the queue")
+    else:
+        messages.error(request, "You have no claim on this report")
+    return redirect("portal-dashboard")
+
+
 @login_required
 def download_report(request: HttpRequest, report_id: str):
     report = (
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.11 on 2026-10-19 12:59
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("medical_records", "0002_diagnosis_diagnosis_record_created_idx_and_more"),
+        ("reports", "0001_initial"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="report",
+            index=models.Index(fields=["created_at", "id"], name="report_created_id_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="report",
+            index=models.Index(
+                fields=["author", "created_at", "id"], name="report_author_created_idx"
+            ),
+        ),
+    ]
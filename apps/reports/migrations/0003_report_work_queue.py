@@ -0,0 +1,46 @@
+# Generated by Django 5.2.11 on 2026-10-19 13:35
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("medical_records", "0002_diagnosis_diagnosis_record_created_idx_and_more"),
+        ("reports", "0002_report_report_created_id_idx_and_more"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="report",
+            name="ai_priority",
+            field=models.FloatField(default=0.0),
+        ),
+        migrations.AddField(
+            model_name="report",
+            name="claimed_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="report",
+            name="claimed_by",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="claimed_reports",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="report",
+            index=models.Index(
+                condition=models.Q(("status", "draft")),
+                fields=["-ai_priority", "created_at", "id"],
+                name="report_draft_queue_idx",
+            ),
+        ),
+    ]
@@ -22,6 +22,27 @@ class Report(models.Model):
     content = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
     approved_at = models.DateTimeField(null=True, blank=True)
+    # Radiologist work queue: who is reviewing the draft, since when, and the
+    # highest AI anomaly probability among the patient's images (from ai_results,
+    # 0 until one is scored).
+    claimed_by = models.ForeignKey(
+        User, on_delete=models.SET_NULL, null=True, blank=True, related_name="claimed_reports"
+    )
+    claimed_at = models.DateTimeField(null=True, blank=True)
+    ai_priority = models.FloatField(default=0.0)
+
+    class Meta:
+        # Keyset pagination walks (created_at, id); doctors only see their own reports.
+        # The work queue scans drafts in (ai_priority desc, created_at, id) order.
+        indexes = [
+            models.Index(fields=["created_at", "id"], name="report_created_id_idx"),
+            models.Index(fields=["author", "created_at", "id"], name="report_author_created_idx"),
+            models.Index(
+                fields=["-ai_priority", "created_at", "id"],
+                name="report_draft_queue_idx",
+                condition=models.Q(status="draft"),
+            ),
+        ]
 
     def __str__(self) -> str:
         return f"Report({self.id})"
@@ -18,6 +18,28 @@ class ReportSerializer(serializers.ModelSerializer):
         read_only_fields = ("id", "created_at", "approved_at")
 
 
+class WorkQueueReportSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Report
+        fields = (
+            "id",
+            "medical_record",
+            "author",
+            "status",
+            "content",
+            "created_at",
+            "approved_at",
+            "ai_priority",
+            "claimed_by",
+            "claimed_at",
+        )
+        read_only_fields = fields
+
+
+class ReportClaimSerializer(serializers.Serializer):
+    count = serializers.IntegerField(min_value=1, max_value=50, default=5)
+
+
 class ReportCreateSerializer(serializers.Serializer):
     medical_record_id = serializers.UUIDField()
     content = serializers.CharField()
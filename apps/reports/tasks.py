@@ -0,0 +1,15 @@
+import logging
+
+from celery import shared_task
+
+from apps.reports.work_queue import release_stale_claims
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def release_stale_report_claims() -> int:
+    released = release_stale_claims()
+    if released:
+        logger.info("Released %s stale report claims", released)
+    return released
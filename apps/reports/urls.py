@@ -5,11 +5,15 @@ from apps.reports.views import (
     ReportCreateView,
     ReportDownloadView,
     ReportListView,
+    ReportReleaseView,
+    ReportWorkQueueView,
 )
 
 urlpatterns = [
     path("", ReportListView.as_view(), name="report-list"),
     path("create", ReportCreateView.as_view(), name="report-create"),
+    path("queue", ReportWorkQueueView.as_view(), name="report-queue"),
+    path("<uuid:report_id>/release", ReportReleaseView.as_view(), name="report-release"),
     path("<uuid:report_id>/download", ReportDownloadView.as_view(), name="report-download"),
     path("<uuid:report_id>/approve", ReportApproveView.as_view(), name="report-approve"),
 ]
@@ -1,7 +1,5 @@
 from django.http import HttpResponse
-from django.utils import timezone
 from drf_spectacular.utils import OpenApiResponse, OpenApiTypes, extend_schema
-from guardian.shortcuts import assign_perm
 from rest_framework import status
 from rest_framework.response import Response
 from rest_framework.views import APIView
@@ -14,9 +12,21 @@ from apps.notifications.tasks import send_email_notification
 from apps.reports.models import Report
 from apps.reports.serializers import (
     ReportApproveSerializer,
+    ReportClaimSerializer,
     ReportCreateSerializer,
     ReportSerializer,
+    WorkQueueReportSerializer,
 )
+from apps.reports.work_queue import (
+    approve_draft,
+    claim_next_reports,
+    claimed_reports,
+    is_claimed_by_other,
+    patient_ai_priority,
+    release_claim,
+)
+from curamind_core.pagination import KEYSET_PARAMETERS, KeysetPagination
+from curamind_core.values_serializers import ValuesListMixin
 
 
 def _get_reports_for_user(user):
@@ -45,19 +55,17 @@ def _get_report_for_user(user, report_id: str) -> Report | None:
     )
 
 
-class ReportListView(APIView):
+class ReportListView(ValuesListMixin, APIView):
     serializer_class = ReportSerializer
 
-    @extend_schema(responses=ReportSerializer(many=True))
+    @extend_schema(parameters=KEYSET_PARAMETERS, responses=ReportSerializer(many=True))
     def get(self, request):
         user = request.user
-        reports = _get_reports_for_user(user).select_related(
-            "author",
-            "medical_record__patient__user",
-            "medical_record__doctor__user",
-        )
+        reports = _get_reports_for_user(user)
+        paginator = KeysetPagination(ordering=("-created_at", "-id"))
+        page = paginator.paginate_queryset(reports, request, view=self)
         log_action(user, "report_view", request)
-        return Response(ReportSerializer(reports, many=True).data, status=status.HTTP_200_OK)
+        return paginator.get_paginated_response(self.list_data(ReportSerializer, page))
 
 
 class ReportCreateView(APIView):
@@ -86,10 +94,8 @@ class ReportCreateView(APIView):
             author=request.user,
             content=serializer.validated_data["content"],
             status=Report.Status.DRAFT,
+            ai_priority=patient_ai_priority(record),
         )
-        assign_perm("view_report", request.user, report)
-        assign_perm("change_report", request.user, report)
-        assign_perm("view_report", record.patient.user, report)
         log_action(request.user, "report_create", request, resource_id=str(report.id))
         send_email_notification.delay(
             record.patient.user.email,
@@ -109,16 +115,18 @@ class ReportApproveView(APIView):
         if not report:
             return Response({"detail": "Report not found"}, status=status.HTTP_404_NOT_FOUND)
         if report.status != Report.Status.DRAFT:
-            return Response(
-                {"detail": "Only draft reports can be approved."},
-                status=status.HTTP_400_BAD_REQUEST,
-            )
+            return _not_a_draft()
+        if is_claimed_by_other(report, request.user):
+            return _claimed_by_other()
         serializer = ReportApproveSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         if serializer.validated_data.get("approve"):
-            report.status = Report.Status.APPROVED
-            report.approved_at = timezone.now()
-            report.save(update_fields=["status", "approved_at"])
+            if not approve_draft(report, request.user):
+                # Approved or claimed by someone else since it was read.
+                report.refresh_from_db(fields=["status"])
+                if report.status != Report.Status.DRAFT:
+                    return _not_a_draft()
+                return _claimed_by_other()
             log_action(request.user, "report_approve", request, resource_id=str(report.id))
             send_email_notification.delay(
                 report.medical_record.patient.user.email,
@@ -128,6 +136,53 @@ class ReportApproveView(APIView):
         return Response(ReportSerializer(report).data, status=status.HTTP_200_OK)
 
 
+def _not_a_draft() -> Response:
+    return Response(
+        {"detail": "Only draft reports can be approved."},
+        status=status.HTTP_400_BAD_REQUEST,
+    )
+
+
+def _claimed_by_other() -> Response:
+    return Response(
+        {"detail": "Another radiologist is reviewing this report."},
+        status=status.HTTP_409_CONFLICT,
+    )
+
+
+class ReportWorkQueueView(APIView):
+    """The radiologist's claimed drafts; POST claims the next ``count`` from the queue."""
+
+    permission_classes = [IsRadiologist]
+    serializer_class = WorkQueueReportSerializer
+
+    @extend_schema(responses=WorkQueueReportSerializer(many=True))
+    def get(self, request):
+        reports = claimed_reports(request.user)
+        return Response(WorkQueueReportSerializer(reports, many=True).data)
+
+    @extend_schema(request=ReportClaimSerializer, responses=WorkQueueReportSerializer(many=True))
+    def post(self, request):
+        serializer = ReportClaimSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        claim_next_reports(request.user, serializer.validated_data["count"])
+        reports = claimed_reports(request.user)
+        return Response(WorkQueueReportSerializer(reports, many=True).data)
+
+
+class ReportReleaseView(APIView):
+    permission_classes = [IsRadiologist]
+
+    @extend_schema(request=None, responses={204: None})
+    def post(self, request, report_id: str):
+        if not release_claim(request.user, report_id):
+            return Response(
+                {"detail": "You have no claim on this report."},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
 class ReportDownloadView(APIView):
     @extend_schema(
         responses={
@@ -0,0 +1,141 @@
+"""Radiologist work queue over draft reports.
+
+Radiologists claim the next few drafts instead of all reading one shared list.
+The claim selects candidate rows with ``SELECT ... FOR UPDATE SKIP LOCKED``, so
+concurrent claims take different reports rather than queueing behind each
+other's locks. The highest AI anomaly probability comes first, then the oldest
+draft. A claim lapses after ``REPORT_CLAIM_TTL_SECONDS``. After that the draft
+can be claimed again, and ``release_stale_report_claims`` clears it on the beat
+schedule.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Max, Q, QuerySet
+from django.utils import timezone
+
+from apps.imaging.models import MedicalImage
+from apps.medical_records.models import MedicalRecord
+from apps.reports.models import Report
+
+QUEUE_ORDERING = ("-ai_priority", "created_at", "id")
+
+
+def claim_cutoff() -> datetime:
+    return timezone.now() - timedelta(seconds=settings.REPORT_CLAIM_TTL_SECONDS)
+
+
+def claimable_drafts() -> QuerySet[Report]:
+    return Report.objects.filter(status=Report.Status.DRAFT).filter(
+        Q(claimed_by__isnull=True) | Q(claimed_at__lt=claim_cutoff())
+    )
+
+
+def claimed_reports(user) -> QuerySet[Report]:
+    """Drafts ``user`` holds an active claim on, in queue order."""
+    return (
+        Report.objects.filter(
+            status=Report.Status.DRAFT, claimed_by=user, claimed_at__gte=claim_cutoff()
+        )
+        .select_related("author", "medical_record__patient__user")
+        .order_by(*QUEUE_ORDERING)
+    )
+
+
+def claim_next_reports(user, count: int) -> int:
+    """Claim up to ``count`` more drafts for ``user``; returns how many were claimed."""
+    with transaction.atomic():
+        candidates = list(
+            claimable_drafts()
+            .order_by(*QUEUE_ORDERING)
+            .select_for_update(skip_locked=True)
+            .values_list("id", flat=True)[:count]
+        )
+        # The claimable filter is repeated in the UPDATE, so a row taken between the
+        # two statements (possible on databases without row locks) is not stolen.
+        return (
+            claimable_drafts()
+            .filter(id__in=candidates)
+            .update(claimed_by=user, claimed_at=timezone.now())
+        )
+
+
+def release_claim(user, report_id) -> bool:
+    return bool(
+        Report.objects.filter(id=report_id, claimed_by=user).update(
+            claimed_by=None, claimed_at=None
+        )
+    )
+
+
+def approve_draft(report: Report, user) -> bool:
+    """Approve ``report`` unless it left draft or another radiologist holds an active claim.
+
+    The checks run in the UPDATE itself, so a claim taken after ``report`` was
+    read is never overridden. On success the instance is updated to match.
+    """
+    approved_at = timezone.now()
+    approved = (
+        Report.objects.filter(id=report.id, status=Report.Status.DRAFT)
+        .filter(
+            Q(claimed_by__isnull=True)
+            | Q(claimed_by=user)
+            | Q(claimed_at__isnull=True)
+            | Q(claimed_at__lt=claim_cutoff())
+        )
+        .update(
+            status=Report.Status.APPROVED,
+            approved_at=approved_at,
+            claimed_by=None,
+            claimed_at=None,
+        )
+    )
+    if approved:
+        report.status = Report.Status.APPROVED
+        report.approved_at = approved_at
+        report.claimed_by = None
+        report.claimed_at = None
+    return bool(approved)
+
+
+def is_claimed_by_other(report: Report, user) -> bool:
+    return (
+        report.claimed_by_id is not None
+        and report.claimed_by_id != user.id
+        and report.claimed_at is not None
+        and report.claimed_at >= claim_cutoff()
+    )
+
+
+def release_stale_claims() -> int:
+    return Report.objects.filter(claimed_at__lt=claim_cutoff()).update(
+        claimed_by=None, claimed_at=None
+    )
+
+
+def patient_ai_priority(record: MedicalRecord) -> float:
+    """Highest anomaly probability among the patient's processed images, or 0."""
+    highest = MedicalImage.objects.filter(
+        patient_id=record.patient_id, status=MedicalImage.Status.PROCESSED
+    ).aggregate(highest=Max("ai_anomaly_probability"))["highest"]
+    probabilities = [highest] if highest is not None else []
+    analysis = record.ai_analysis if isinstance(record.ai_analysis, dict) else {}
+    fallback = analysis.get("anomaly_probability")
+    if fallback is not None:
+        probabilities.append(float(fallback))
+    return max(probabilities, default=0.0)
+
+
+def raise_ai_priority(patient_id, probability: float | None) -> int:
+    """Lift the patient's draft reports to ``probability`` if it is their highest yet."""
+    if probability is None:
+        return 0
+    return (
+        Report.objects.filter(status=Report.Status.DRAFT, medical_record__patient_id=patient_id)
+        .filter(ai_priority__lt=probability)
+        .update(ai_priority=probability)
+    )
@@ -1,43 +1,159 @@
 from __future__ import annotations
 
+import asyncio
 from contextlib import asynccontextmanager
+from datetime import datetime, timezone
 import hashlib
+import importlib
 import logging
 import os
+import threading
 import time
 
-from fastapi import FastAPI, File, HTTPException, Request, UploadFile
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI, File, HTTPException, Query, Request, UploadFile
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import ORJSONResponse
 
-from .model import get_model_metadata, predict_image, warmup_model
-from .mongo import check_mongo_connection, ensure_indexes, get_ai_result
+from . import metrics
+from .mongo import (
+    check_mongo_connection,
+    close_client,
+    ensure_indexes,
+    get_ai_result,
+    open_client,
+)
 
 logger = logging.getLogger(__name__)
 MAX_UPLOAD_MB = int(os.getenv("AI_MAX_UPLOAD_MB", "25"))
 MAX_UPLOAD_BYTES = MAX_UPLOAD_MB * 1024 * 1024
+MAX_STUDY_MB = int(os.getenv("AI_MAX_STUDY_MB", "512"))
+MAX_STUDY_BYTES = MAX_STUDY_MB * 1024 * 1024
+MAX_HEATMAP_SIZE = 1024
 SUPPORTED_CONTENT_TYPES = {
     "application/dicom",
     "application/octet-stream",
+    "application/x-npy",
     "image/jpeg",
     "image/jpg",
     "image/png",
 }
+STARTUP_MODE = os.getenv("AI_STARTUP_MODE", "background").strip().lower()
+READY_CACHE_SECONDS = float(os.getenv("AI_READY_CACHE_SECONDS", "5"))
+_ready_cache: dict[str, float | bool] = {}
+_startup: dict[str, object] = {"state": "not_started"}
+_startup_lock = threading.Lock()
 
 
-@asynccontextmanager
-async def lifespan(_app: FastAPI):
+def _model_module():
+    # torch, torchvision, cv2 and pydicom load here, on first use, not at app import.
+    return importlib.import_module(".model", __package__)
+
+
+def get_model_metadata() -> dict[str, object]:
+    return _model_module().get_model_metadata()
+
+
+def warmup_model() -> dict[str, object]:
+    return _model_module().warmup_model()
+
+
+def predict_image(
+    image_bytes: bytes,
+    *,
+    content_type: str | None = None,
+    heatmap_size: int | None = None,
+) -> dict[str, object]:
+    return _model_module().predict_image(
+        image_bytes, content_type=content_type, heatmap_size=heatmap_size
+    )
+
+
+def predict_model_input(
+    payload: bytes,
+    *,
+    frame_count: int | None = None,
+    heatmap_size: int | None = None,
+) -> dict[str, object]:
+    return _model_module().predict_model_input(
+        payload, frame_count=frame_count, heatmap_size=heatmap_size
+    )
+
+
+def predict_study(files: list[bytes], *, heatmap_size: int | None = None) -> dict[str, object]:
+    return _model_module().predict_study(files, heatmap_size=heatmap_size)
+
+
+def _set_startup_state(state: str, **details) -> None:
+    with _startup_lock:
+        _startup.update(state=state, **details)
+
+
+def startup_status() -> dict[str, object]:
+    with _startup_lock:
+        return dict(_startup)
+
+
+def load_model_in_background() -> None:
+    """Import the ML stack and load the model, recording progress for ``/ready``."""
+    started_at = time.perf_counter()
+    _set_startup_state("importing", started_at=datetime.now(timezone.utc).isoformat())
     try:
+        _model_module()
+        _set_startup_state("loading", import_ms=round((time.perf_counter() - started_at) * 1000))
         metadata = warmup_model()
-        logger.info("AI model warmed up: %s", metadata)
-    except Exception:
+    except Exception as exc:
         logger.exception("AI model warmup failed during startup")
+        _set_startup_state("failed", error=str(exc))
+        return
+    _set_startup_state("ready", load_ms=round((time.perf_counter() - started_at) * 1000))
+    logger.info("AI model warmed up: %s", metadata)
+
+
+def start_model_loader() -> bool:
+    """Load the model on a thread unless a load is running or done; return whether one started."""
+    with _startup_lock:
+        if _startup["state"] not in ("not_started", "failed"):
+            return False
+        _startup.pop("error", None)
+        _startup.update(state="importing")
+    threading.Thread(target=load_model_in_background, name="ai-model-startup", daemon=True).start()
+    return True
 
-    if not ensure_indexes():
+
+async def mongo_ready() -> bool:
+    """MongoDB connectivity, re-checked at most every ``AI_READY_CACHE_SECONDS``."""
+    now = time.monotonic()
+    if _ready_cache and float(_ready_cache["expires_at"]) > now:
+        return bool(_ready_cache["mongo_connected"])
+    mongo_connected = await check_mongo_connection()
+    _ready_cache.update(mongo_connected=mongo_connected, expires_at=now + READY_CACHE_SECONDS)
+    return mongo_connected
+
+
+async def initialize_mongo_indexes() -> None:
+    if not await ensure_indexes():
         logger.warning("MongoDB index initialization did not complete successfully")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    open_client()
+    if STARTUP_MODE == "blocking":
+        load_model_in_background()
+        await initialize_mongo_indexes()
+    else:
+        # /health answers while the ML stack imports on a thread and indexes build on the loop.
+        start_model_loader()
+        app.state.mongo_index_task = asyncio.create_task(initialize_mongo_indexes())
     yield
+    close_client()
 
 
-app = FastAPI(title="CuraMind AI Inference Service", lifespan=lifespan)
+app = FastAPI(
+    title="CuraMind AI Inference Service",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
+)
 
 
 @app.get("/health")
@@ -45,14 +161,27 @@ async def health():
     return {"status": "ok", "service": "curamind-ai-inference"}
 
 
+def _require_model_ready() -> dict[str, object]:
+    """Return the startup status, or raise 503 until the background load finishes."""
+    startup = startup_status()
+    if startup["state"] != "ready":
+        # Loading blocks for seconds, so it never runs on the event loop: a load
+        # that failed or never started is restarted on its thread instead.
+        if start_model_loader():
+            startup = startup_status()
+        raise HTTPException(
+            status_code=503,
+            detail={"status": "starting", "service": "curamind-ai-inference", "startup": startup},
+        )
+    return startup
+
+
 @app.get("/ready")
 async def ready():
-    try:
-        model_metadata = warmup_model()
-    except Exception as exc:
-        raise HTTPException(status_code=503, detail="Model warmup failed") from exc
+    startup = _require_model_ready()
+    model_metadata = get_model_metadata()
 
-    mongo_connected = check_mongo_connection()
+    mongo_connected = await mongo_ready()
     if not mongo_connected:
         raise HTTPException(
             status_code=503,
@@ -60,6 +189,7 @@ async def ready():
                 "status": "degraded",
                 "service": "curamind-ai-inference",
                 "mongo_connected": mongo_connected,
+                "startup": startup,
                 **model_metadata,
             },
         )
@@ -68,22 +198,27 @@ async def ready():
         "status": "ready",
         "service": "curamind-ai-inference",
         "mongo_connected": mongo_connected,
+        "startup": startup,
         **model_metadata,
     }
 
 
+@app.get("/metrics")
+async def service_metrics():
+    return metrics.snapshot()
+
+
 @app.get("/model-info")
 async def model_info():
     return {
         **get_model_metadata(),
         "supported_content_types": sorted(SUPPORTED_CONTENT_TYPES),
         "max_upload_mb": MAX_UPLOAD_MB,
+        "max_study_mb": MAX_STUDY_MB,
     }
 
 
-@app.post("/analyze-image")
-async def analyze_image(request: Request, file: UploadFile = File(...)):
-    started_at = time.perf_counter()
+async def _read_upload(file: UploadFile) -> bytes:
     if file.content_type and file.content_type.lower() not in SUPPORTED_CONTENT_TYPES:
         raise HTTPException(status_code=415, detail="Unsupported file type")
     content = await file.read()
@@ -94,8 +229,41 @@ async def analyze_image(request: Request, file: UploadFile = File(...)):
             status_code=413,
             detail=f"File too large. Limit is {MAX_UPLOAD_MB} MB.",
         )
+    return content
+
+
+def _header_int(request: Request, name: str) -> int | None:
     try:
-        result = predict_image(content)
+        return int(request.headers[name])
+    except (KeyError, ValueError):
+        return None
+
+
+@app.post("/analyze-image")
+async def analyze_image(
+    request: Request,
+    file: UploadFile = File(...),
+    heatmap_size: int | None = Query(None, ge=1, le=MAX_HEATMAP_SIZE),
+):
+    _require_model_ready()
+    # Imported here, like the model: utils pulls in cv2 and pydicom.
+    from .utils import NPY_MAGIC
+
+    started_at = time.perf_counter()
+    content = await _read_upload(file)
+    try:
+        # Inference holds the CPU for a while; the loop keeps serving probes meanwhile.
+        if content.startswith(NPY_MAGIC):
+            result = await run_in_threadpool(
+                predict_model_input,
+                content,
+                frame_count=_header_int(request, "X-Source-Frame-Count"),
+                heatmap_size=heatmap_size,
+            )
+        else:
+            result = await run_in_threadpool(
+                predict_image, content, content_type=file.content_type, heatmap_size=heatmap_size
+            )
     except ValueError as exc:
         raise HTTPException(status_code=400, detail=str(exc)) from exc
     duration_ms = round((time.perf_counter() - started_at) * 1000, 2)
@@ -107,7 +275,7 @@ async def analyze_image(request: Request, file: UploadFile = File(...)):
         "input_sha256": input_sha256,
         **({"image_id": image_id} if image_id else {}),
     }
-    return JSONResponse(
+    return ORJSONResponse(
         payload,
         headers={
             "X-Process-Time-Ms": str(duration_ms),
@@ -118,7 +286,38 @@ async def analyze_image(request: Request, file: UploadFile = File(...)):
 
 @app.get("/ai-result")
 async def ai_result(image_id: str):
-    result = get_ai_result(image_id)
+    result = await get_ai_result(image_id)
     if not result:
         raise HTTPException(status_code=404, detail="AI result not found")
     return result
+
+
+@app.post("/analyze-study")
+async def analyze_study(
+    request: Request,
+    files: list[UploadFile] = File(...),
+    heatmap_size: int | None = Query(None, ge=1, le=MAX_HEATMAP_SIZE),
+):
+    _require_model_ready()
+    started_at = time.perf_counter()
+    contents: list[bytes] = []
+    for file in files:
+        contents.append(await _read_upload(file))
+        if sum(len(content) for content in contents) > MAX_STUDY_BYTES:
+            raise HTTPException(
+                status_code=413,
+                detail=f"Study too large. Limit is {MAX_STUDY_MB} MB.",
+            )
+    try:
+        result = await run_in_threadpool(predict_study, contents, heatmap_size=heatmap_size)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    duration_ms = round((time.perf_counter() - started_at) * 1000, 2)
+    study_id = request.headers.get("X-Study-Id", "")
+    payload = {
+        **result,
+        "file_count": len(contents),
+        "service_processing_ms": duration_ms,
+        **({"study_id": study_id} if study_id else {}),
+    }
+    return ORJSONResponse(payload, headers={"X-Process-Time-Ms": str(duration_ms)})
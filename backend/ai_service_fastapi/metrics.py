@@ -0,0 +1,47 @@
+"""In-process counters and timings for the inference service.
+
+Each worker process keeps its own totals; scrape ``GET /metrics`` per
+replica. Recording is lock-protected so threaded decoders can share it.
+"""
+
+from __future__ import annotations
+
+from threading import Lock
+
+_lock = Lock()
+_counters: dict[str, int] = {}
+_timings: dict[str, dict[str, float]] = {}
+
+
+def increment(name: str, amount: int = 1) -> None:
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + amount
+
+
+def observe(name: str, value_ms: float) -> None:
+    with _lock:
+        timing = _timings.setdefault(name, {"count": 0, "total_ms": 0.0, "max_ms": 0.0})
+        timing["count"] += 1
+        timing["total_ms"] += value_ms
+        timing["max_ms"] = max(timing["max_ms"], value_ms)
+
+
+def snapshot() -> dict[str, dict]:
+    with _lock:
+        return {
+            "counters": dict(_counters),
+            "timings": {
+                name: {
+                    "count": int(timing["count"]),
+                    "avg_ms": round(timing["total_ms"] / timing["count"], 3),
+                    "max_ms": round(timing["max_ms"], 3),
+                }
+                for name, timing in _timings.items()
+            },
+        }
+
+
+def reset() -> None:
+    with _lock:
+        _counters.clear()
+        _timings.clear()
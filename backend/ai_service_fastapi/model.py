@@ -1,25 +1,57 @@
 from __future__ import annotations
 
 import os
+import time
+from collections.abc import Callable, Sequence
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
-from threading import Lock
+from pathlib import Path
+from threading import Lock, local
 
+import numpy as np
 import torch
 import torchvision.transforms as T
 from PIL import Image
 from torchvision.models import resnet50
 
 from .model_registry import resolve_model_metadata
-from .utils import create_heatmap, load_image_array
+from .runtime import default_torch_threads
+from .utils import (
+    create_heatmap,
+    encode_cam_heatmap,
+    IMAGENET_MEAN,
+    IMAGENET_STD,
+    encode_array,
+    load_image_frames,
+    load_model_input,
+    model_input_to_rgb,
+    read_dicom_series_info,
+    sample_frame_indices,
+)
+from .weights import load_state_dict, verify_weights
 
 _model = None
 _model_ready_at: str | None = None
+_weights_verified = False
+_warmup_ms: float | None = None
+_cam_enabled = False
+_activations = local()
+_warmup_lock = Lock()
 _model_lock = Lock()
 MODEL_NAME = os.getenv("AI_MODEL_NAME", "resnet50")
 MODEL_VERSION = os.getenv("AI_MODEL_VERSION", "demo-resnet50-v1")
 MODEL_REGISTRY = os.getenv("AI_MODEL_REGISTRY", "")
 MODEL_WEIGHTS_SHA256 = os.getenv("AI_MODEL_WEIGHTS_SHA256", "")
+MODEL_WEIGHTS_PATH = os.getenv("AI_MODEL_WEIGHTS_PATH", "")
 ENV_ANOMALY_THRESHOLD = os.getenv("AI_MODEL_ANOMALY_THRESHOLD", "").strip()
+INFERENCE_BATCH_SIZE = max(1, int(os.getenv("AI_INFERENCE_BATCH_SIZE", "16")))
+FRAME_PREPROCESS_WORKERS = max(1, int(os.getenv("AI_FRAME_PREPROCESS_WORKERS", "4")))
+MAX_FRAMES_PER_SERIES = max(0, int(os.getenv("AI_MAX_FRAMES_PER_SERIES", "256")))
+MODEL_INPUT_SIZE = 224
+TORCH_THREADS = os.getenv("AI_TORCH_THREADS", "").strip()
+TORCH_INTEROP_THREADS = os.getenv("AI_TORCH_INTEROP_THREADS", "").strip()
+WARMUP_BATCH_SIZES = os.getenv("AI_WARMUP_BATCH_SIZES", "").strip()
+FULL_RESOLUTION_HEATMAP = os.getenv("AI_FULL_RESOLUTION_HEATMAP", "false").lower() == "true"
 
 
 def _get_env_anomaly_threshold() -> float | None:
@@ -37,24 +69,102 @@ MODEL_METADATA = resolve_model_metadata(
     env_registry_name=MODEL_REGISTRY,
     env_weights_sha256=MODEL_WEIGHTS_SHA256,
     env_anomaly_threshold=_get_env_anomaly_threshold(),
+    env_weights_path=MODEL_WEIGHTS_PATH,
 )
 _transform = T.Compose(
     [
-        T.Resize((224, 224)),
+        T.Resize((MODEL_INPUT_SIZE, MODEL_INPUT_SIZE)),
         T.ToTensor(),
-        T.Normalize(mean=[0.485, 0.456, 0.406], std=[0.229, 0.224, 0.225]),
+        T.Normalize(mean=IMAGENET_MEAN.tolist(), std=IMAGENET_STD.tolist()),
     ]
 )
 
 
+def _positive_int(value, default: int) -> int:
+    try:
+        return max(1, int(value)) if value not in (None, "") else default
+    except (TypeError, ValueError):
+        return default
+
+
+def _warmup_batch_sizes() -> list[int]:
+    """Batch sizes to pre-run; env wins over the registry, "0" disables warmup passes."""
+    configured = WARMUP_BATCH_SIZES or MODEL_METADATA.get("warmup_batch_sizes")
+    if configured is None or configured == "":
+        configured = [1, INFERENCE_BATCH_SIZE]
+    elif isinstance(configured, str):
+        configured = [size for size in configured.split(",") if size.strip()]
+    sizes = set()
+    for size in configured:
+        try:
+            sizes.add(min(int(size), INFERENCE_BATCH_SIZE))
+        except (TypeError, ValueError):
+            continue
+    return sorted(size for size in sizes if size > 0)
+
+
+# Threads come from env, then the registry, then the cgroup CPU quota split across workers.
+MODEL_METADATA["torch_threads"] = _positive_int(
+    TORCH_THREADS or MODEL_METADATA.get("torch_threads"), default_torch_threads()
+)
+MODEL_METADATA["torch_interop_threads"] = _positive_int(
+    TORCH_INTEROP_THREADS or MODEL_METADATA.get("torch_interop_threads"), 1
+)
+MODEL_METADATA["warmup_batch_sizes"] = _warmup_batch_sizes()
+
+
+def _configure_torch_threads() -> None:
+    torch.set_num_threads(int(MODEL_METADATA["torch_threads"]))
+    try:
+        torch.set_num_interop_threads(int(MODEL_METADATA["torch_interop_threads"]))
+    except RuntimeError:
+        # Interop threads can only be set before the first parallel op in the process.
+        pass
+
+
+def _build_model():
+    """Build the network, loading verified weights when the registry names an artifact.
+
+    Parameters are created on the meta device and then bound to the
+    memory-mapped tensors with ``assign=True``, so no random initialization
+    runs and the weights stay shared with other workers through the page cache.
+    """
+    global _weights_verified
+    _configure_torch_threads()
+    weights_path = str(MODEL_METADATA.get("weights_path") or "")
+    if not weights_path:
+        return resnet50(weights=None)
+    path = Path(weights_path)
+    _weights_verified = verify_weights(path, str(MODEL_METADATA.get("weights_sha256") or ""))
+    state_dict = load_state_dict(path)
+    with torch.device("meta"):
+        model = resnet50(weights=None)
+    model.load_state_dict(state_dict, assign=True)
+    return model
+
+
+def _capture_activations(_module, _inputs, output) -> None:
+    _activations.layer4 = output
+
+
+def _register_cam_hook(model) -> bool:
+    """Capture ``layer4`` output on every forward pass so heatmaps need no second pass."""
+    if getattr(model, "layer4", None) is None or getattr(model, "fc", None) is None:
+        return False
+    model.layer4.register_forward_hook(_capture_activations)
+    return True
+
+
 def _get_model():
     global _model
     global _model_ready_at
+    global _cam_enabled
     if _model is None:
         with _model_lock:
             if _model is None:
-                _model = resnet50(weights=None)
+                _model = _build_model()
                 _model.eval()
+                _cam_enabled = _register_cam_hook(_model)
                 _model_ready_at = datetime.now(timezone.utc).isoformat()
     return _model
 
@@ -62,38 +172,299 @@ def _get_model():
 def get_model_metadata() -> dict[str, object]:
     metadata: dict[str, object] = {
         **MODEL_METADATA,
-        "ready": _model is not None,
+        "ready": _model is not None and _warmup_ms is not None,
+        "weights_verified": _weights_verified,
     }
     if _model_ready_at:
         metadata["ready_at"] = _model_ready_at
+    if _warmup_ms is not None:
+        metadata["warmup_ms"] = _warmup_ms
     return metadata
 
 
 def warmup_model() -> dict[str, object]:
-    _get_model()
+    """Load the model and run synthetic batches once per process; later calls are cached.
+
+    One forward pass per configured batch size settles allocator pools, kernel
+    selection and lazy initialization so the first real request does not pay for them.
+    """
+    global _warmup_ms
+    model = _get_model()
+    if _warmup_ms is None:
+        with _warmup_lock:
+            if _warmup_ms is None:
+                started_at = time.perf_counter()
+                for batch_size in MODEL_METADATA["warmup_batch_sizes"]:
+                    _score_batch(
+                        model,
+                        torch.zeros((batch_size, 3, MODEL_INPUT_SIZE, MODEL_INPUT_SIZE)),
+                    )
+                _warmup_ms = round((time.perf_counter() - started_at) * 1000, 2)
     return get_model_metadata()
 
 
-def predict_image(image_bytes: bytes) -> dict[str, object]:
-    array = load_image_array(image_bytes)
-    image = Image.fromarray(array).convert("RGB")
-    tensor = _transform(image).unsqueeze(0)
-    model = _get_model()
+def _frame_tensor(frame: np.ndarray):
+    return _transform(Image.fromarray(frame).convert("RGB"))
+
+
+def _frame_tensors(frames: list[np.ndarray]) -> list:
+    if len(frames) == 1:
+        return [_frame_tensor(frames[0])]
+    with ThreadPoolExecutor(max_workers=min(FRAME_PREPROCESS_WORKERS, len(frames))) as executor:
+        return list(executor.map(_frame_tensor, frames))
+
+
+def _score_batch(model, batch) -> tuple[list[float], np.ndarray | None]:
+    """Return per-frame anomaly scores and, when hooked, ``(B, h, w)`` class activation maps.
+
+    The maps weight each captured ``layer4`` channel by the ``fc`` weight of the
+    frame's top class (CAM, Zhou et al. 2016), reusing the scoring forward pass.
+    """
+    _activations.layer4 = None
     with torch.no_grad():
-        logits = model(tensor)
-        probs = torch.softmax(logits, dim=1)
-        max_prob = float(probs.max().item())
-    anomaly_probability = float(1.0 - max_prob)
-    heatmap = create_heatmap(array)
+        probs = torch.softmax(model(batch), dim=1)
+        scores = [1.0 - float(value) for value in probs.amax(dim=1).tolist()]
+        features = _activations.layer4 if _cam_enabled else None
+        _activations.layer4 = None
+        if features is None:
+            return scores, None
+        weights = model.fc.weight[probs.argmax(dim=1)]
+        cams = torch.relu(torch.einsum("bc,bchw->bhw", weights, features))
+        return scores, cams.float().numpy()
+
+
+def _score_batches(model, batches) -> tuple[np.ndarray, np.ndarray | None]:
+    scores: list[float] = []
+    cams: list[np.ndarray] = []
+    for batch in batches:
+        batch_scores, batch_cams = _score_batch(model, batch)
+        scores.extend(batch_scores)
+        if batch_cams is not None:
+            cams.append(batch_cams)
+    return np.asarray(scores, dtype=np.float32), np.concatenate(cams) if cams else None
+
+
+def score_frames(frames: list[np.ndarray]) -> tuple[np.ndarray, np.ndarray | None]:
+    """Return one anomaly probability (and CAM, if available) per frame in batches."""
+    model = _get_model()
+    return _score_batches(
+        model,
+        (
+            torch.stack(_frame_tensors(frames[start : start + INFERENCE_BATCH_SIZE]))
+            for start in range(0, len(frames), INFERENCE_BATCH_SIZE)
+        ),
+    )
+
+
+def score_model_input(tensors: np.ndarray) -> tuple[np.ndarray, np.ndarray | None]:
+    """Score an already-normalized ``(frames, 3, H, W)`` tensor without decoding."""
+    model = _get_model()
+    return _score_batches(
+        model,
+        (
+            torch.from_numpy(
+                np.ascontiguousarray(tensors[start : start + INFERENCE_BATCH_SIZE], np.float32)
+            )
+            for start in range(0, len(tensors), INFERENCE_BATCH_SIZE)
+        ),
+    )
+
+
+def _heatmap(
+    cams: np.ndarray | None,
+    index: int,
+    peak_frame: Callable[[], np.ndarray],
+    heatmap_size: int | None,
+) -> dict[str, object]:
+    """Render the peak frame's CAM at its native size unless ``heatmap_size`` asks for more.
+
+    Models without a ``layer4``/``fc`` pair fall back to colormapping the input frame.
+    """
+    if cams is None:
+        return {"heatmap": create_heatmap(peak_frame()), "heatmap_source": "input"}
+    return {
+        "heatmap": encode_cam_heatmap(cams[index], heatmap_size),
+        "heatmap_source": "cam",
+        "heatmap_size": heatmap_size or int(cams.shape[-1]),
+    }
+
+
+def _result_metadata() -> dict[str, object]:
     threshold = float(MODEL_METADATA.get("anomaly_threshold", 0.5))
     return {
-        "anomaly_probability": anomaly_probability,
-        "heatmap": heatmap,
         "anomaly_threshold": threshold,
-        "is_anomalous": anomaly_probability >= threshold,
         "model": MODEL_METADATA["model"],
         "model_version": MODEL_METADATA["model_version"],
         "model_registry": MODEL_METADATA["model_registry"],
         "weights_sha256": MODEL_METADATA["weights_sha256"],
         "device": MODEL_METADATA["device"],
     }
+
+
+def _aggregate_scores(
+    scores: np.ndarray,
+    frame_count: int,
+    *,
+    per_frame: bool = False,
+    frame_indices: Sequence[int] | None = None,
+) -> dict[str, object]:
+    """Summarize frame scores; ``frame_indices`` maps each score to its source frame."""
+    threshold = float(MODEL_METADATA.get("anomaly_threshold", 0.5))
+    anomaly_probability = float(scores.max()) if scores.size else 0.0
+    aggregate: dict[str, object] = {
+        "anomaly_probability": anomaly_probability,
+        "is_anomalous": anomaly_probability >= threshold,
+    }
+    if per_frame or frame_count > 1:
+        aggregate.update(
+            {
+                "frame_count": frame_count,
+                "frames_analyzed": int(scores.size),
+                "mean_anomaly_probability": float(scores.mean()) if scores.size else 0.0,
+                "peak_frame_index": _source_frame_index(scores, frame_indices),
+                "frame_probabilities": encode_array(scores.astype(np.float16)),
+            }
+        )
+    return aggregate
+
+
+def _source_frame_index(scores: np.ndarray, frame_indices: Sequence[int] | None) -> int:
+    peak = int(scores.argmax()) if scores.size else 0
+    if frame_indices is not None and peak < len(frame_indices):
+        return int(frame_indices[peak])
+    return peak
+
+
+def _decode_target_size() -> int | None:
+    """Smallest edge to decode at; ``None`` keeps full size for the input-colormap fallback."""
+    return None if FULL_RESOLUTION_HEATMAP else MODEL_INPUT_SIZE
+
+
+def predict_image(
+    image_bytes: bytes,
+    *,
+    content_type: str | None = None,
+    heatmap_size: int | None = None,
+) -> dict[str, object]:
+    series_info = read_dicom_series_info(image_bytes)
+    if series_info is not None:
+        # Sample from the header's frame count so only the sampled frames are decoded.
+        frame_count = series_info[1]
+        sampled = sample_frame_indices(frame_count, MAX_FRAMES_PER_SERIES)
+        frames = load_image_frames(
+            image_bytes,
+            content_type=content_type,
+            target_size=_decode_target_size(),
+            frame_indices=sampled,
+        )
+    else:
+        frames = load_image_frames(
+            image_bytes, content_type=content_type, target_size=_decode_target_size()
+        )
+        frame_count = len(frames)
+        sampled = sample_frame_indices(frame_count, MAX_FRAMES_PER_SERIES)
+        frames = [frames[index] for index in sampled]
+    scores, cams = score_frames(frames)
+    peak_index = int(scores.argmax()) if scores.size else 0
+    return {
+        **_aggregate_scores(scores, frame_count, frame_indices=sampled),
+        **_heatmap(cams, peak_index, lambda: frames[peak_index], heatmap_size),
+        **_result_metadata(),
+    }
+
+
+def predict_model_input(
+    payload: bytes,
+    *,
+    frame_count: int | None = None,
+    heatmap_size: int | None = None,
+) -> dict[str, object]:
+    """Score a preprocessed ``.npy`` tensor produced by the Django preprocess stage.
+
+    ``frame_count`` is the source frame count when the tensor holds a sample of
+    a larger volume.
+    """
+    tensors = load_model_input(payload)
+    if tensors.shape[2:] != (MODEL_INPUT_SIZE, MODEL_INPUT_SIZE):
+        raise ValueError(f"Model input must be {MODEL_INPUT_SIZE}x{MODEL_INPUT_SIZE} pixels")
+    scores, cams = score_model_input(tensors)
+    peak_index = int(scores.argmax()) if scores.size else 0
+    source_frames = max(frame_count or 0, len(tensors))
+    # The preprocess stage samples with the same evenly spaced indices.
+    sampled = sample_frame_indices(source_frames, len(tensors))
+    return {
+        **_aggregate_scores(scores, source_frames, frame_indices=sampled),
+        **_heatmap(cams, peak_index, lambda: model_input_to_rgb(tensors[peak_index]), heatmap_size),
+        **_result_metadata(),
+    }
+
+
+def _group_study_frames(files: list[bytes]) -> dict[str, list[tuple[int, int]]]:
+    """Map each series to its ``(file position, frame index)`` pairs, from headers alone."""
+    series_frames: dict[str, list[tuple[int, int]]] = {}
+    for position, image_bytes in enumerate(files):
+        series_info = read_dicom_series_info(image_bytes)
+        # Non-DICOM files are single images and form a series of their own.
+        series_uid, frame_count = series_info or ("", 1)
+        series_frames.setdefault(series_uid or f"file-{position}", []).extend(
+            (position, index) for index in range(frame_count)
+        )
+    return series_frames
+
+
+def _decode_study_frames(files: list[bytes], picked: list[tuple[int, int]]) -> list[np.ndarray]:
+    frame_indices: dict[int, list[int]] = {}
+    for position, index in picked:
+        frame_indices.setdefault(position, []).append(index)
+    frames: list[np.ndarray] = []
+    for position, indices in frame_indices.items():
+        frames.extend(
+            load_image_frames(
+                files[position], target_size=_decode_target_size(), frame_indices=indices
+            )
+        )
+    return frames
+
+
+def predict_study(files: list[bytes], *, heatmap_size: int | None = None) -> dict[str, object]:
+    """Score a multi-file study, grouping frames by DICOM series.
+
+    Each series is sampled down to ``AI_MAX_FRAMES_PER_SERIES`` frames so the
+    wall-clock cost of a study stays bounded regardless of slice count. Series
+    are grouped from the DICOM headers and only the sampled frames are decoded.
+    """
+    series_frames = _group_study_frames(files)
+
+    series_results: list[dict[str, object]] = []
+    study_scores: list[np.ndarray] = []
+    peak: tuple[float, dict[str, object]] | None = None
+    for series_uid, members in series_frames.items():
+        sampled = sample_frame_indices(len(members), MAX_FRAMES_PER_SERIES)
+        frames = _decode_study_frames(files, [members[index] for index in sampled])
+        scores, cams = score_frames(frames)
+        study_scores.append(scores)
+        if scores.size and (peak is None or float(scores.max()) > peak[0]):
+            peak_index = int(scores.argmax())
+            peak = (
+                float(scores.max()),
+                _heatmap(cams, peak_index, lambda: frames[peak_index], heatmap_size),
+            )
+        series_results.append(
+            {
+                "series_instance_uid": series_uid,
+                **_aggregate_scores(scores, len(members), per_frame=True, frame_indices=sampled),
+            }
+        )
+
+    all_scores = np.concatenate(study_scores) if study_scores else np.zeros(0, np.float32)
+    total_frames = sum(len(members) for members in series_frames.values())
+    study = _aggregate_scores(all_scores, total_frames, per_frame=True)
+    study.pop("frame_probabilities", None)
+    study.pop("peak_frame_index", None)
+    return {
+        **study,
+        "series_count": len(series_results),
+        "series": series_results,
+        **(peak[1] if peak else {"heatmap": ""}),
+        **_result_metadata(),
+    }
@@ -28,6 +28,7 @@ def resolve_model_metadata(
     env_registry_name: str,
     env_weights_sha256: str,
     env_anomaly_threshold: float | None,
+    env_weights_path: str = "",
 ) -> dict[str, Any]:
     registry = load_model_registry()
     model_entry = registry.get(model_name, {})
@@ -46,13 +47,22 @@ def resolve_model_metadata(
     if anomaly_threshold is None:
         anomaly_threshold = version_entry.get("anomaly_threshold", 0.5)
 
+    weights_path = env_weights_path or version_entry.get("weights_path", "")
+    if weights_path and not env_weights_path:
+        # Registry paths are relative to the registry file, env paths to the working dir.
+        weights_path = str(MODEL_REGISTRY_PATH.parent / weights_path)
+
     return {
         "model": model_name,
         "model_version": resolved_version or requested_version or "unversioned",
         "model_registry": env_registry_name or version_entry.get("model_registry", "custom"),
         "weights_sha256": env_weights_sha256 or version_entry.get("weights_sha256", ""),
+        "weights_path": weights_path,
         "description": version_entry.get("description", ""),
         "anomaly_threshold": float(anomaly_threshold),
         "supported_modalities": version_entry.get("supported_modalities", []),
         "device": version_entry.get("device", "cpu"),
+        "torch_threads": version_entry.get("torch_threads"),
+        "torch_interop_threads": version_entry.get("torch_interop_threads"),
+        "warmup_batch_sizes": version_entry.get("warmup_batch_sizes"),
     }
@@ -1,49 +1,139 @@
 from __future__ import annotations
 
-from functools import lru_cache
 import logging
-
 import os
+import time
 
-from pymongo import MongoClient
+from motor.motor_asyncio import AsyncIOMotorClient
 from pymongo.errors import PyMongoError
 
 MONGO_URI = os.getenv("MONGO_URI", "mongodb://mongodb:27017")
 MONGO_DB = os.getenv("MONGO_DB_NAME", "curamind")
+MONGO_MAX_POOL_SIZE = int(os.getenv("AI_MONGO_MAX_POOL_SIZE", "50"))
+MONGO_MIN_POOL_SIZE = int(os.getenv("AI_MONGO_MIN_POOL_SIZE", "0"))
+MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.getenv("AI_MONGO_SERVER_SELECTION_TIMEOUT_MS", "1000"))
+AI_RESULT_CACHE_SECONDS = float(os.getenv("AI_RESULT_CACHE_SECONDS", "5"))
+# After a failed index build, wait this long before the next attempt, doubling
+# per consecutive failure up to ten times the base delay.
+MONGO_INDEX_RETRY_SECONDS = float(os.getenv("AI_MONGO_INDEX_RETRY_SECONDS", "30"))
 logger = logging.getLogger(__name__)
+_mongo_client: AsyncIOMotorClient | None = None
+_indexes_ready = False
+_index_failures = 0
+_index_retry_at = 0.0
+
+
+class TTLCache:
+    """Small in-process cache whose entries expire ``ttl_seconds`` after being set."""
+
+    def __init__(self, ttl_seconds: float, max_entries: int = 1024):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: dict[str, tuple[float, object]] = {}
+
+    def get(self, key: str) -> object | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= time.monotonic():
+            self._entries.pop(key, None)
+            return None
+        return entry[1]
+
+    def set(self, key: str, value: object) -> None:
+        if self.ttl_seconds <= 0:
+            return
+        if len(self._entries) >= self.max_entries:
+            # Drop the entry closest to expiry; dicts are small enough to scan.
+            self._entries.pop(min(self._entries, key=lambda name: self._entries[name][0]))
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+ai_result_cache = TTLCache(AI_RESULT_CACHE_SECONDS)
 
 
-@lru_cache(maxsize=1)
-def _client() -> MongoClient:
-    return MongoClient(MONGO_URI, serverSelectionTimeoutMS=1000)
+def open_client() -> AsyncIOMotorClient:
+    """Create the shared client; call from the app lifespan, on the serving event loop.
 
+    Motor binds a client to the loop it is first used on, so it is never built
+    at import time or cached across loops.
+    """
+    global _mongo_client
+    if _mongo_client is None:
+        _mongo_client = AsyncIOMotorClient(
+            MONGO_URI,
+            maxPoolSize=MONGO_MAX_POOL_SIZE,
+            minPoolSize=MONGO_MIN_POOL_SIZE,
+            serverSelectionTimeoutMS=MONGO_SERVER_SELECTION_TIMEOUT_MS,
+        )
+    return _mongo_client
 
-@lru_cache(maxsize=1)
-def ensure_indexes() -> bool:
+
+def close_client() -> None:
+    global _mongo_client
+    if _mongo_client is not None:
+        _mongo_client.close()
+        _mongo_client = None
+
+
+def _client() -> AsyncIOMotorClient:
+    if _mongo_client is None:
+        raise RuntimeError("MongoDB client is not open; the app lifespan creates it.")
+    return _mongo_client
+
+
+async def ensure_indexes() -> bool:
+    """Build the indexes once per process; after a failure, retry only once the backoff passes."""
+    global _indexes_ready, _index_failures, _index_retry_at
+    if _indexes_ready:
+        return True
+    if time.monotonic() < _index_retry_at:
+        return False
     try:
         db = _client()[MONGO_DB]
-        db.ai_results.create_index("image_id", unique=True)
-        db.image_metadata.create_index("image_id", unique=True)
-        db.processing_logs.create_index([("image_id", 1), ("_id", 1)])
-        return True
+        await db.ai_results.create_index("image_id", unique=True)
+        await db.image_metadata.create_index("image_id", unique=True)
+        await db.processing_logs.create_index([("image_id", 1), ("_id", 1)])
     except PyMongoError:
-        logger.exception("Failed to ensure MongoDB indexes for FastAPI service")
+        _index_failures += 1
+        delay = min(
+            MONGO_INDEX_RETRY_SECONDS * 2 ** (_index_failures - 1), MONGO_INDEX_RETRY_SECONDS * 10
+        )
+        _index_retry_at = time.monotonic() + delay
+        logger.exception(
+            "Failed to ensure MongoDB indexes for FastAPI service; retrying in %.0f s", delay
+        )
         return False
+    _indexes_ready = True
+    _index_failures = 0
+    return True
 
 
-def get_ai_result(image_id: str):
-    ensure_indexes()
-    doc = _client()[MONGO_DB].ai_results.find_one({"image_id": image_id}, sort=[("updated_at", -1)])
+async def get_ai_result(image_id: str):
+    """Return the stored result for ``image_id``; hits are cached briefly per process."""
+    cached = ai_result_cache.get(image_id)
+    if cached is not None:
+        return cached
+    await ensure_indexes()
+    doc = await _client()[MONGO_DB].ai_results.find_one(
+        {"image_id": image_id}, sort=[("updated_at", -1)]
+    )
     if not doc:
         return None
     doc.pop("_id", None)
-    return doc.get("result")
+    result = doc.get("result")
+    if result:
+        ai_result_cache.set(image_id, result)
+    return result
 
 
-def check_mongo_connection() -> bool:
+async def check_mongo_connection() -> bool:
     try:
-        _client().admin.command("ping")
-        ensure_indexes()
+        await _client().admin.command("ping")
+        await ensure_indexes()
         return True
     except PyMongoError:
         return False
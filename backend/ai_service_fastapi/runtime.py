@@ -0,0 +1,65 @@
+"""CPU budget detection for sizing torch thread pools per worker process.
+
+Containers often see every host core through ``os.cpu_count()`` while the
+cgroup limits them to a fraction; sizing intra-op threads from the host count
+oversubscribes the quota and every forward pass gets throttled.
+"""
+
+from __future__ import annotations
+
+import math
+import os
+from pathlib import Path
+
+CGROUP_ROOT = Path("/sys/fs/cgroup")
+
+
+def _cgroup_v2_quota(root: Path) -> float | None:
+    try:
+        quota, period = (root / "cpu.max").read_text(encoding="utf-8").split()[:2]
+    except (OSError, ValueError):
+        return None
+    if quota == "max":
+        return None
+    return int(quota) / int(period)
+
+
+def _cgroup_v1_quota(root: Path) -> float | None:
+    try:
+        quota = int((root / "cpu" / "cpu.cfs_quota_us").read_text(encoding="utf-8"))
+        period = int((root / "cpu" / "cpu.cfs_period_us").read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    if quota <= 0 or period <= 0:
+        return None
+    return quota / period
+
+
+def cgroup_cpu_quota(root: Path = CGROUP_ROOT) -> float | None:
+    """Return the CPU quota in cores (cgroup v2 or v1), or ``None`` when unlimited."""
+    quota = _cgroup_v2_quota(root)
+    return quota if quota is not None else _cgroup_v1_quota(root)
+
+
+def available_cpus(root: Path = CGROUP_ROOT) -> int:
+    """Cores this process may use: the affinity mask, capped by the cgroup quota."""
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+    quota = cgroup_cpu_quota(root)
+    if quota is not None:
+        cpus = min(cpus, math.ceil(quota))
+    return max(1, cpus)
+
+
+def worker_count() -> int:
+    """Number of uvicorn worker processes sharing the CPU budget."""
+    try:
+        return max(1, int(os.getenv("WEB_CONCURRENCY", "1")))
+    except ValueError:
+        return 1
+
+
+def default_torch_threads(root: Path = CGROUP_ROOT) -> int:
+    return max(1, available_cpus(root) // worker_count())
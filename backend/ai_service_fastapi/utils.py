@@ -1,39 +1,247 @@
 from __future__ import annotations
 
 import base64
+import time
+from collections.abc import Callable, Sequence
 from io import BytesIO
+from typing import Any
 
 import cv2
 import numpy as np
 import pydicom
 from PIL import Image
 
+from . import metrics
 
-def normalize_to_uint8(array: np.ndarray) -> np.ndarray:
-    if array.dtype == np.uint8:
+
+NORMALIZE_CHUNK_PIXELS = 1 << 20
+NPY_MAGIC = b"\x93NUMPY"
+IMAGENET_MEAN = np.array([0.485, 0.456, 0.406], dtype=np.float32)
+IMAGENET_STD = np.array([0.229, 0.224, 0.225], dtype=np.float32)
+
+
+def _window_bounds(
+    window_center: float | None,
+    window_width: float | None,
+) -> tuple[float, float] | None:
+    if window_center is None or window_width is None or window_width <= 0:
+        return None
+    # DICOM PS3.3 C.11.2.1.2 linear VOI function.
+    center = window_center - 0.5
+    width = max(window_width - 1.0, 1e-6)
+    return center - width / 2.0, center + width / 2.0
+
+
+def _scale_in_place(values: np.ndarray, low: float, high: float) -> np.ndarray:
+    values -= low
+    values *= 255.0 / (high - low)
+    return np.clip(values, 0.0, 255.0, out=values)
+
+
+def _normalize_with_lut(
+    array: np.ndarray,
+    bounds: tuple[float, float] | None,
+    rescale_slope: float,
+    rescale_intercept: float,
+) -> np.ndarray:
+    """Map <=16-bit integer pixels through a lookup table built once per call.
+
+    The only full-size allocation is the uint8 output; the LUT holds at most
+    65536 entries regardless of image or volume size.
+    """
+    unsigned_dtype = np.dtype(f"u{array.dtype.itemsize}")
+    indices = np.arange(1 << (8 * array.dtype.itemsize), dtype=unsigned_dtype)
+    values = indices.view(array.dtype).astype(np.float32)
+    values *= rescale_slope
+    values += rescale_intercept
+    if bounds is None:
+        stored_low = float(np.min(array))
+        stored_high = float(np.max(array))
+        mapped = sorted(
+            (
+                stored_low * rescale_slope + rescale_intercept,
+                stored_high * rescale_slope + rescale_intercept,
+            )
+        )
+        if mapped[1] <= mapped[0]:
+            return np.zeros(array.shape, dtype=np.uint8)
+        bounds = (mapped[0], mapped[1])
+    lut = _scale_in_place(values, *bounds).astype(np.uint8)
+    return lut[array.view(unsigned_dtype)]
+
+
+def _normalize_chunked(
+    array: np.ndarray,
+    bounds: tuple[float, float] | None,
+    rescale_slope: float,
+    rescale_intercept: float,
+) -> np.ndarray:
+    if bounds is None:
+        mapped = sorted(
+            (
+                float(np.min(array)) * rescale_slope + rescale_intercept,
+                float(np.max(array)) * rescale_slope + rescale_intercept,
+            )
+        )
+        if mapped[1] <= mapped[0]:
+            return np.zeros(array.shape, dtype=np.uint8)
+        bounds = (mapped[0], mapped[1])
+    source = np.ascontiguousarray(array).reshape(-1)
+    output = np.empty(source.shape, dtype=np.uint8)
+    for start in range(0, source.size, NORMALIZE_CHUNK_PIXELS):
+        chunk = source[start : start + NORMALIZE_CHUNK_PIXELS].astype(np.float32)
+        chunk *= rescale_slope
+        chunk += rescale_intercept
+        output[start : start + chunk.size] = _scale_in_place(chunk, *bounds)
+    return output.reshape(array.shape)
+
+
+def normalize_to_uint8(
+    array: np.ndarray,
+    *,
+    window_center: float | None = None,
+    window_width: float | None = None,
+    rescale_slope: float = 1.0,
+    rescale_intercept: float = 0.0,
+) -> np.ndarray:
+    """Convert raw pixel data to uint8 without full-size float temporaries.
+
+    Integer inputs up to 16 bits go through a lookup table; anything wider is
+    converted in fixed-size chunks. When a DICOM window is given it replaces
+    min/max scaling, and rescale slope/intercept are applied first.
+    """
+    bounds = _window_bounds(window_center, window_width)
+    is_identity = bounds is None and rescale_slope == 1.0 and rescale_intercept == 0.0
+    if array.dtype == np.uint8 and is_identity:
         return array
+    if array.dtype.kind in "ui" and array.dtype.itemsize <= 2:
+        return _normalize_with_lut(array, bounds, rescale_slope, rescale_intercept)
+    return _normalize_chunked(array, bounds, rescale_slope, rescale_intercept)
+
+
+def _first_dicom_number(value) -> float | None:
+    if isinstance(value, Sequence) and not isinstance(value, (str, bytes)):
+        value = value[0] if len(value) else None
+    if value is None or value == "":
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def dicom_display_options(dataset) -> dict[str, Any]:
+    slope = _first_dicom_number(getattr(dataset, "RescaleSlope", None))
+    intercept = _first_dicom_number(getattr(dataset, "RescaleIntercept", None))
+    return {
+        "window_center": _first_dicom_number(getattr(dataset, "WindowCenter", None)),
+        "window_width": _first_dicom_number(getattr(dataset, "WindowWidth", None)),
+        "rescale_slope": 1.0 if slope is None else slope,
+        "rescale_intercept": 0.0 if intercept is None else intercept,
+    }
 
-    float_array = array.astype("float32")
-    min_value = float(np.min(float_array))
-    max_value = float(np.max(float_array))
-    if max_value <= min_value:
-        return np.zeros(float_array.shape, dtype=np.uint8)
-    normalized = (float_array - min_value) / (max_value - min_value)
-    return np.clip(normalized * 255.0, 0, 255).astype("uint8")
 
+def _to_rgb(array: np.ndarray) -> np.ndarray:
+    if array.ndim == 2:
+        return cv2.cvtColor(array, cv2.COLOR_GRAY2RGB)
+    if array.ndim == 3 and array.shape[-1] == 1:
+        return np.repeat(array, 3, axis=2)
+    return array
 
-def load_image_array(image_bytes: bytes) -> np.ndarray:
+
+def _dicom_frame_count(dataset) -> int:
     try:
-        dataset = pydicom.dcmread(BytesIO(image_bytes))
-        array = normalize_to_uint8(dataset.pixel_array)
-        if array.ndim == 2:
-            array = cv2.cvtColor(array, cv2.COLOR_GRAY2RGB)
-        elif array.ndim == 3 and array.shape[-1] == 1:
-            array = np.repeat(array, 3, axis=2)
-        return array
-    except Exception:
-        pass
-    array = cv2.imdecode(np.frombuffer(image_bytes, np.uint8), cv2.IMREAD_COLOR)
+        return max(1, int(getattr(dataset, "NumberOfFrames", 1) or 1))
+    except (TypeError, ValueError):
+        return 1
+
+
+_UNCOMPRESSED_LITTLE_ENDIAN = {"1.2.840.10008.1.2", "1.2.840.10008.1.2.1"}
+
+
+def _reduction_factor(width: int, height: int, target_size: int | None) -> int:
+    """Largest power-of-two downscale (up to 8) keeping both edges >= target_size."""
+    if target_size:
+        for factor in (8, 4, 2):
+            if min(width, height) // factor >= target_size:
+                return factor
+    return 1
+
+
+def _strided_dicom_pixels(dataset, stride: int) -> np.ndarray | None:
+    """Return every ``stride``-th pixel of uncompressed monochrome PixelData without a full decode.
+
+    The result is a view into the raw bytes except when BitsStored is smaller
+    than BitsAllocated, where only the sampled pixels are copied to fix the
+    unused high bits. Returns ``None`` when pydicom must decode the data.
+    """
+    file_meta = getattr(dataset, "file_meta", None)
+    transfer_syntax = str(getattr(file_meta, "TransferSyntaxUID", "") or "")
+    bits_allocated = int(getattr(dataset, "BitsAllocated", 0) or 0)
+    bits_stored = int(getattr(dataset, "BitsStored", bits_allocated) or bits_allocated)
+    samples_per_pixel = int(getattr(dataset, "SamplesPerPixel", 1) or 1)
+    if (
+        transfer_syntax not in _UNCOMPRESSED_LITTLE_ENDIAN
+        or samples_per_pixel != 1
+        or bits_allocated not in (8, 16)
+        or "PixelData" not in dataset
+    ):
+        return None
+    signed = int(getattr(dataset, "PixelRepresentation", 0) or 0) == 1
+    dtype = np.dtype(f"<{'i' if signed else 'u'}{bits_allocated // 8}")
+    shape = (_dicom_frame_count(dataset), int(dataset.Rows), int(dataset.Columns))
+    pixel_count = shape[0] * shape[1] * shape[2]
+    if len(dataset.PixelData) < pixel_count * dtype.itemsize:
+        return None
+    volume = np.frombuffer(dataset.PixelData, dtype=dtype, count=pixel_count).reshape(shape)
+    sampled = volume[:, ::stride, ::stride]
+    if bits_stored < bits_allocated:
+        # Shifting up then back (arithmetic for signed) masks or sign-extends the stored bits.
+        unused_bits = bits_allocated - bits_stored
+        sampled = (sampled << unused_bits) >> unused_bits
+    return sampled
+
+
+def iter_dicom_frames(
+    dataset,
+    *,
+    target_size: int | None = None,
+    frame_indices: Sequence[int] | None = None,
+):
+    """Yield each frame of a DICOM dataset (or those in ``frame_indices``) as RGB uint8.
+
+    Frames are normalized one at a time so a multi-frame CT/MR volume never
+    needs a full-volume float copy. With ``target_size`` frames are sampled
+    with an integer stride so the short edge stays at or above that size.
+    Uncompressed volumes read only the requested frames from the raw bytes.
+    """
+    display_options = dicom_display_options(dataset)
+    rows = int(getattr(dataset, "Rows", 0) or 0)
+    columns = int(getattr(dataset, "Columns", 0) or 0)
+    stride = max(1, min(rows, columns) // target_size) if target_size else 1
+    if stride > 1 or frame_indices is not None:
+        strided = _strided_dicom_pixels(dataset, stride)
+        if strided is not None:
+            for index in range(len(strided)) if frame_indices is None else frame_indices:
+                if index < len(strided):
+                    yield _to_rgb(normalize_to_uint8(strided[index], **display_options))
+            return
+
+    pixel_array = dataset.pixel_array
+    frame_count = _dicom_frame_count(dataset)
+    samples_per_pixel = int(getattr(dataset, "SamplesPerPixel", 1) or 1)
+    is_multi_frame = frame_count > 1 and (
+        pixel_array.ndim == 4 or (pixel_array.ndim == 3 and samples_per_pixel == 1)
+    )
+    frames = pixel_array if is_multi_frame else [pixel_array]
+    for index in range(len(frames)) if frame_indices is None else frame_indices:
+        if index < len(frames):
+            frame = frames[index]
+            yield _to_rgb(normalize_to_uint8(frame[::stride, ::stride], **display_options))
+
+
+def _decode_raster(image_bytes: bytes, flag: int = cv2.IMREAD_COLOR) -> np.ndarray:
+    array = cv2.imdecode(np.frombuffer(image_bytes, np.uint8), flag)
     if array is not None:
         return cv2.cvtColor(array, cv2.COLOR_BGR2RGB)
     try:
@@ -43,6 +251,225 @@ def load_image_array(image_bytes: bytes) -> np.ndarray:
         raise ValueError("Unable to decode image") from exc
 
 
+def read_dicom_dataset(image_bytes: bytes):
+    try:
+        return pydicom.dcmread(BytesIO(image_bytes))
+    except Exception:
+        return None
+
+
+def read_dicom_series_info(image_bytes: bytes) -> tuple[str, int] | None:
+    """Return ``(SeriesInstanceUID, frame count)`` from the header alone, or None if not DICOM.
+
+    Parsing stops before PixelData, so grouping a study by series decodes nothing.
+    """
+    try:
+        header = pydicom.dcmread(BytesIO(image_bytes), stop_before_pixels=True)
+    except Exception:
+        return None
+    return str(getattr(header, "SeriesInstanceUID", "") or ""), _dicom_frame_count(header)
+
+
+_SIGNATURES = (
+    (b"\x89PNG\r\n\x1a\n", "png"),
+    (b"\xff\xd8\xff", "jpeg"),
+    (b"\x00\x00\x00\x0cjP  \r\n\x87\n", "jpeg2000"),
+    (b"\xffO\xffQ", "jpeg2000"),
+    (NPY_MAGIC, "npy"),
+)
+_CONTENT_TYPE_FORMATS = {
+    "application/dicom": "dicom",
+    "image/png": "png",
+    "image/jpeg": "jpeg",
+    "image/jpg": "jpeg",
+    "image/jp2": "jpeg2000",
+    "application/x-npy": "npy",
+}
+
+
+def sniff_format(image_bytes: bytes, content_type: str | None = None) -> str | None:
+    """Identify an upload from its magic bytes, falling back to the declared content type.
+
+    Returns ``None`` when neither is conclusive (e.g. ``application/octet-stream``
+    DICOM without the 128-byte preamble).
+    """
+    if image_bytes[128:132] == b"DICM":
+        return "dicom"
+    for signature, image_format in _SIGNATURES:
+        if image_bytes.startswith(signature):
+            return image_format
+    media_type = (content_type or "").split(";", 1)[0].strip().lower()
+    return _CONTENT_TYPE_FORMATS.get(media_type)
+
+
+ImageDecoder = Callable[[bytes, int | None], list[np.ndarray]]
+DECODERS: dict[str, ImageDecoder] = {}
+
+
+def register_decoder(image_format: str) -> Callable[[ImageDecoder], ImageDecoder]:
+    """Register ``decoder(image_bytes, target_size) -> frames`` for a sniffed format.
+
+    ``target_size`` is the smallest edge the caller needs; decoders may use it
+    to decode at reduced resolution and are free to ignore it.
+    """
+
+    def decorator(decoder: ImageDecoder) -> ImageDecoder:
+        DECODERS[image_format] = decoder
+        return decoder
+
+    return decorator
+
+
+@register_decoder("dicom")
+def _decode_dicom(image_bytes: bytes, target_size: int | None) -> list[np.ndarray]:
+    return _decode_dicom_frames(image_bytes, target_size, None)
+
+
+def _decode_dicom_frames(
+    image_bytes: bytes, target_size: int | None, frame_indices: Sequence[int] | None
+) -> list[np.ndarray]:
+    dataset = read_dicom_dataset(image_bytes)
+    if dataset is None:
+        raise ValueError("Unable to decode DICOM image")
+    return list(iter_dicom_frames(dataset, target_size=target_size, frame_indices=frame_indices))
+
+
+@register_decoder("jpeg")
+def _decode_jpeg(image_bytes: bytes, target_size: int | None) -> list[np.ndarray]:
+    """Decode JPEG, letting libjpeg scale the DCT by 1/2, 1/4 or 1/8 when allowed."""
+    factor = 1
+    if target_size:
+        try:
+            factor = _reduction_factor(*Image.open(BytesIO(image_bytes)).size, target_size)
+        except Exception:
+            factor = 1
+    flag = getattr(cv2, f"IMREAD_REDUCED_COLOR_{factor}") if factor > 1 else cv2.IMREAD_COLOR
+    return [_decode_raster(image_bytes, flag)]
+
+
+@register_decoder("jpeg2000")
+def _decode_jpeg2000(image_bytes: bytes, target_size: int | None) -> list[np.ndarray]:
+    """Decode JPEG 2000, skipping wavelet resolution levels the target does not need."""
+    if target_size:
+        try:
+            image = Image.open(BytesIO(image_bytes))
+            factor = _reduction_factor(*image.size, target_size)
+            if factor > 1:
+                # Jpeg2KImageFile decodes only the requested resolution level on load.
+                setattr(image, "reduce", factor.bit_length() - 1)
+                return [np.array(image.convert("RGB"))]
+        except Exception:
+            pass
+    return [_decode_raster(image_bytes)]
+
+
+@register_decoder("png")
+def _decode_png(image_bytes: bytes, _target_size: int | None) -> list[np.ndarray]:
+    return [_decode_raster(image_bytes)]
+
+
+def _decode_unknown(image_bytes: bytes, target_size: int | None) -> list[np.ndarray]:
+    dataset = read_dicom_dataset(image_bytes)
+    if dataset is not None:
+        try:
+            return list(iter_dicom_frames(dataset, target_size=target_size))
+        except Exception:
+            pass
+    return [_decode_raster(image_bytes)]
+
+
+def load_image_frames(
+    image_bytes: bytes,
+    *,
+    content_type: str | None = None,
+    target_size: int | None = None,
+    frame_indices: Sequence[int] | None = None,
+) -> list[np.ndarray]:
+    """Decode an upload into RGB uint8 frames via the decoder for its sniffed format.
+
+    Unrecognized inputs keep the original DICOM-then-raster fallback chain.
+    ``target_size`` lets decoders work at reduced resolution while keeping the
+    short edge at or above it. ``frame_indices`` keeps only those frames; a
+    DICOM volume then decodes and normalizes nothing else. Decode time is
+    recorded as ``decode.<format>``.
+    """
+    image_format = sniff_format(image_bytes, content_type)
+    decoder = DECODERS.get(image_format or "")
+    metric_name = f"decode.{image_format if decoder else 'unknown'}"
+    started_at = time.perf_counter()
+    try:
+        if image_format == "dicom" and frame_indices is not None:
+            frames = _decode_dicom_frames(image_bytes, target_size, frame_indices)
+        else:
+            frames = (decoder or _decode_unknown)(image_bytes, target_size)
+            if frame_indices is not None:
+                frames = [frames[index] for index in frame_indices if index < len(frames)]
+    except ValueError:
+        metrics.increment(f"{metric_name}.errors")
+        raise
+    except Exception as exc:
+        metrics.increment(f"{metric_name}.errors")
+        raise ValueError("Unable to decode image") from exc
+    metrics.observe(metric_name, (time.perf_counter() - started_at) * 1000)
+    return frames
+
+
+def load_image_array(image_bytes: bytes, *, content_type: str | None = None) -> np.ndarray:
+    return load_image_frames(image_bytes, content_type=content_type)[0]
+
+
+def load_model_input(payload: bytes) -> np.ndarray:
+    """Load a preprocessed ``(frames, 3, height, width)`` float tensor from ``.npy`` bytes."""
+    try:
+        array = np.load(BytesIO(payload), allow_pickle=False)
+    except (ValueError, OSError, EOFError) as exc:
+        raise ValueError("Unable to decode model input array") from exc
+    if array.ndim == 3:
+        array = array[np.newaxis]
+    if array.ndim != 4 or array.shape[1] != 3 or array.dtype.kind != "f":
+        raise ValueError("Model input must be a float array shaped (frames, 3, height, width)")
+    return array
+
+
+def model_input_to_rgb(tensor: np.ndarray) -> np.ndarray:
+    """Undo ImageNet normalization on one ``(3, height, width)`` tensor for display."""
+    rgb = tensor.astype(np.float32).transpose(1, 2, 0) * IMAGENET_STD + IMAGENET_MEAN
+    return np.clip(rgb * 255.0, 0.0, 255.0).round().astype(np.uint8)
+
+
+def sample_frame_indices(frame_count: int, max_frames: int) -> list[int]:
+    if max_frames <= 0 or frame_count <= max_frames:
+        return list(range(frame_count))
+    return sorted({int(index) for index in np.linspace(0, frame_count - 1, max_frames)})
+
+
+def encode_array(array: np.ndarray) -> str:
+    buffer = BytesIO()
+    np.save(buffer, np.ascontiguousarray(array), allow_pickle=False)
+    return base64.b64encode(buffer.getvalue()).decode("ascii")
+
+
+def decode_array(payload: str) -> np.ndarray:
+    return np.load(BytesIO(base64.b64decode(payload)), allow_pickle=False)
+
+
+def encode_cam_heatmap(cam: np.ndarray, size: int | None = None) -> str:
+    """Colormap a class activation map as a base64 PNG.
+
+    The map stays at its native resolution (7x7 for ResNet50 at 224 px) unless
+    ``size`` asks for a bilinear upsample; viewers can scale the small PNG.
+    """
+    peak = float(cam.max()) if cam.size else 0.0
+    scale = 255.0 / peak if peak > 0 else 0.0
+    gray = np.clip(cam * scale, 0, 255).astype(np.uint8)
+    if size and size != gray.shape[-1]:
+        gray = np.asarray(cv2.resize(gray, (size, size), interpolation=cv2.INTER_LINEAR), np.uint8)
+    success, buffer = cv2.imencode(".png", cv2.applyColorMap(gray, cv2.COLORMAP_JET))
+    if not success:
+        return ""
+    return base64.b64encode(buffer.tobytes()).decode("ascii")
+
+
 def create_heatmap(array: np.ndarray) -> str:
     gray = cv2.cvtColor(array, cv2.COLOR_RGB2GRAY)
     heatmap = cv2.applyColorMap(gray, cv2.COLORMAP_JET)
@@ -0,0 +1,91 @@
+"""Verified, memory-mapped loading of model weight artifacts.
+
+Weights are mapped from disk instead of being read into each process, so
+uvicorn workers on one host share the same page-cache pages. The SHA-256
+check is cached in a ``<weights>.sha256`` sidecar keyed on file size and
+modification time, so a restart does not re-hash an unchanged artifact.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+from pathlib import Path
+from typing import Any
+
+logger = logging.getLogger(__name__)
+DIGEST_CHUNK_BYTES = 8 * 1024 * 1024
+
+
+class WeightsVerificationError(RuntimeError):
+    """Raised when a weights artifact does not match its registry checksum."""
+
+
+def digest_cache_path(path: Path) -> Path:
+    return path.with_name(f"{path.name}.sha256")
+
+
+def _file_signature(path: Path) -> dict[str, int]:
+    stat = path.stat()
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def compute_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as handle:
+        for chunk in iter(lambda: handle.read(DIGEST_CHUNK_BYTES), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def cached_sha256(path: Path) -> str:
+    """Return the file digest, reusing the sidecar while size and mtime are unchanged."""
+    signature = _file_signature(path)
+    cache_path = digest_cache_path(path)
+    try:
+        cached = json.loads(cache_path.read_text(encoding="utf-8"))
+        if {key: cached.get(key) for key in signature} == signature and cached.get("sha256"):
+            return str(cached["sha256"])
+    except (OSError, ValueError, AttributeError):
+        pass
+
+    sha256 = compute_sha256(path)
+    try:
+        cache_path.write_text(json.dumps({**signature, "sha256": sha256}), encoding="utf-8")
+    except OSError:
+        logger.info("Weights digest cache %s is not writable; hashing on every start", cache_path)
+    return sha256
+
+
+def verify_weights(path: Path, expected_sha256: str) -> bool:
+    """Check ``path`` against ``expected_sha256``.
+
+    Returns ``False`` when no checksum is configured and raises
+    ``WeightsVerificationError`` on a mismatch.
+    """
+    if not expected_sha256:
+        logger.warning("No weights_sha256 configured for %s; loading unverified weights", path)
+        return False
+    actual_sha256 = cached_sha256(path)
+    if actual_sha256 != expected_sha256.strip().lower():
+        raise WeightsVerificationError(
+            f"Weights checksum mismatch for {path}: expected {expected_sha256}, "
+            f"got {actual_sha256}"
+        )
+    return True
+
+
+def load_state_dict(path: Path) -> dict[str, Any]:
+    """Memory-map a ``torch.save`` state dict onto the CPU."""
+    if path.suffix.lower() == ".safetensors":
+        # safetensors is not a dependency of the service; fail with a clear cause
+        # instead of an ImportError from inside the loader.
+        raise ValueError(
+            f"Unsupported weights format for {path}: save the state dict with torch.save "
+            "(.pt or .pth) instead of safetensors"
+        )
+
+    import torch
+
+    return torch.load(str(path), map_location="cpu", mmap=True, weights_only=True)
@@ -1,6 +1,8 @@
 import os
+import time
 
 from celery import Celery
+from celery.signals import before_task_publish, task_prerun
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "curamind_core.settings")
 
@@ -8,3 +10,26 @@ app = Celery("curamind")
 app.config_from_object("django.conf:settings", namespace="CELERY")
 app.autodiscover_tasks()
 app.conf.broker_connection_retry_on_startup = True
+
+
+@before_task_publish.connect
+def stamp_enqueued_at(headers=None, routing_key=None, **_kwargs):
+    """Tag outgoing messages so workers can measure time spent waiting in the queue."""
+    if headers is None:
+        return
+    from curamind_core.metrics import QUEUE_PUBLISHED_METRIC, increment
+
+    headers["enqueued_at"] = time.time()
+    headers["enqueued_queue"] = routing_key or "default"
+    increment(f"{QUEUE_PUBLISHED_METRIC}.{headers['enqueued_queue']}")
+
+
+@task_prerun.connect
+def record_queue_latency(task=None, **_kwargs):
+    enqueued_at = getattr(task.request, "enqueued_at", None) if task else None
+    if enqueued_at is None:
+        return
+    from curamind_core.metrics import QUEUE_LATENCY_METRIC, observe
+
+    queue = getattr(task.request, "enqueued_queue", None) or "default"
+    observe(f"{QUEUE_LATENCY_METRIC}.{queue}", (time.time() - float(enqueued_at)) * 1000)
@@ -0,0 +1,124 @@
+"""Lightweight cache-backed counters and timings for operational dashboards.
+
+Values live in the shared Django cache (Redis in deployments) so every web
+and worker process contributes to the same totals. Recording never raises:
+metrics are best-effort and must not break the request or task being measured.
+"""
+
+from __future__ import annotations
+
+import logging
+
+from django.core.cache import cache
+from drf_spectacular.utils import OpenApiTypes, extend_schema
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from apps.authentication.permissions import IsAdmin
+
+logger = logging.getLogger(__name__)
+METRICS_KEY_PREFIX = "curamind-metrics"
+METRICS_TTL_SECONDS = 7 * 24 * 60 * 60
+QUEUE_LATENCY_METRIC = "celery.queue_latency_ms"
+QUEUE_PUBLISHED_METRIC = "celery.published"
+CELERY_QUEUE_NAMES = ("imaging-interactive", "imaging-bulk", "notifications", "default")
+AUTHZ_CACHE_HIT_METRIC = "authz.cache_hit"
+AUTHZ_CACHE_MISS_METRIC = "authz.cache_miss"
+IMAGE_SWEEP_RUNS_METRIC = "imaging.sweep.runs"
+IMAGE_SWEEP_REQUEUED_METRIC = "imaging.sweep.requeued"
+IMAGE_SWEEP_ABANDONED_METRIC = "imaging.sweep.abandoned"
+IMAGE_DUPLICATE_SUPPRESSED_METRIC = "imaging.duplicate_suppressed"
+IMAGE_STAGE_SKIPPED_METRIC = "imaging.stage_skipped"
+
+
+def _key(name: str) -> str:
+    return f"{METRICS_KEY_PREFIX}:{name}"
+
+
+def increment(name: str, amount: int = 1) -> None:
+    key = _key(name)
+    try:
+        try:
+            cache.incr(key, amount)
+        except ValueError:
+            # Only the first increment (or one after expiry) creates the counter.
+            cache.add(key, 0, timeout=METRICS_TTL_SECONDS)
+            cache.incr(key, amount)
+    except Exception:
+        logger.debug("Failed to increment metric %s", name, exc_info=True)
+
+
+def observe(name: str, value_ms: float) -> None:
+    """Record one timing sample as a count, a running total and a maximum."""
+    increment(f"{name}:count")
+    increment(f"{name}:total_ms", max(0, round(value_ms)))
+    try:
+        if value_ms > (cache.get(_key(f"{name}:max_ms")) or 0):
+            cache.set(_key(f"{name}:max_ms"), round(value_ms, 2), timeout=METRICS_TTL_SECONDS)
+    except Exception:
+        logger.debug("Failed to update maximum for metric %s", name, exc_info=True)
+
+
+def get_count(name: str) -> int:
+    return int(cache.get(_key(name)) or 0)
+
+
+def timing_snapshot(name: str) -> dict[str, float | int]:
+    count = get_count(f"{name}:count")
+    total_ms = get_count(f"{name}:total_ms")
+    return {
+        "count": count,
+        "avg_ms": round(total_ms / count, 2) if count else 0.0,
+        "max_ms": float(cache.get(_key(f"{name}:max_ms")) or 0.0),
+    }
+
+
+def queue_metrics_snapshot() -> dict[str, dict[str, float | int]]:
+    return {
+        queue: {
+            "published": get_count(f"{QUEUE_PUBLISHED_METRIC}.{queue}"),
+            **timing_snapshot(f"{QUEUE_LATENCY_METRIC}.{queue}"),
+        }
+        for queue in CELERY_QUEUE_NAMES
+    }
+
+
+def authorization_cache_snapshot() -> dict[str, float | int]:
+    hits = get_count(AUTHZ_CACHE_HIT_METRIC)
+    misses = get_count(AUTHZ_CACHE_MISS_METRIC)
+    lookups = hits + misses
+    return {
+        "hits": hits,
+        "misses": misses,
+        "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+    }
+
+
+def image_sweeper_snapshot() -> dict[str, int]:
+    return {
+        "runs": get_count(IMAGE_SWEEP_RUNS_METRIC),
+        "requeued": get_count(IMAGE_SWEEP_REQUEUED_METRIC),
+        "abandoned": get_count(IMAGE_SWEEP_ABANDONED_METRIC),
+    }
+
+
+def image_pipeline_snapshot() -> dict[str, int]:
+    return {
+        "duplicates_suppressed": get_count(IMAGE_DUPLICATE_SUPPRESSED_METRIC),
+        "stages_skipped": get_count(IMAGE_STAGE_SKIPPED_METRIC),
+    }
+
+
+class QueueMetricsView(APIView):
+    permission_classes = [IsAdmin]
+
+    @extend_schema(responses=OpenApiTypes.OBJECT)
+    def get(self, request):
+        return Response(
+            {
+                "queues": queue_metrics_snapshot(),
+                "authorization_cache": authorization_cache_snapshot(),
+                "image_sweeper": image_sweeper_snapshot(),
+                "image_pipeline": image_pipeline_snapshot(),
+            }
+        )
@@ -0,0 +1,52 @@
+"""Object permissions derived from clinical relationships.
+
+A doctor may view and change the medical records they wrote and the reports
+they authored. A patient may view their own records and the reports written
+on them. These grants used to be stored as django-guardian rows, three per
+record or report create, and nothing removed them when the object was
+deleted. Deriving the same grants from the objects' own foreign keys costs no
+writes and follows a record that is reassigned to another doctor. The
+guardian backend stays installed for grants that cannot be derived, such as
+ones made by hand in the admin.
+"""
+
+from __future__ import annotations
+
+from django.contrib.auth.backends import BaseBackend
+
+from apps.medical_records.models import MedicalRecord
+from apps.reports.models import Report
+
+
+def derived_codenames(user, obj) -> set[str]:
+    """Permission codenames ``user`` holds on ``obj`` through its relationships."""
+    if isinstance(obj, MedicalRecord):
+        if obj.doctor.user_id == user.id:
+            return {"view_medicalrecord", "change_medicalrecord"}
+        if obj.patient.user_id == user.id:
+            return {"view_medicalrecord"}
+    elif isinstance(obj, Report):
+        if obj.author_id is not None and obj.author_id == user.id:
+            return {"view_report", "change_report"}
+        if obj.medical_record.patient.user_id == user.id:
+            return {"view_report"}
+    return set()
+
+
+class ClinicalRelationshipBackend(BaseBackend):
+    """Answer object-level ``has_perm`` checks for records and reports without stored rows."""
+
+    def get_all_permissions(self, user_obj, obj=None) -> set[str]:
+        if obj is None or not user_obj.is_active or user_obj.is_anonymous:
+            return set()
+        app_label = obj._meta.app_label
+        return {f"{app_label}.{codename}" for codename in derived_codenames(user_obj, obj)}
+
+    def has_perm(self, user_obj, perm, obj=None) -> bool:
+        if obj is None or not user_obj.is_active or user_obj.is_anonymous:
+            return False
+        # Like guardian, accept both "app_label.codename" and a bare codename.
+        app_label, _, codename = perm.rpartition(".")
+        if app_label and app_label != obj._meta.app_label:
+            return False
+        return codename in derived_codenames(user_obj, obj)
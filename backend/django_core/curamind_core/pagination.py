@@ -0,0 +1,135 @@
+"""Keyset (cursor) pagination for clinical list endpoints.
+
+Pages are selected with ``WHERE (created_at, id) < (:last_created_at, :last_id)``
+instead of ``OFFSET``. Each page costs one index range scan, however deep into
+a patient's history the client has paged. The response body is the plain list
+the endpoints have always returned. The next page is advertised through a
+``Link: <...>; rel="next"`` header and ``X-Next-Cursor``.
+"""
+
+from __future__ import annotations
+
+import base64
+import binascii
+import json
+from typing import Any
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Q, QuerySet
+from drf_spectacular.utils import OpenApiParameter
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+KEYSET_PARAMETERS = [
+    OpenApiParameter(
+        "cursor",
+        str,
+        description="Opaque cursor from the previous page's X-Next-Cursor header.",
+    ),
+    OpenApiParameter("page_size", int, description="Rows per page (capped by API_MAX_PAGE_SIZE)."),
+]
+
+
+def encode_cursor(values: list[Any]) -> str:
+    texts = [value.isoformat() if hasattr(value, "isoformat") else str(value) for value in values]
+    payload = json.dumps(texts, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> list[str]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (binascii.Error, UnicodeError, ValueError) as exc:
+        raise NotFound("Invalid cursor") from exc
+    if not isinstance(values, list) or len(values) != size:
+        raise NotFound("Invalid cursor")
+    return [str(value) for value in values]
+
+
+def cursor_values(queryset: QuerySet, ordering: tuple[str, ...], texts: list[str]) -> list[Any]:
+    """Convert decoded cursor strings with each ordering field's ``to_python()``."""
+    values = []
+    try:
+        for name, text in zip(ordering, texts):
+            field = queryset.model._meta.get_field(name.lstrip("-"))
+            value = field.to_python(text)
+            if value is None:
+                raise ValueError(f"Empty cursor value for {field.name}")
+            values.append(value)
+    except (FieldDoesNotExist, ValidationError, ValueError, TypeError) as exc:
+        raise NotFound("Invalid cursor") from exc
+    return values
+
+
+def _after(ordering: tuple[str, ...], values: list[Any]) -> Q:
+    """Rows strictly after ``values`` in ``ordering``, as a lexicographic keyset filter."""
+    condition = Q()
+    for position in reversed(range(len(ordering))):
+        name = ordering[position].lstrip("-")
+        lookup = "lt" if ordering[position].startswith("-") else "gt"
+        step = Q(**{f"{name}__{lookup}": values[position]})
+        if position < len(ordering) - 1:
+            step |= Q(**{name: values[position]}) & condition
+        condition = step
+    return condition
+
+
+class KeysetPagination(BasePagination):
+    """Forward-only cursor pagination over a unique ``ordering`` (last field is the pk)."""
+
+    cursor_query_param = "cursor"
+    page_size_query_param = "page_size"
+
+    def __init__(self, ordering: tuple[str, ...] = ("-created_at", "-id")):
+        self.ordering = ordering
+        self.page_size = settings.API_PAGE_SIZE
+        self.max_page_size = settings.API_MAX_PAGE_SIZE
+        self.next_cursor: str | None = None
+        self.request = None
+
+    def get_page_size(self, request) -> int:
+        try:
+            requested = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return max(1, min(requested, self.max_page_size))
+
+    def paginate_queryset(self, queryset: QuerySet, request, view=None) -> QuerySet:
+        """Return the page as a queryset so callers can still project it with ``.values()``."""
+        self.request = request
+        page_size = self.get_page_size(request)
+        queryset = queryset.order_by(*self.ordering)
+        cursor = request.query_params.get(self.cursor_query_param)
+        if cursor:
+            texts = decode_cursor(cursor, len(self.ordering))
+            queryset = queryset.filter(
+                _after(self.ordering, cursor_values(queryset, self.ordering, texts))
+            )
+
+        # Only the ordering columns are read for the range scan; the page itself is
+        # then fetched by primary key.
+        fields = [name.lstrip("-") for name in self.ordering]
+        keys = list(queryset.values_list(*fields)[: page_size + 1])
+        if len(keys) > page_size:
+            keys = keys[:page_size]
+            self.next_cursor = encode_cursor(list(keys[-1]))
+        return queryset.filter(pk__in=[key[-1] for key in keys])
+
+    def get_next_link(self) -> str | None:
+        if self.next_cursor is None or self.request is None:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.next_cursor)
+
+    def get_paginated_response(self, data) -> Response:
+        headers = {}
+        next_link = self.get_next_link()
+        if next_link and self.next_cursor is not None:
+            headers["Link"] = f'<{next_link}>; rel="next"'
+            headers["X-Next-Cursor"] = self.next_cursor
+        return Response(data, headers=headers)
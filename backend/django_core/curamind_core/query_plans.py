@@ -0,0 +1,34 @@
+"""Per-serializer query plans.
+
+A serializer that reads related rows states the joins it needs next to its
+fields, and views run their querysets through ``setup_queryset`` before
+serializing. Without that, a nested ``many=True`` field or a dotted ``source``
+issues one query per row, and the view author has to remember which
+relations to load.
+"""
+
+from __future__ import annotations
+
+from django.db.models import QuerySet
+
+
+class QueryPlanMixin:
+    """Declare the ``select_related``/``prefetch_related`` paths a serializer reads."""
+
+    select_related_fields: tuple[str, ...] = ()
+    prefetch_related_fields: tuple[str, ...] = ()
+
+    @classmethod
+    def setup_queryset(cls, queryset: QuerySet) -> QuerySet:
+        if cls.select_related_fields:
+            queryset = queryset.select_related(*cls.select_related_fields)
+        if cls.prefetch_related_fields:
+            queryset = queryset.prefetch_related(*cls.prefetch_related_fields)
+        return queryset
+
+
+def setup_queryset(serializer_class: type, queryset: QuerySet) -> QuerySet:
+    """Apply ``serializer_class``'s query plan, if it declares one."""
+    if issubclass(serializer_class, QueryPlanMixin):
+        return serializer_class.setup_queryset(queryset)
+    return queryset
@@ -0,0 +1,56 @@
+"""orjson-backed JSON renderer and parser for the REST API.
+
+orjson serializes UUID, datetime, date and time values natively and is
+several times faster than the stdlib encoder on large list payloads. Types it
+does not know (Decimal, lazy translation strings, querysets) fall back to
+DRF's encoder, so responses stay compatible with ``JSONRenderer``.
+"""
+
+from __future__ import annotations
+
+import orjson
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser
+from rest_framework.renderers import BaseRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+_fallback_encoder = JSONEncoder()
+ORJSON_OPTIONS = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
+def _default(value):
+    return _fallback_encoder.default(value)
+
+
+class ORJSONRenderer(BaseRenderer):
+    media_type = "application/json"
+    format = "json"
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        options = ORJSON_OPTIONS
+        # Honour "Accept: application/json; indent=N" and the browsable API's pretty output.
+        if self.get_indent(accepted_media_type, renderer_context or {}):
+            options |= orjson.OPT_INDENT_2
+        return orjson.dumps(data, default=_default, option=options)
+
+    def get_indent(self, accepted_media_type, renderer_context) -> bool:
+        if accepted_media_type:
+            for parameter in accepted_media_type.split(";")[1:]:
+                name, _, value = parameter.strip().partition("=")
+                if name == "indent" and value.strip().isdigit():
+                    return int(value) > 0
+        return bool(renderer_context.get("indent"))
+
+
+class ORJSONParser(BaseParser):
+    media_type = "application/json"
+    renderer_class = ORJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError(f"JSON parse error - {exc}") from exc
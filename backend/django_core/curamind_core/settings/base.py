@@ -8,6 +8,7 @@ from datetime import timedelta
 from pathlib import Path
 
 import dj_database_url
+from kombu import Queue
 
 REPO_ROOT = Path(__file__).resolve().parents[4]
 BASE_DIR = Path(__file__).resolve().parents[2]
@@ -42,6 +43,7 @@ INSTALLED_APPS = [
     "apps.reports",
     "apps.audit_logs",
     "apps.notifications",
+    "apps.analytics",
     "apps.portal",
 ]
 
@@ -130,6 +132,7 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 AUTHENTICATION_BACKENDS = (
     "django.contrib.auth.backends.ModelBackend",
+    "curamind_core.object_permissions.ClinicalRelationshipBackend",
     "guardian.backends.ObjectPermissionBackend",
 )
 
@@ -140,6 +143,15 @@ REST_FRAMEWORK = {
         "rest_framework_simplejwt.authentication.JWTAuthentication",
     ),
     "DEFAULT_PERMISSION_CLASSES": ("rest_framework.permissions.IsAuthenticated",),
+    "DEFAULT_RENDERER_CLASSES": (
+        "curamind_core.renderers.ORJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ),
+    "DEFAULT_PARSER_CLASSES": (
+        "curamind_core.renderers.ORJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ),
     "DEFAULT_THROTTLE_CLASSES": (
         "rest_framework.throttling.UserRateThrottle",
         "rest_framework.throttling.AnonRateThrottle",
@@ -151,6 +163,10 @@ REST_FRAMEWORK = {
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
 }
 
+API_PAGE_SIZE = int(os.getenv("API_PAGE_SIZE", "100"))
+API_MAX_PAGE_SIZE = int(os.getenv("API_MAX_PAGE_SIZE", "500"))
+AUTHZ_CACHE_TTL_SECONDS = int(os.getenv("AUTHZ_CACHE_TTL_SECONDS", "60"))
+
 SPECTACULAR_SETTINGS = {
     "TITLE": "CuraMind AI API",
     "DESCRIPTION": "HIPAA-compliant Telehealth & AI Diagnostic Platform",
@@ -201,6 +217,67 @@ CELERY_WORKER_PREFETCH_MULTIPLIER = int(os.getenv("CELERY_WORKER_PREFETCH_MULTIP
 CELERY_WORKER_MAX_TASKS_PER_CHILD = int(os.getenv("CELERY_WORKER_MAX_TASKS_PER_CHILD", "100"))
 CELERY_TASK_SOFT_TIME_LIMIT = int(os.getenv("CELERY_TASK_SOFT_TIME_LIMIT", "240"))
 CELERY_TASK_TIME_LIMIT = int(os.getenv("CELERY_TASK_TIME_LIMIT", "300"))
+# Interactive uploads, bulk re-scoring and e-mail each get a queue so a backfill
+# cannot delay a patient's upload or a notification. Workers started with
+# several -Q queues drain them in the order given (queue_order_strategy).
+CELERY_TASK_DEFAULT_QUEUE = "default"
+CELERY_TASK_QUEUES = (
+    Queue("imaging-interactive"),
+    Queue("imaging-bulk"),
+    Queue("notifications"),
+    Queue("default"),
+)
+CELERY_TASK_ROUTES = {
+    "apps.imaging.tasks.*": {"queue": "imaging-interactive"},
+    "apps.notifications.tasks.*": {"queue": "notifications"},
+}
+CELERY_BROKER_TRANSPORT_OPTIONS = {"queue_order_strategy": "priority"}
+# Run by the celery-beat service. Resets the dashboard counters from the source
+# tables and rebuilds recent upload totals, correcting any missed signal.
+STATS_RECONCILE_INTERVAL_SECONDS = int(os.getenv("STATS_RECONCILE_INTERVAL_SECONDS", "3600"))
+STATS_RECONCILE_DAYS = int(os.getenv("STATS_RECONCILE_DAYS", "14"))
+# A radiologist's claim on a draft report lapses after REPORT_CLAIM_TTL_SECONDS.
+REPORT_CLAIM_TTL_SECONDS = int(os.getenv("REPORT_CLAIM_TTL_SECONDS", "900"))
+# Uploads whose bytes were already scored by this model version reuse that result.
+AI_MODEL_VERSION = os.getenv("AI_MODEL_VERSION", "demo-resnet50-v1")
+# Images left uploaded or processing this long are requeued by the sweeper.
+IMAGE_SWEEP_INTERVAL_SECONDS = int(os.getenv("IMAGE_SWEEP_INTERVAL_SECONDS", "300"))
+IMAGE_STUCK_AFTER_SECONDS = int(os.getenv("IMAGE_STUCK_AFTER_SECONDS", "1800"))
+IMAGE_SWEEP_BATCH_SIZE = int(os.getenv("IMAGE_SWEEP_BATCH_SIZE", "100"))
+IMAGE_SWEEP_MAX_REQUEUES = int(os.getenv("IMAGE_SWEEP_MAX_REQUEUES", "3"))
+# One processing chain per image at a time. Each stage renews the lease, which
+# also has to cover the wait in a backlogged queue before the first stage, so
+# it defaults to twice IMAGE_STUCK_AFTER_SECONDS: the sweeper never requeues an
+# image whose chain is merely waiting, and a dead chain's image is requeued
+# once its lease runs out.
+IMAGE_PROCESSING_LEASE_SECONDS = int(
+    os.getenv("IMAGE_PROCESSING_LEASE_SECONDS", str(2 * IMAGE_STUCK_AFTER_SECONDS))
+)
+# Stored objects left unreferenced this long are deleted with their derived
+# tensor and previews; the grace period lets an upload of the same bytes reuse them.
+STORED_OBJECT_GC_INTERVAL_SECONDS = int(os.getenv("STORED_OBJECT_GC_INTERVAL_SECONDS", "3600"))
+STORED_OBJECT_GC_GRACE_SECONDS = int(os.getenv("STORED_OBJECT_GC_GRACE_SECONDS", "86400"))
+STORED_OBJECT_GC_BATCH_SIZE = int(os.getenv("STORED_OBJECT_GC_BATCH_SIZE", "100"))
+CELERY_BEAT_SCHEDULE = {
+    "reconcile-statistics": {
+        "task": "apps.analytics.tasks.reconcile_statistics",
+        "schedule": STATS_RECONCILE_INTERVAL_SECONDS,
+    },
+    "release-stale-report-claims": {
+        "task": "apps.reports.tasks.release_stale_report_claims",
+        "schedule": 300,
+    },
+    "sweep-stuck-images": {
+        "task": "apps.imaging.tasks.sweep_stuck_images",
+        "schedule": IMAGE_SWEEP_INTERVAL_SECONDS,
+        "options": {"queue": "imaging-bulk"},
+    },
+    "collect-unreferenced-objects": {
+        "task": "apps.imaging.tasks.collect_unreferenced_objects",
+        "schedule": STORED_OBJECT_GC_INTERVAL_SECONDS,
+        "options": {"queue": "imaging-bulk"},
+    },
+}
 
 AWS_ACCESS_KEY_ID = os.getenv("AWS_ACCESS_KEY_ID", "")
 AWS_SECRET_ACCESS_KEY = os.getenv("AWS_SECRET_ACCESS_KEY", "")
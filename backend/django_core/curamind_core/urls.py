@@ -5,6 +5,8 @@ from django.urls import include, path, re_path
 from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView
 
 from curamind_core.health import healthz, readyz
+from curamind_core.metrics import QueueMetricsView
+from apps.analytics.views import StatisticsView
 from apps.appointments.views import (
     AppointmentCancelView,
     AppointmentCreateView,
@@ -18,8 +20,13 @@ from apps.reports.views import (
     ReportCreateView,
     ReportDownloadView,
     ReportListView,
+    ReportReleaseView,
+    ReportWorkQueueView,
 )
 
+# Only well-formed ids reach the report views; anything else is a plain 404.
+REPORT_ID = r"(?P<report_id>[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12})"
+
 admin.site.site_header = "CuraMind AI Control Center"
 admin.site.site_title = "CuraMind AI Admin"
 admin.site.index_title = "Clinical operations and platform management"
@@ -48,17 +55,25 @@ urlpatterns = [
     ),
     re_path(r"^reports/?$", ReportListView.as_view(), name="reports-list"),
     re_path(r"^reports/create/?$", ReportCreateView.as_view(), name="report-create"),
+    re_path(r"^reports/queue/?$", ReportWorkQueueView.as_view(), name="report-queue"),
+    re_path(
+        rf"^reports/{REPORT_ID}/release/?$",
+        ReportReleaseView.as_view(),
+        name="report-release",
+    ),
     re_path(
-        r"^reports/(?P<report_id>[0-9a-f-]+)/download/?$",
+        rf"^reports/{REPORT_ID}/download/?$",
         ReportDownloadView.as_view(),
         name="report-download",
     ),
     re_path(
-        r"^reports/(?P<report_id>[0-9a-f-]+)/approve/?$",
+        rf"^reports/{REPORT_ID}/approve/?$",
         ReportApproveView.as_view(),
         name="report-approve",
     ),
     path("audit-logs", include("apps.audit_logs.urls")),
+    path("ops/queue-metrics", QueueMetricsView.as_view(), name="queue-metrics"),
+    path("ops/stats", StatisticsView.as_view(), name="ops-stats"),
     path("ai/", include("apps.ai_engine.urls")),
     path("upload-image", ImageUploadView.as_view(), name="upload-image"),
     path("patient/records", PatientRecordsView.as_view(), name="patient-records"),
@@ -0,0 +1,146 @@
+"""Read-only list serialization from ``.values()`` rows.
+
+``ModelSerializer(many=True)`` builds a model instance per row and then walks
+every field through ``get_attribute``. For large read-only lists,
+``serialize_values`` reads the serializer's field list once, fetches flat rows
+with ``.values()``, and loads nested reverse relations (diagnoses,
+prescriptions) with one batched query per relation. Each field's own
+``to_representation`` is still applied, so the rendered JSON is
+byte-for-byte the same as the serializer's.
+"""
+
+from __future__ import annotations
+
+from collections import defaultdict
+from typing import Any, Callable
+
+from django.db.models import ForeignObjectRel, QuerySet
+from rest_framework import ISO_8601, serializers
+from rest_framework.settings import api_settings
+
+from curamind_core.query_plans import setup_queryset
+
+
+def _passthrough(value: Any) -> Any:
+    return value
+
+
+def _plan(serializer: serializers.Serializer, model) -> list[tuple[str, str, Any]]:
+    """Return ``(output_name, values_key, field)`` per serializer field, in output order."""
+    plan = []
+    for name, field in serializer.fields.items():
+        if field.write_only:
+            continue
+        source = field.source
+        if source == "*" or "." in source:
+            raise ValueError(f"{type(serializer).__name__}.{name} has no flat column source")
+        model_field = model._meta.get_field(source)
+        if isinstance(field, serializers.ListSerializer):
+            if not isinstance(model_field, ForeignObjectRel):
+                raise ValueError(f"{type(serializer).__name__}.{name} is not a reverse relation")
+            plan.append((name, source, field))
+        elif isinstance(field, serializers.PrimaryKeyRelatedField):
+            plan.append((name, model_field.attname, field))
+        elif isinstance(field, serializers.ModelField):
+            raise ValueError(f"{type(serializer).__name__}.{name} needs a model instance")
+        else:
+            plan.append((name, source, field))
+    return plan
+
+
+def _datetime_converter(field: serializers.DateTimeField) -> Callable[[Any], Any]:
+    output_format = getattr(field, "format", api_settings.DATETIME_FORMAT)
+    field_timezone = field.timezone if hasattr(field, "timezone") else field.default_timezone()
+    if output_format is None or output_format.lower() != ISO_8601 or field_timezone is None:
+        return field.to_representation
+
+    # Same output as DateTimeField.to_representation for aware values, but the
+    # current timezone is looked up once per list instead of once per row.
+    def convert(value):
+        if value.tzinfo is None:
+            return field.to_representation(value)
+        text = value.astimezone(field_timezone).isoformat()
+        return text[:-6] + "Z" if text.endswith("+00:00") else text
+
+    return convert
+
+
+def _converter(field: serializers.Field) -> Callable[[Any], Any]:
+    # PrimaryKeyRelatedField.to_representation expects an object with ``pk``; the
+    # serializer would emit that pk unchanged, which is what ``.values()`` returns.
+    if isinstance(field, serializers.PrimaryKeyRelatedField) and field.pk_field is None:
+        return _passthrough
+    if isinstance(field, serializers.DateTimeField):
+        return _datetime_converter(field)
+    return field.to_representation
+
+
+def _nested_rows(field: serializers.ListSerializer, model, source: str, parent_ids: list) -> dict:
+    relation = model._meta.get_field(source)
+    child_model = relation.related_model
+    parent_key = relation.field.attname
+    grouped: dict[Any, list] = defaultdict(list)
+    rows = serialize_values(
+        type(field.child),
+        child_model.objects.filter(**{f"{parent_key}__in": parent_ids}),
+        extra_values=(parent_key,),
+    )
+    for row in rows:
+        grouped[row.pop(parent_key)].append(row)
+    return grouped
+
+
+def serialize_values(
+    serializer_class: type[serializers.ModelSerializer],
+    queryset: QuerySet,
+    *,
+    extra_values: tuple[str, ...] = (),
+) -> list[dict[str, Any]]:
+    """Serialize ``queryset`` like ``serializer_class(queryset, many=True).data``.
+
+    Supports flat model fields, primary-key relations and nested ``many=True``
+    serializers over reverse foreign keys. Fields that need a model instance
+    (dotted sources, ``SerializerMethodField``) raise ``ValueError``.
+    """
+    model = queryset.model
+    plan = _plan(serializer_class(), model)
+    pk_name = model._meta.pk.attname
+    columns = [
+        key for _name, key, field in plan if not isinstance(field, serializers.ListSerializer)
+    ]
+    rows = list(queryset.values(*dict.fromkeys([*columns, pk_name, *extra_values])))
+    readers: list[tuple[str, str, Callable[[Any], Any] | None]] = []
+    children: dict[str, dict] = {}
+    for name, key, field in plan:
+        if isinstance(field, serializers.ListSerializer):
+            children[name] = _nested_rows(field, model, key, [row[pk_name] for row in rows])
+            readers.append((name, key, None))
+        else:
+            readers.append((name, key, _converter(field)))
+
+    data = []
+    for row in rows:
+        item: dict[str, Any] = {}
+        for name, key, convert in readers:
+            if convert is None:
+                item[name] = children[name].get(row[pk_name], [])
+            else:
+                value = row[key]
+                item[name] = None if value is None else convert(value)
+        for key in extra_values:
+            item[key] = row[key]
+        data.append(item)
+    return data
+
+
+class ValuesListMixin:
+    """Per-view switch between ``serialize_values`` and the regular serializer."""
+
+    use_values_serializer = True
+
+    def list_data(
+        self, serializer_class: type[serializers.ModelSerializer], queryset: QuerySet
+    ) -> list[dict[str, Any]]:
+        if self.use_values_serializer:
+            return serialize_values(serializer_class, queryset)
+        return serializer_class(setup_queryset(serializer_class, queryset), many=True).data
@@ -4,6 +4,7 @@ from dotenv import load_dotenv
 import dj_database_url
 from django.core.exceptions import ImproperlyConfigured
 import os
+import sys
 
 load_dotenv()
 
@@ -12,6 +13,11 @@ load_dotenv()
 # ==============================
 BASE_DIR = Path(__file__).resolve().parent.parent
 
+# Shared API helpers (curamind_core.pagination) live in the main Django project.
+CORE_PROJECT_DIR = BASE_DIR / 'backend' / 'django_core'
+if str(CORE_PROJECT_DIR) not in sys.path:
+    sys.path.insert(0, str(CORE_PROJECT_DIR))
+
 
 # ==============================
 # SECURITY
@@ -201,6 +207,9 @@ REST_FRAMEWORK = {
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 10,
 }
+# Keyset-paginated lists (users/api/appointments/) read these.
+API_PAGE_SIZE = int(os.getenv('API_PAGE_SIZE', '10'))
+API_MAX_PAGE_SIZE = int(os.getenv('API_MAX_PAGE_SIZE', '100'))
 
 
 # ==============================
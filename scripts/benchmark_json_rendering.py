@@ -0,0 +1,120 @@
+"""Compare stdlib and orjson serialization time for typical API payloads.
+
+Covers the FastAPI inference response (a large base64 heatmap plus frame
+probabilities) and DRF list payloads shaped like ``ReportListView`` output,
+both as serializer output (strings) and with native UUID/datetime values.
+
+Usage:
+    python scripts/benchmark_json_rendering.py [--rows 1000] [--repeat 20]
+"""
+
+from __future__ import annotations
+
+import argparse
+import base64
+import os
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Callable
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+DJANGO_DIR = ROOT_DIR / "backend" / "django_core"
+
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+if str(DJANGO_DIR) not in sys.path:
+    sys.path.insert(0, str(DJANGO_DIR))
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "curamind_core.settings")
+
+import django  # noqa: E402
+
+
+def build_payloads(rows: int) -> dict[str, Any]:
+    started_at = datetime(2030, 1, 1, tzinfo=timezone.utc)
+    native_rows = [
+        {
+            "id": uuid.uuid4(),
+            "patient": uuid.uuid4(),
+            "doctor": uuid.uuid4(),
+            "diagnosis": "No acute cardiopulmonary abnormality. " * 4,
+            "status": "final",
+            "created_at": started_at + timedelta(minutes=index),
+            "updated_at": started_at + timedelta(minutes=index, seconds=30),
+        }
+        for index in range(rows)
+    ]
+    serializer_rows = [
+        {
+            key: (
+                value.isoformat().replace("+00:00", "Z") if isinstance(value, datetime) else value
+            )
+            for key, value in row.items()
+        }
+        for row in native_rows
+    ]
+    for row in serializer_rows:
+        for key in ("id", "patient", "doctor"):
+            row[key] = str(row[key])
+    ai_result = {
+        "anomaly_probability": 0.42,
+        "is_anomalous": True,
+        "heatmap": base64.b64encode(os.urandom(3 * 1024 * 1024)).decode("ascii"),
+        "frame_probabilities": base64.b64encode(os.urandom(512)).decode("ascii"),
+        "model": "resnet50",
+        "model_version": "demo-resnet50-v1",
+        "service_processing_ms": 812.4,
+    }
+    return {
+        "AI result (4 MiB heatmap)": ai_result,
+        f"report list x{rows} (serializer output)": serializer_rows,
+        f"report list x{rows} (native UUID/datetime)": native_rows,
+    }
+
+
+def measure(fn: Callable[[Any], bytes], payload: Any, repeat: int) -> tuple[float, int]:
+    best_seconds = float("inf")
+    size = 0
+    for _ in range(repeat):
+        started_at = time.perf_counter()
+        size = len(fn(payload))
+        best_seconds = min(best_seconds, time.perf_counter() - started_at)
+    return best_seconds * 1000, size
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    django.setup()
+    from fastapi.responses import JSONResponse, ORJSONResponse
+    from rest_framework.renderers import JSONRenderer
+
+    from curamind_core.renderers import ORJSONRenderer
+
+    implementations: dict[str, Callable[[Any], bytes]] = {
+        "DRF JSONRenderer": JSONRenderer().render,
+        "ORJSONRenderer": ORJSONRenderer().render,
+        "FastAPI JSONResponse": lambda payload: JSONResponse(payload).body,
+        "FastAPI ORJSONResponse": lambda payload: ORJSONResponse(payload).body,
+    }
+    print(f"{'payload':<46}{'implementation':<24}{'best ms':>10}{'KiB':>10}")
+    for label, payload in build_payloads(args.rows).items():
+        for name, fn in implementations.items():
+            try:
+                elapsed_ms, size = measure(fn, payload, args.repeat)
+            except TypeError:
+                # The stdlib-based FastAPI response cannot encode UUID/datetime values.
+                print(f"{label:<46}{name:<24}{'n/a':>10}{'':>10}")
+                continue
+            print(f"{label:<46}{name:<24}{elapsed_ms:>10.2f}{size / 1024:>10.0f}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
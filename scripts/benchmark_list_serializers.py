@@ -0,0 +1,150 @@
+"""Compare ModelSerializer(many=True) with the ``.values()`` fast path on large lists.
+
+Builds an in-memory SQLite database with ``--rows`` reports, appointments,
+patients and medical records (each record with a diagnosis and a prescription),
+then times both paths per list serializer and checks that the rendered JSON
+is identical.
+
+Usage:
+    python scripts/benchmark_list_serializers.py [--rows 10000] [--repeat 3]
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Callable
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+DJANGO_DIR = ROOT_DIR / "backend" / "django_core"
+
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+if str(DJANGO_DIR) not in sys.path:
+    sys.path.insert(0, str(DJANGO_DIR))
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "curamind_core.settings.test")
+
+import django  # noqa: E402
+
+
+def seed(rows: int) -> None:
+    from apps.appointments.models import Appointment
+    from apps.authentication.models import User
+    from apps.doctors.models import DoctorProfile
+    from apps.medical_records.models import Diagnosis, MedicalRecord, Prescription
+    from apps.patients.models import PatientProfile
+    from apps.reports.models import Report
+
+    doctor_user = User.objects.create_user(
+        email="bench-doctor@example.com", password="StrongPass123", role=User.Role.DOCTOR
+    )
+    doctor = DoctorProfile.objects.create(user=doctor_user, specialty="Radiology")
+    users = User.objects.bulk_create(
+        User(email=f"bench-patient-{index}@example.com", role=User.Role.PATIENT)
+        for index in range(rows)
+    )
+    patients = PatientProfile.objects.bulk_create(
+        PatientProfile(user=user, phone="555-0100", address="1 Main St") for user in users
+    )
+    started_at = datetime(2030, 1, 1, tzinfo=timezone.utc)
+    Appointment.objects.bulk_create(
+        Appointment(
+            patient=patient,
+            doctor=doctor,
+            scheduled_time=started_at + timedelta(minutes=index),
+            reason="Follow-up",
+        )
+        for index, patient in enumerate(patients)
+    )
+    records = MedicalRecord.objects.bulk_create(
+        MedicalRecord(
+            patient=patients[0],
+            doctor=doctor,
+            diagnosis_text="No acute abnormality.",
+            ai_analysis={"anomaly_probability": 0.12},
+        )
+        for _ in range(rows)
+    )
+    Diagnosis.objects.bulk_create(
+        Diagnosis(medical_record=record, text="Normal") for record in records
+    )
+    Prescription.objects.bulk_create(
+        Prescription(medical_record=record, medication_name="None", dosage="-")
+        for record in records
+    )
+    Report.objects.bulk_create(
+        Report(medical_record=record, author=doctor_user, content="Report body " * 20)
+        for record in records
+    )
+
+
+def best_ms(fn: Callable[[], Any], repeat: int) -> tuple[float, Any]:
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        started_at = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - started_at)
+    return best * 1000, result
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    django.setup()
+    from django.core.management import call_command
+    from django.db.models import QuerySet
+    from rest_framework.renderers import JSONRenderer
+    from rest_framework.serializers import ModelSerializer
+
+    from apps.appointments.models import Appointment
+    from apps.appointments.serializers import AppointmentSerializer
+    from apps.medical_records.models import MedicalRecord
+    from apps.medical_records.serializers import MedicalRecordSerializer
+    from apps.patients.models import PatientProfile
+    from apps.patients.serializers import PatientProfileSerializer
+    from apps.reports.models import Report
+    from apps.reports.serializers import ReportSerializer
+    from curamind_core.values_serializers import serialize_values
+
+    call_command("migrate", verbosity=0)
+    seed(args.rows)
+    renderer = JSONRenderer()
+    cases: tuple[tuple[str, type[ModelSerializer], QuerySet], ...] = (
+        ("ReportListView", ReportSerializer, Report.objects.order_by("created_at", "id")),
+        (
+            "PatientRecordsView",
+            MedicalRecordSerializer,
+            MedicalRecord.objects.order_by("-created_at"),
+        ),
+        ("AppointmentCreateView.get", AppointmentSerializer, Appointment.objects.all()),
+        ("DoctorPatientsView", PatientProfileSerializer, PatientProfile.objects.order_by("id")),
+    )
+    print(
+        f"{'view':<28}{'rows':>8}{'serializer ms':>16}{'values ms':>12}{'speedup':>10}{'same':>6}"
+    )
+    for label, serializer_class, queryset in cases:
+        serializer_ms, expected = best_ms(
+            lambda: serializer_class(queryset.all(), many=True).data, args.repeat
+        )
+        values_ms, actual = best_ms(
+            lambda: serialize_values(serializer_class, queryset.all()), args.repeat
+        )
+        same = renderer.render(actual) == renderer.render(expected)
+        print(
+            f"{label:<28}{len(actual):>8}{serializer_ms:>16.1f}{values_ms:>12.1f}"
+            f"{serializer_ms / values_ms:>9.1f}x{'yes' if same else 'NO':>6}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,82 @@
+"""Compare pixel normalization time and peak memory against the previous implementation.
+
+Usage:
+    python scripts/benchmark_normalization.py [--repeat 3]
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable
+
+import numpy as np
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from backend.ai_service_fastapi.utils import normalize_to_uint8  # noqa: E402
+
+
+def legacy_normalize_to_uint8(array: np.ndarray) -> np.ndarray:
+    if array.dtype == np.uint8:
+        return array
+
+    float_array = array.astype("float32")
+    min_value = float(np.min(float_array))
+    max_value = float(np.max(float_array))
+    if max_value <= min_value:
+        return np.zeros(float_array.shape, dtype=np.uint8)
+    normalized = (float_array - min_value) / (max_value - min_value)
+    return np.clip(normalized * 255.0, 0, 255).astype("uint8")
+
+
+def build_inputs() -> dict[str, np.ndarray]:
+    rng = np.random.default_rng(7)
+    return {
+        "uint16 4096x4096": rng.integers(0, 4096, size=(4096, 4096), dtype=np.uint16),
+        "int16 CT 64x512x512": rng.integers(-1024, 3071, size=(64, 512, 512), dtype=np.int16),
+        "float32 2048x2048": rng.random((2048, 2048), dtype=np.float32) * 4000.0,
+    }
+
+
+def measure(fn: Callable[[np.ndarray], np.ndarray], array: np.ndarray, repeat: int):
+    best_seconds = float("inf")
+    peak_bytes = 0
+    for _ in range(repeat):
+        tracemalloc.start()
+        started_at = time.perf_counter()
+        fn(array)
+        best_seconds = min(best_seconds, time.perf_counter() - started_at)
+        peak_bytes = max(peak_bytes, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+    return best_seconds * 1000, peak_bytes / (1024 * 1024)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    implementations: dict[str, Callable[[np.ndarray], np.ndarray]] = {
+        "legacy": legacy_normalize_to_uint8,
+        "current": normalize_to_uint8,
+        "current+window": lambda array: normalize_to_uint8(
+            array, window_center=40.0, window_width=400.0
+        ),
+    }
+    print(f"{'input':<24}{'implementation':<18}{'best ms':>10}{'peak MiB':>12}")
+    for label, array in build_inputs().items():
+        for name, fn in implementations.items():
+            elapsed_ms, peak_mib = measure(fn, array, args.repeat)
+            print(f"{label:<24}{name:<18}{elapsed_ms:>10.1f}{peak_mib:>12.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
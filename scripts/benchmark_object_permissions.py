@@ -0,0 +1,133 @@
+"""Compare stored guardian grants with relationship-derived object permissions.
+
+Builds an in-memory SQLite database and creates ``--rows`` medical records and
+reports twice. The first pass makes the three ``assign_perm`` calls per object
+that the create views used to make. The second pass creates the objects only,
+because ``ClinicalRelationshipBackend`` derives the same grants. The table shows
+creates per second, queries per create and the guardian rows left behind, and
+then times ``has_perm`` checks on both backends.
+
+Usage:
+    python scripts/benchmark_object_permissions.py [--rows 1000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Callable
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+DJANGO_DIR = ROOT_DIR / "backend" / "django_core"
+
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+if str(DJANGO_DIR) not in sys.path:
+    sys.path.insert(0, str(DJANGO_DIR))
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "curamind_core.settings.test")
+
+import django  # noqa: E402
+
+
+def run(rows: int, create: Callable[[], object]) -> tuple[float, float, list]:
+    """Return (creates per second, queries per create, created objects)."""
+    from django.db import connection
+
+    executed = 0
+
+    def count(execute, sql, params, many, context):
+        nonlocal executed
+        executed += 1
+        return execute(sql, params, many, context)
+
+    with connection.execute_wrapper(count):
+        started_at = time.perf_counter()
+        created = [create() for _ in range(rows)]
+        elapsed = time.perf_counter() - started_at
+    return rows / elapsed, executed / rows, created
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1000)
+    args = parser.parse_args()
+
+    django.setup()
+    from django.core.management import call_command
+    from guardian.backends import ObjectPermissionBackend
+    from guardian.models import UserObjectPermission
+    from guardian.shortcuts import assign_perm
+
+    from apps.authentication.models import User
+    from apps.doctors.models import DoctorProfile
+    from apps.medical_records.models import MedicalRecord
+    from apps.patients.models import PatientProfile
+    from apps.reports.models import Report
+    from curamind_core.object_permissions import ClinicalRelationshipBackend
+
+    call_command("migrate", verbosity=0)
+    doctor_user = User.objects.create(email="bench-doctor@example.com", role=User.Role.DOCTOR)
+    doctor = DoctorProfile.objects.create(user=doctor_user, specialty="Radiology")
+    patient_user = User.objects.create(email="bench-patient@example.com", role=User.Role.PATIENT)
+    patient = PatientProfile.objects.create(user=patient_user)
+
+    def create_record() -> MedicalRecord:
+        return MedicalRecord.objects.create(patient=patient, doctor=doctor, diagnosis_text="Ok")
+
+    def create_record_with_grants() -> MedicalRecord:
+        record = create_record()
+        assign_perm("view_medicalrecord", doctor_user, record)
+        assign_perm("change_medicalrecord", doctor_user, record)
+        assign_perm("view_medicalrecord", patient_user, record)
+        return record
+
+    record = create_record()
+
+    def create_report() -> Report:
+        return Report.objects.create(medical_record=record, author=doctor_user, content="Body")
+
+    def create_report_with_grants() -> Report:
+        report = create_report()
+        assign_perm("view_report", doctor_user, report)
+        assign_perm("change_report", doctor_user, report)
+        assign_perm("view_report", patient_user, report)
+        return report
+
+    print(f"{'create':<16}{'permissions':<14}{'per sec':>10}{'queries':>10}{'rows left':>11}")
+    stored: list = []
+    for label, with_grants, derived in (
+        ("medical record", create_record_with_grants, create_record),
+        ("report", create_report_with_grants, create_report),
+    ):
+        for mode, create in (("guardian", with_grants), ("derived", derived)):
+            before = UserObjectPermission.objects.count()
+            rate, queries, created = run(args.rows, create)
+            left = UserObjectPermission.objects.count() - before
+            if mode == "guardian":
+                stored = created
+            print(f"{label:<16}{mode:<14}{rate:>10.0f}{queries:>10.1f}{left:>11}")
+
+    # has_perm on the reports created with grants; both backends must agree.
+    reports = list(
+        Report.objects.select_related("medical_record__patient").filter(
+            id__in=[report.id for report in stored]
+        )
+    )
+    print(f"\n{'has_perm':<30}{'per sec':>10}{'allowed':>10}")
+    for mode, backend in (
+        ("guardian", ObjectPermissionBackend()),
+        ("derived", ClinicalRelationshipBackend()),
+    ):
+        started_at = time.perf_counter()
+        allowed = sum(backend.has_perm(patient_user, "reports.view_report", r) for r in reports)
+        elapsed = time.perf_counter() - started_at
+        print(f"{mode:<30}{len(reports) / elapsed:>10.0f}{allowed:>10}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
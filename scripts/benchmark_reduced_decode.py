@@ -0,0 +1,152 @@
+"""Compare full-resolution and reduced-resolution decode latency and peak RSS per input size.
+
+Each measurement runs in a fresh interpreter so ``ru_maxrss`` reflects only
+that decode. Inputs are synthetic JPEG, JPEG 2000, and uncompressed 16-bit
+DICOM files, written by a separate child so the parent's peak RSS (which
+Linux carries across fork) stays small.
+
+Usage:
+    python scripts/benchmark_reduced_decode.py [--sizes 1024,2048,4096] [--repeat 3]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from io import BytesIO
+from pathlib import Path
+
+import numpy as np
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from backend.ai_service_fastapi.utils import load_image_frames  # noqa: E402
+
+MODEL_INPUT_SIZE = 224
+
+
+def _raster_pixels(size: int) -> np.ndarray:
+    # A smooth gradient compresses like a real radiograph rather than noise.
+    ramp = np.linspace(0, 255, size, dtype=np.float32)
+    gray = (ramp[np.newaxis, :] * 0.5 + ramp[:, np.newaxis] * 0.5).astype(np.uint8)
+    return np.repeat(gray[:, :, np.newaxis], 3, axis=2)
+
+
+def _encode_pil(size: int, pil_format: str) -> bytes:
+    from PIL import Image
+
+    buffer = BytesIO()
+    Image.fromarray(_raster_pixels(size)).save(buffer, format=pil_format)
+    return buffer.getvalue()
+
+
+def _encode_dicom(size: int) -> bytes:
+    from pydicom.dataset import FileDataset, FileMetaDataset
+    from pydicom.uid import ExplicitVRLittleEndian, SecondaryCaptureImageStorage, generate_uid
+
+    file_meta = FileMetaDataset()
+    file_meta.MediaStorageSOPClassUID = SecondaryCaptureImageStorage
+    file_meta.MediaStorageSOPInstanceUID = generate_uid()
+    file_meta.TransferSyntaxUID = ExplicitVRLittleEndian
+    dataset = FileDataset("benchmark.dcm", {}, file_meta=file_meta, preamble=b"\0" * 128)
+    dataset.Rows = dataset.Columns = size
+    dataset.SamplesPerPixel = 1
+    dataset.PhotometricInterpretation = "MONOCHROME2"
+    dataset.PixelRepresentation = 0
+    dataset.BitsAllocated, dataset.BitsStored, dataset.HighBit = 16, 12, 11
+    dataset.WindowCenter, dataset.WindowWidth = 2048, 4096
+    dataset.PixelData = (_raster_pixels(size)[:, :, 0].astype(np.uint16) * 16).tobytes()
+    buffer = BytesIO()
+    dataset.save_as(buffer, write_like_original=False)
+    return buffer.getvalue()
+
+
+ENCODERS = {
+    "jpeg": lambda size: _encode_pil(size, "JPEG"),
+    "jpeg2000": lambda size: _encode_pil(size, "JPEG2000"),
+    "dicom": _encode_dicom,
+}
+
+
+def run_child(path: Path, mode: str, repeat: int) -> int:
+    image_bytes = path.read_bytes()
+    target_size = MODEL_INPUT_SIZE if mode == "reduced" else None
+    baseline_kib = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    best_seconds = float("inf")
+    shape: tuple[int, ...] = ()
+    for _ in range(repeat):
+        started_at = time.perf_counter()
+        frames = load_image_frames(image_bytes, target_size=target_size)
+        best_seconds = min(best_seconds, time.perf_counter() - started_at)
+        shape = frames[0].shape
+        del frames
+    peak_kib = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(
+        json.dumps(
+            {
+                "best_ms": best_seconds * 1000,
+                "peak_mib": peak_kib / 1024,
+                "delta_mib": max(0, peak_kib - baseline_kib) / 1024,
+                "shape": "x".join(str(edge) for edge in shape[:2]),
+            }
+        )
+    )
+    return 0
+
+
+def write_inputs(work_dir: Path, sizes: list[int]) -> int:
+    for fmt, encode in ENCODERS.items():
+        for size in sizes:
+            (work_dir / f"{fmt}-{size}").write_bytes(encode(size))
+    return 0
+
+
+def _run(*arguments: str) -> str:
+    return subprocess.run(
+        [sys.executable, __file__, *arguments], check=True, capture_output=True, text=True
+    ).stdout
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", default="1024,2048,4096")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--child", nargs=2, metavar=("PATH", "MODE"), help=argparse.SUPPRESS)
+    parser.add_argument("--write-inputs", metavar="DIR", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    sizes = [int(size) for size in args.sizes.split(",") if size.strip()]
+    if args.child:
+        return run_child(Path(args.child[0]), args.child[1], args.repeat)
+    if args.write_inputs:
+        return write_inputs(Path(args.write_inputs), sizes)
+
+    print(
+        f"{'input':<22}{'mode':<10}{'decoded':>12}{'best ms':>10}"
+        f"{'peak MiB':>11}{'decode MiB':>12}"
+    )
+    with tempfile.TemporaryDirectory() as work_dir:
+        _run("--sizes", args.sizes, "--write-inputs", work_dir)
+        for fmt in ENCODERS:
+            for size in sizes:
+                path = Path(work_dir) / f"{fmt}-{size}"
+                for mode in ("full", "reduced"):
+                    output = _run("--repeat", str(args.repeat), "--child", str(path), mode)
+                    result = json.loads(output.strip().splitlines()[-1])
+                    print(
+                        f"{f'{fmt} {size}x{size}':<22}{mode:<10}{result['shape']:>12}"
+                        f"{result['best_ms']:>10.1f}{result['peak_mib']:>11.1f}"
+                        f"{result['delta_mib']:>12.1f}"
+                    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,196 @@
+"""Profile AI service startup: import cost and time until /health and model readiness.
+
+The import profile comes from ``python -X importtime`` for the app module and
+the model module, listing the slowest direct imports of each. The timeline starts
+uvicorn in each startup mode and polls ``/health`` and ``/ready``. Readiness
+counts as reached once the model has loaded, even if MongoDB is unreachable.
+It then times the first and second ``/analyze-image`` requests so warmup
+regressions show up as a gap between the two.
+
+Usage:
+    python scripts/benchmark_startup.py [--top 10] [--modes background,blocking] [--json]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+import uuid
+from io import BytesIO
+from pathlib import Path
+from urllib.error import HTTPError, URLError
+from urllib.request import Request, urlopen
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+APP_MODULE = "backend.ai_service_fastapi.main"
+MODEL_MODULE = "backend.ai_service_fastapi.model"
+
+
+def import_profile(module: str) -> tuple[float, list[tuple[str, float]]]:
+    """Return ``(total_ms, [(direct_import, cumulative_ms), ...])`` for one import."""
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    # Children are printed before their parent, indented two spaces per level.
+    children: list[tuple[str, float]] = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _self_us, cumulative_us, name = line[len("import time:") :].split("|", 2)
+        depth = (len(name) - len(name.lstrip(" ")) - 1) // 2
+        cumulative_ms = int(cumulative_us) / 1000
+        if depth == 1:
+            children.append((name.strip(), cumulative_ms))
+        elif depth == 0:
+            if name.strip() == module:
+                return cumulative_ms, sorted(children, key=lambda item: item[1], reverse=True)
+            children = []
+    return 0.0, []
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _get(url: str) -> tuple[int, dict]:
+    try:
+        with urlopen(url, timeout=5) as response:
+            return response.status, json.loads(response.read())
+    except HTTPError as exc:
+        return exc.code, json.loads(exc.read() or b"{}")
+
+
+def _sample_png() -> bytes:
+    import numpy as np
+    from PIL import Image
+
+    ramp = np.linspace(0, 255, 512, dtype=np.uint8)
+    buffer = BytesIO()
+    Image.fromarray(np.tile(ramp, (512, 1))).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def _timed_analyze(url: str, image_bytes: bytes) -> float:
+    boundary = uuid.uuid4().hex
+    body = (
+        (
+            f"--{boundary}\r\n"
+            'Content-Disposition: form-data; name="file"; filename="sample.png"\r\n'
+            "Content-Type: image/png\r\n\r\n"
+        ).encode()
+        + image_bytes
+        + f"\r\n--{boundary}--\r\n".encode()
+    )
+    request = Request(
+        url,
+        data=body,
+        headers={"Content-Type": f"multipart/form-data; boundary={boundary}"},
+    )
+    started_at = time.perf_counter()
+    with urlopen(request, timeout=120) as response:
+        response.read()
+    return (time.perf_counter() - started_at) * 1000
+
+
+def _startup_state(body: dict) -> str:
+    detail = body.get("detail") if isinstance(body.get("detail"), dict) else body
+    return str((detail or {}).get("startup", {}).get("state", ""))
+
+
+def startup_timeline(mode: str, timeout: float) -> dict[str, float | None]:
+    port = _free_port()
+    env = {**os.environ, "AI_STARTUP_MODE": mode}
+    started_at = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", f"{APP_MODULE}:app", "--port", str(port)],
+        cwd=ROOT_DIR,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    timeline: dict[str, float | None] = {
+        "health_ms": None,
+        "ready_ms": None,
+        "first_request_ms": None,
+        "second_request_ms": None,
+    }
+    try:
+        while time.perf_counter() - started_at < timeout:
+            try:
+                if timeline["health_ms"] is None:
+                    status, _body = _get(f"http://127.0.0.1:{port}/health")
+                    if status == 200:
+                        timeline["health_ms"] = (time.perf_counter() - started_at) * 1000
+                status, body = _get(f"http://127.0.0.1:{port}/ready")
+                if _startup_state(body) in ("ready", "failed"):
+                    timeline["ready_ms"] = (time.perf_counter() - started_at) * 1000
+                    image_bytes = _sample_png()
+                    analyze_url = f"http://127.0.0.1:{port}/analyze-image"
+                    timeline["first_request_ms"] = _timed_analyze(analyze_url, image_bytes)
+                    timeline["second_request_ms"] = _timed_analyze(analyze_url, image_bytes)
+                    break
+            except (URLError, ConnectionError, OSError, ValueError):
+                pass
+            time.sleep(0.05)
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+    return timeline
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--modes", default="background,blocking")
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--json", action="store_true", help="Print one JSON document")
+    args = parser.parse_args()
+
+    profiles = {module: import_profile(module) for module in (APP_MODULE, MODEL_MODULE)}
+    timelines = {
+        mode: startup_timeline(mode, args.timeout) for mode in args.modes.split(",") if mode.strip()
+    }
+    if args.json:
+        print(
+            json.dumps(
+                {
+                    "imports": {
+                        module: {"total_ms": total, "top": dict(top[: args.top])}
+                        for module, (total, top) in profiles.items()
+                    },
+                    "startup": timelines,
+                }
+            )
+        )
+        return 0
+
+    for module, (total_ms, top) in profiles.items():
+        print(f"import {module}: {total_ms:.1f} ms")
+        for name, cumulative_ms in top[: args.top]:
+            print(f"  {name:<40}{cumulative_ms:>10.1f}")
+    columns = ("health_ms", "ready_ms", "first_request_ms", "second_request_ms")
+    print(
+        f"\n{'startup mode':<16}{'/health ms':>12}{'model ready ms':>16}"
+        f"{'1st request ms':>16}{'2nd request ms':>16}"
+    )
+    for mode, timeline in timelines.items():
+        cells = [
+            f"{timeline[column]:.0f}" if timeline[column] is not None else "-" for column in columns
+        ]
+        print(f"{mode:<16}{cells[0]:>12}{cells[1]:>16}{cells[2]:>16}{cells[3]:>16}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
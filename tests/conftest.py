@@ -2,6 +2,8 @@ import os
 import sys
 from pathlib import Path
 
+import pytest
+
 ROOT_DIR = Path(__file__).resolve().parents[1]
 DJANGO_DIR = ROOT_DIR / "backend" / "django_core"
 
@@ -11,3 +13,10 @@ if str(DJANGO_DIR) not in sys.path:
     sys.path.insert(0, str(DJANGO_DIR))
 
 os.environ.setdefault("CELERY_TASK_ALWAYS_EAGER", "True")
+
+
+@pytest.fixture(autouse=True)
+def media_root(settings, tmp_path):
+    # Local-storage uploads, previews and tensors stay out of the checkout.
+    settings.MEDIA_ROOT = tmp_path / "media"
+    return settings.MEDIA_ROOT
@@ -0,0 +1,127 @@
+import pytest
+from django.test import Client
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.analytics.models import DailyActivity, StatCounter
+from apps.analytics.tasks import reconcile_statistics
+from apps.appointments.models import Appointment
+from apps.authentication.models import User
+from apps.doctors.models import DoctorProfile
+from apps.imaging.models import MedicalImage
+from apps.patients.models import PatientProfile
+
+
+def _image(patient: PatientProfile) -> MedicalImage:
+    return MedicalImage.objects.create(
+        patient=patient,
+        uploaded_by=patient.user,
+        file_name="scan.png",
+        s3_key="medical-images/scan.png",
+        modality="CT",
+        content_type="image/png",
+        file_size=123,
+        metadata={},
+    )
+
+
+@pytest.fixture
+def admin_user():
+    return User.objects.create_user(
+        email="stats-admin@example.com",
+        password="StrongPass123",
+        role=User.Role.ADMIN,
+        is_staff=True,
+    )
+
+
+@pytest.mark.django_db
+def test_counters_and_activity_follow_committed_writes(django_capture_on_commit_callbacks):
+    with django_capture_on_commit_callbacks(execute=True):
+        admin_user = User.objects.create(
+            email="stats-admin@example.com", role=User.Role.ADMIN, is_staff=True
+        )
+        patient = PatientProfile.objects.create(
+            user=User.objects.create(email="stats-patient@example.com", role=User.Role.PATIENT)
+        )
+        doctor = DoctorProfile.objects.create(
+            user=User.objects.create(email="stats-doctor@example.com", role=User.Role.DOCTOR),
+            specialty="Radiology",
+        )
+        Appointment.objects.create(
+            patient=patient, doctor=doctor, scheduled_time="2030-01-01T10:00:00Z"
+        )
+        processed, failed, removed = _image(patient), _image(patient), _image(patient)
+    with django_capture_on_commit_callbacks(execute=True):
+        processed.ai_is_anomalous = True
+        processed.status = MedicalImage.Status.PROCESSED
+        processed.save(update_fields=["ai_is_anomalous", "status"])
+        # Saving again without a status change is not another processed image.
+        processed.save(update_fields=["ai_is_anomalous", "status"])
+        failed.status = MedicalImage.Status.FAILED
+        failed.save(update_fields=["status"])
+        removed.delete()
+
+    client = APIClient()
+    client.force_authenticate(user=admin_user)
+    response = client.get("/ops/stats", {"days": 3})
+
+    assert response.status_code == 200
+    assert response.data["counters"] == {
+        "users": 3,
+        "appointments": 1,
+        "medical_records": 0,
+        "reports": 0,
+        "images": 2,
+    }
+    assert len(response.data["activity"]) == 3
+    assert response.data["activity"][0] == {
+        "day": timezone.localdate().isoformat(),
+        "images_uploaded": 3,
+        "images_processed": 1,
+        "images_failed": 1,
+        "images_anomalous": 1,
+        "anomaly_rate": 1.0,
+    }
+    assert response.data["activity"][1]["anomaly_rate"] is None
+
+    client.force_authenticate(user=patient.user)
+    assert client.get("/ops/stats").status_code == 403
+
+
+@pytest.mark.django_db
+def test_reconcile_statistics_corrects_drift_and_feeds_the_dashboard(admin_user):
+    patient = PatientProfile.objects.create(
+        user=User.objects.create(email="drift-patient@example.com", role=User.Role.PATIENT)
+    )
+    _image(patient)
+    scored = _image(patient)
+    MedicalImage.objects.filter(id=scored.id).update(
+        status=MedicalImage.Status.PROCESSED, ai_is_anomalous=True, processed_at=timezone.now()
+    )
+    # Signals only apply on commit, which never happens inside this test's
+    # transaction, so the rollups start out stale, as after a bulk import.
+    StatCounter.objects.create(name="images", value=40)
+    assert not DailyActivity.objects.exists()
+
+    counts = reconcile_statistics()
+
+    assert counts["users"] == 2
+    assert counts["images"] == 2
+    assert StatCounter.objects.get(name="images").value == 2
+    today = DailyActivity.objects.filter(day=timezone.localdate())
+    assert dict(today.values_list("metric", "value")) == {
+        "images_uploaded": 2,
+        "images_processed": 1,
+        "images_anomalous": 1,
+    }
+
+    client = Client()
+    client.force_login(admin_user)
+    response = client.get(reverse("portal-dashboard"))
+    assert response.status_code == 200
+    assert response.context["images"] == 2
+    assert response.context["user_count"] == 2
+    assert response.context["activity"][0]["images_uploaded"] == 2
+    assert response.context["activity"][0]["anomaly_rate"] == 1.0
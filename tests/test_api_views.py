@@ -289,3 +289,79 @@ def test_doctor_can_create_medical_record_for_assigned_patient():
 
     assert response.status_code == 201
     assert MedicalRecord.objects.filter(doctor=doctor_profile, patient=patient_profile).exists()
+
+
+@pytest.mark.django_db
+def test_values_serializers_render_identical_json_for_list_endpoints(monkeypatch):
+    from rest_framework.renderers import JSONRenderer
+
+    from apps.appointments.views import AppointmentCreateView
+    from apps.medical_records.models import Diagnosis, Prescription
+    from apps.medical_records.views import PatientRecordsView
+    from apps.patients.serializers import PatientProfileSerializer
+    from apps.reports.models import Report
+    from apps.reports.serializers import ReportSerializer
+    from curamind_core.values_serializers import serialize_values
+
+    patient_user = User.objects.create_user(
+        email="values-patient@example.com",
+        password="StrongPass123",
+        role=User.Role.PATIENT,
+    )
+    patient_profile = PatientProfile.objects.create(
+        user=patient_user, dob="1990-04-01", phone="555-0100"
+    )
+    doctor_user = User.objects.create_user(
+        email="values-doctor@example.com",
+        password="StrongPass123",
+        role=User.Role.DOCTOR,
+    )
+    doctor_profile = DoctorProfile.objects.create(user=doctor_user, specialty="Radiology")
+    for hour in (9, 14):
+        Appointment.objects.create(
+            patient=patient_profile,
+            doctor=doctor_profile,
+            scheduled_time=f"2030-01-01T{hour:02d}:00:00Z",
+            reason="Follow-up",
+        )
+    first_record = MedicalRecord.objects.create(
+        patient=patient_profile,
+        doctor=doctor_profile,
+        diagnosis_text="Fracture",
+        ai_analysis={"anomaly_probability": 0.91, "labels": ["fracture"]},
+    )
+    MedicalRecord.objects.create(
+        patient=patient_profile, doctor=doctor_profile, diagnosis_text="Ok"
+    )
+    Diagnosis.objects.create(medical_record=first_record, text="Distal radius fracture")
+    Diagnosis.objects.create(medical_record=first_record, text="Soft tissue swelling")
+    Prescription.objects.create(
+        medical_record=first_record, medication_name="Ibuprofen", dosage="200mg"
+    )
+    Report.objects.create(medical_record=first_record, author=doctor_user, content="Draft")
+    Report.objects.create(medical_record=first_record, author=None, content="Orphaned")
+
+    client = APIClient()
+    for view, user, path in (
+        (AppointmentCreateView, patient_user, "/appointments"),
+        (PatientRecordsView, patient_user, "/records/patient"),
+    ):
+        client.force_authenticate(user=user)
+        monkeypatch.setattr(view, "use_values_serializer", False)
+        expected = client.get(path)
+        monkeypatch.setattr(view, "use_values_serializer", True)
+        actual = client.get(path)
+        assert expected.status_code == 200
+        assert actual.content == expected.content
+
+    record_rows = client.get("/records/patient").json()
+    assert [len(row["diagnoses"]) for row in record_rows] == [0, 2]
+
+    renderer = JSONRenderer()
+    for serializer_class, queryset in (
+        (ReportSerializer, Report.objects.order_by("content")),
+        (PatientProfileSerializer, PatientProfile.objects.order_by("created_at")),
+    ):
+        assert renderer.render(serialize_values(serializer_class, queryset)) == renderer.render(
+            serializer_class(queryset, many=True).data
+        )
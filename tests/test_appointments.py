@@ -5,6 +5,7 @@ from apps.appointments.models import Appointment
 from apps.authentication.models import User
 from apps.doctors.models import DoctorProfile
 from apps.patients.models import PatientProfile
+from curamind_core.pagination import encode_cursor
 
 
 @pytest.mark.django_db
@@ -203,3 +204,55 @@ def test_doctor_appointment_endpoints_require_doctor_profile():
 
     assert list_response.status_code == 403
     assert update_response.status_code == 403
+
+
+@pytest.mark.django_db
+def test_appointment_list_pages_with_keyset_cursor():
+    patient_user = User.objects.create_user(
+        email="paging-patient@example.com",
+        password="StrongPass123",
+        role=User.Role.PATIENT,
+    )
+    patient_profile = PatientProfile.objects.create(user=patient_user)
+    doctor_user = User.objects.create_user(
+        email="paging-doctor@example.com",
+        password="StrongPass123",
+        role=User.Role.DOCTOR,
+    )
+    doctor_profile = DoctorProfile.objects.create(user=doctor_user, specialty="Cardiology")
+    # Two appointments share a slot so the page boundary has to break the tie on id.
+    for hour in (9, 10, 10, 11, 12):
+        Appointment.objects.create(
+            patient=patient_profile,
+            doctor=doctor_profile,
+            scheduled_time=f"2030-01-01T{hour:02d}:00:00Z",
+        )
+    expected = [
+        str(pk)
+        for pk in Appointment.objects.order_by("-scheduled_time", "-id").values_list(
+            "id", flat=True
+        )
+    ]
+
+    client = APIClient()
+    client.force_authenticate(user=patient_user)
+    seen = []
+    response = client.get("/appointments", {"page_size": 2})
+    while True:
+        assert response.status_code == 200
+        seen.extend(item["id"] for item in response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            assert "Link" not in response.headers
+            break
+        assert response.headers["Link"].endswith('>; rel="next"')
+        assert f"cursor={cursor}" in response.headers["Link"]
+        response = client.get("/appointments", {"page_size": 2, "cursor": cursor})
+
+    assert seen == expected
+    assert client.get("/appointments", {"cursor": "not-a-cursor"}).status_code == 404
+    # Decodes to a two-item list, but neither item is a timestamp or a UUID.
+    malformed = encode_cursor(["garbage", "x"])
+    response = client.get("/appointments", {"cursor": malformed})
+    assert response.status_code == 404
+    assert response.json()["detail"] == "Invalid cursor"
@@ -32,6 +32,33 @@ def test_admin_can_list_and_filter_audit_logs_via_api():
     assert response.data[0]["action"] == "login"
 
 
+@pytest.mark.django_db
+def test_audit_log_search_matches_email_prefix_and_any_action_case():
+    admin_user = User.objects.create_user(
+        email="admin-prefix@example.com",
+        password="StrongPass123",
+        role=User.Role.ADMIN,
+        is_staff=True,
+    )
+    doctor = User.objects.create_user(
+        email="Dr.Jones@example.com", password="StrongPass123", role=User.Role.DOCTOR
+    )
+    nurse = User.objects.create_user(
+        email="nurse-prefix@example.com", password="StrongPass123", role=User.Role.NURSE
+    )
+    AuditLog.objects.create(user=doctor, action="Report_Download", resource_id="report-1")
+    AuditLog.objects.create(user=nurse, action="report_download", resource_id="report-2")
+
+    client = APIClient()
+    client.force_authenticate(user=admin_user)
+    by_prefix = client.get("/audit-logs", {"email": "dr.jo"})
+    by_action = client.get("/audit-logs", {"action": "REPORT_DOWNLOAD"})
+
+    assert [log["resource_id"] for log in by_prefix.data] == ["report-1"]
+    assert {log["action"] for log in by_action.data} == {"report_download"}
+    assert len(by_action.data) == 2
+
+
 @pytest.mark.django_db
 def test_admin_dashboard_can_filter_audit_logs():
     admin_user = User.objects.create_user(
@@ -0,0 +1,233 @@
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+import pytest
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import transaction
+from rest_framework.test import APIClient
+
+from apps.appointments.models import Appointment
+from apps.authentication.decision_cache import cached_decision, invalidate_user_decisions
+from apps.authentication.models import User
+from apps.doctors.care_team import is_care_team_member
+from apps.doctors.models import CareTeamAssignment, DoctorProfile
+from apps.imaging.access import get_authorized_image_for_user
+from apps.imaging.models import MedicalImage
+from apps.medical_records.models import MedicalRecord
+from apps.patients.models import PatientProfile
+from curamind_core.metrics import AUTHZ_CACHE_HIT_METRIC, get_count
+
+
+def _doctor(email: str) -> DoctorProfile:
+    user = User.objects.create(email=email, role=User.Role.DOCTOR)
+    return DoctorProfile.objects.create(user=user, specialty="Cardiology")
+
+
+def _patient(email: str) -> PatientProfile:
+    return PatientProfile.objects.create(
+        user=User.objects.create(email=email, role=User.Role.PATIENT)
+    )
+
+
+def _pairs() -> set[tuple]:
+    return set(CareTeamAssignment.objects.values_list("doctor_id", "patient_id"))
+
+
+def _image(patient: PatientProfile) -> MedicalImage:
+    return MedicalImage.objects.create(
+        patient=patient,
+        uploaded_by=patient.user,
+        file_name="scan.png",
+        s3_key="medical-images/scan.png",
+        modality="CT",
+        content_type="image/png",
+        file_size=123,
+        metadata={},
+    )
+
+
+def _fresh_user(doctor: DoctorProfile) -> User:
+    # Each request loads its own user, so the per-request cache starts empty.
+    return User.objects.select_related("doctor_profile").get(id=doctor.user_id)
+
+
+def _ai_result_status(doctor: DoctorProfile, image: MedicalImage) -> int:
+    client = APIClient()
+    client.force_authenticate(user=_fresh_user(doctor))
+    return client.get(f"/ai/result?image_id={image.id}").status_code
+
+
+def _can_open(doctor: DoctorProfile, image: MedicalImage) -> bool:
+    return get_authorized_image_for_user(_fresh_user(doctor), str(image.id)) == image
+
+
+@pytest.mark.django_db
+def test_care_team_follows_appointment_and_record_writes():
+    doctor = _doctor("care-doctor@example.com")
+    other_doctor = _doctor("care-other-doctor@example.com")
+    patient = _patient("care-patient@example.com")
+
+    appointment = Appointment.objects.create(
+        patient=patient, doctor=doctor, scheduled_time="2030-01-01T10:00:00Z"
+    )
+    record = MedicalRecord.objects.create(patient=patient, doctor=doctor, diagnosis_text="Ok")
+    assert _pairs() == {(doctor.id, patient.id)}
+
+    appointment.status = Appointment.Status.APPROVED
+    appointment.save()
+    appointment.delete()
+    assert _pairs() == {(doctor.id, patient.id)}
+
+    # Reassigning the record moves the patient to the other doctor's care team.
+    record.doctor = other_doctor
+    record.save()
+    assert _pairs() == {(other_doctor.id, patient.id)}
+
+    record.delete()
+    assert _pairs() == set()
+
+
+@pytest.mark.django_db
+def test_backfill_care_team_command_restores_and_prunes_assignments():
+    doctor = _doctor("backfill-doctor@example.com")
+    patient = _patient("backfill-patient@example.com")
+    stale_patient = _patient("backfill-stale@example.com")
+    # bulk_create skips signals, like a bulk import would.
+    Appointment.objects.bulk_create(
+        [Appointment(patient=patient, doctor=doctor, scheduled_time="2030-01-01T10:00:00Z")]
+    )
+    CareTeamAssignment.objects.create(doctor=doctor, patient=stale_patient)
+
+    call_command("backfill_care_team")
+    assert _pairs() == {(doctor.id, patient.id), (doctor.id, stale_patient.id)}
+
+    call_command("backfill_care_team", "--prune")
+    assert _pairs() == {(doctor.id, patient.id)}
+
+
+@pytest.mark.django_db
+def test_care_team_decision_is_cached_per_request_and_across_requests(django_assert_num_queries):
+    doctor = _doctor("cached-doctor@example.com")
+    patient = _patient("cached-patient@example.com")
+    MedicalRecord.objects.create(patient=patient, doctor=doctor, diagnosis_text="Ok")
+    user = _fresh_user(doctor)
+
+    with django_assert_num_queries(1):
+        assert is_care_team_member(user, patient.id)
+        assert is_care_team_member(user, str(patient.id))
+    # The next request's user is answered from the shared cache.
+    user = _fresh_user(doctor)
+    with django_assert_num_queries(0):
+        assert is_care_team_member(user, patient.id)
+
+
+@pytest.mark.django_db
+def test_cached_image_access_is_revoked_when_the_care_relationship_ends(
+    monkeypatch, django_assert_num_queries, django_capture_on_commit_callbacks
+):
+    monkeypatch.setattr(
+        "apps.ai_engine.views.get_ai_result_by_image",
+        lambda image_id: {"image_id": image_id, "result": {"anomaly_probability": 0.1}},
+    )
+    doctor = _doctor("revoke-doctor@example.com")
+    patient = _patient("revoke-patient@example.com")
+    image = _image(patient)
+    appointment = Appointment.objects.create(
+        patient=patient, doctor=doctor, scheduled_time="2030-01-01T10:00:00Z"
+    )
+    hits = get_count(AUTHZ_CACHE_HIT_METRIC)
+
+    assert _ai_result_status(doctor, image) == 200
+    user = _fresh_user(doctor)
+    client = APIClient()
+    client.force_authenticate(user=user)
+    # The second request reuses the decision; the rest is the image read and the audit log.
+    with django_assert_num_queries(3):
+        assert client.get(f"/ai/result?image_id={image.id}").status_code == 200
+    assert get_count(AUTHZ_CACHE_HIT_METRIC) == hits + 1
+
+    with django_capture_on_commit_callbacks(execute=True):
+        appointment.delete()
+    assert _ai_result_status(doctor, image) == 404
+
+    # A cached denial is dropped as soon as access is granted again.
+    with django_capture_on_commit_callbacks(execute=True):
+        MedicalRecord.objects.create(patient=patient, doctor=doctor, diagnosis_text="Ok")
+    assert _ai_result_status(doctor, image) == 200
+
+
+@pytest.mark.django_db
+def test_decision_cached_before_the_delete_commits_is_dropped_on_commit(
+    django_capture_on_commit_callbacks,
+):
+    doctor = _doctor("atomic-doctor@example.com")
+    patient = _patient("atomic-patient@example.com")
+    image = _image(patient)
+    appointment = Appointment.objects.create(
+        patient=patient, doctor=doctor, scheduled_time="2030-01-01T10:00:00Z"
+    )
+    assert _can_open(doctor, image)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        with transaction.atomic():
+            appointment.delete()
+            # Nothing is bumped before the commit, so a request here still
+            # reads the old grant and caches it under the current version.
+            assert _can_open(doctor, image)
+
+    assert not _can_open(doctor, image)
+
+
+@pytest.mark.django_db
+def test_backfill_command_drops_cached_decisions_for_rows_changed_without_signals():
+    doctor = _doctor("bulk-doctor@example.com")
+    other_doctor = _doctor("bulk-other-doctor@example.com")
+    patient = _patient("bulk-patient@example.com")
+    image = _image(patient)
+    record = MedicalRecord.objects.create(patient=patient, doctor=doctor, diagnosis_text="Ok")
+    assert _can_open(doctor, image)
+
+    # QuerySet.update() skips signals, so the cached grant survives until the
+    # backfill command prunes the assignment and drops every cached decision.
+    MedicalRecord.objects.filter(id=record.id).update(doctor=other_doctor)
+    assert _can_open(doctor, image)
+
+    call_command("backfill_care_team", "--prune")
+    assert not _can_open(doctor, image)
+    assert _can_open(other_doctor, image)
+
+
+def test_cached_decision_hit_takes_two_cache_round_trips(monkeypatch):
+    user = SimpleNamespace(id="round-trip-user", role=User.Role.DOCTOR)
+    calls = []
+    depth = [0]
+
+    def counted(name, original):
+        # The local-memory backend builds get_many and incr on get; count only
+        # the outermost call, which is one round trip on Redis.
+        def call(*args, **kwargs):
+            if not depth[0]:
+                calls.append(name)
+            depth[0] += 1
+            try:
+                return original(*args, **kwargs)
+            finally:
+                depth[0] -= 1
+
+        return call
+
+    for name in ("get", "get_many", "set", "add", "incr"):
+        monkeypatch.setattr(cache, name, counted(name, getattr(cache, name)))
+
+    assert cached_decision(user, "image", "1", lambda: True) is True
+    assert cached_decision(user, "image", "1", lambda: True) is True
+    calls.clear()
+
+    assert cached_decision(user, "image", "1", lambda: pytest.fail("cached")) is True
+    # The entry and its versions in one read, then the hit counter.
+    assert calls == ["get_many", "incr"]
+
+    invalidate_user_decisions(user.id)
+    assert cached_decision(user, "image", "1", lambda: False) is False
@@ -1,5 +1,8 @@
 from __future__ import annotations
 
+import asyncio
+import base64
+import hashlib
 import importlib
 import sys
 import types
@@ -15,6 +18,10 @@ setattr(fake_cv2, "IMREAD_COLOR", 2)
 setattr(fake_cv2, "COLOR_BGR2RGB", 3)
 setattr(fake_cv2, "COLOR_RGB2GRAY", 4)
 setattr(fake_cv2, "COLORMAP_JET", 5)
+setattr(fake_cv2, "IMREAD_REDUCED_COLOR_2", 17)
+setattr(fake_cv2, "IMREAD_REDUCED_COLOR_4", 33)
+setattr(fake_cv2, "IMREAD_REDUCED_COLOR_8", 65)
+setattr(fake_cv2, "INTER_LINEAR", 1)
 
 
 def _fake_cvt_color(array, code):
@@ -50,6 +57,11 @@ setattr(fake_cv2, "cvtColor", _fake_cvt_color)
 setattr(fake_cv2, "imdecode", _fake_imdecode)
 setattr(fake_cv2, "applyColorMap", _fake_apply_color_map)
 setattr(fake_cv2, "imencode", _fake_imencode)
+setattr(
+    fake_cv2,
+    "resize",
+    lambda array, size, interpolation=None: np.array(Image.fromarray(array).resize(size)),
+)
 sys.modules.setdefault("cv2", fake_cv2)
 
 
@@ -63,6 +75,82 @@ def _fastapi_mongo_module():
     return importlib.import_module("backend.ai_service_fastapi.mongo")
 
 
+def _stub_ml_stack(monkeypatch, max_probabilities=(0.25,)):
+    fake_torch = types.ModuleType("torch")
+
+    class NoGradContext:
+        def __enter__(self):
+            return None
+
+        def __exit__(self, exc_type, exc, tb):
+            return False
+
+    class FakeValues:
+        def __init__(self, values):
+            self.values = values
+
+        def tolist(self):
+            return list(self.values)
+
+    class FakeProbabilities:
+        def __init__(self, batch):
+            self.batch = batch
+
+        def amax(self, dim=1):
+            return FakeValues(
+                [max_probabilities[i % len(max_probabilities)] for i in range(len(self.batch))]
+            )
+
+    setattr(fake_torch, "no_grad", lambda: NoGradContext())
+    setattr(fake_torch, "device", lambda _name: NoGradContext())
+    setattr(fake_torch, "zeros", lambda shape: [0] * shape[0])
+    setattr(fake_torch, "set_num_threads", lambda count: None)
+    setattr(fake_torch, "set_num_interop_threads", lambda count: None)
+    setattr(fake_torch, "stack", lambda tensors: list(tensors))
+    setattr(fake_torch, "from_numpy", lambda array: list(array))
+    setattr(fake_torch, "softmax", lambda logits, dim=1: FakeProbabilities(logits))
+
+    fake_transforms = types.ModuleType("torchvision.transforms")
+
+    class FakeTensor:
+        def unsqueeze(self, _dim):
+            return "tensor-batch"
+
+    setattr(fake_transforms, "Resize", lambda size: ("resize", size))
+    setattr(fake_transforms, "ToTensor", lambda: "to-tensor")
+    setattr(
+        fake_transforms,
+        "Normalize",
+        lambda mean, std: ("normalize", tuple(mean), tuple(std)),
+    )
+    setattr(fake_transforms, "Compose", lambda steps: (lambda image: FakeTensor()))
+
+    fake_models = types.ModuleType("torchvision.models")
+
+    class FakeModel:
+        state_dict = None
+
+        def eval(self):
+            return self
+
+        def load_state_dict(self, state_dict, assign=False):
+            self.state_dict = (state_dict, assign)
+
+        def __call__(self, tensor):
+            return tensor
+
+    setattr(fake_models, "resnet50", lambda weights=None: FakeModel())
+
+    fake_torchvision = types.ModuleType("torchvision")
+    setattr(fake_torchvision, "transforms", fake_transforms)
+    setattr(fake_torchvision, "models", fake_models)
+
+    monkeypatch.setitem(sys.modules, "torch", fake_torch)
+    monkeypatch.setitem(sys.modules, "torchvision", fake_torchvision)
+    monkeypatch.setitem(sys.modules, "torchvision.transforms", fake_transforms)
+    monkeypatch.setitem(sys.modules, "torchvision.models", fake_models)
+
+
 def test_fastapi_utils_load_image_array_from_png_and_invalid_bytes():
     fastapi_utils = _fastapi_utils_module()
     image = Image.new("RGB", (2, 2), color=(10, 20, 30))
@@ -76,6 +164,57 @@ def test_fastapi_utils_load_image_array_from_png_and_invalid_bytes():
         fastapi_utils.load_image_array(b"not-an-image")
 
 
+def test_fastapi_utils_sniff_format_uses_magic_bytes_then_content_type():
+    fastapi_utils = _fastapi_utils_module()
+
+    assert fastapi_utils.sniff_format(b"\0" * 128 + b"DICM" + b"rest") == "dicom"
+    assert fastapi_utils.sniff_format(b"\x89PNG\r\n\x1a\nrest", "image/jpeg") == "png"
+    assert fastapi_utils.sniff_format(b"\xff\xd8\xff\xe0rest") == "jpeg"
+    assert fastapi_utils.sniff_format(b"\xffO\xffQrest") == "jpeg2000"
+    assert fastapi_utils.sniff_format(b"\x93NUMPYrest") == "npy"
+    assert fastapi_utils.sniff_format(b"raw", "application/dicom; charset=binary") == "dicom"
+    assert fastapi_utils.sniff_format(b"raw", "application/octet-stream") is None
+
+
+def test_fastapi_utils_dispatches_raster_formats_without_dicom_parse(monkeypatch):
+    fastapi_utils = _fastapi_utils_module()
+    fastapi_utils.metrics.reset()
+    monkeypatch.setattr(
+        fastapi_utils.pydicom,
+        "dcmread",
+        lambda *_args, **_kwargs: pytest.fail("raster input must not be parsed as DICOM"),
+    )
+    flags = []
+
+    def fake_imdecode(buffer, flag):
+        flags.append(flag)
+        return np.zeros((4, 4, 3), dtype=np.uint8)
+
+    monkeypatch.setattr(fastapi_utils.cv2, "imdecode", fake_imdecode)
+    jpeg = BytesIO()
+    Image.new("RGB", (1000, 900)).save(jpeg, format="JPEG")
+    png = BytesIO()
+    Image.new("RGB", (4, 4)).save(png, format="PNG")
+
+    fastapi_utils.load_image_frames(jpeg.getvalue(), target_size=224)
+    fastapi_utils.load_image_frames(jpeg.getvalue())
+    fastapi_utils.load_image_frames(png.getvalue(), target_size=224)
+
+    assert flags == [
+        fastapi_utils.cv2.IMREAD_REDUCED_COLOR_4,
+        fastapi_utils.cv2.IMREAD_COLOR,
+        fastapi_utils.cv2.IMREAD_COLOR,
+    ]
+    timings = fastapi_utils.metrics.snapshot()["timings"]
+    assert timings["decode.jpeg"]["count"] == 2
+    assert timings["decode.png"]["count"] == 1
+
+    monkeypatch.setattr(fastapi_utils.pydicom, "dcmread", lambda *_args: 1 / 0)
+    with pytest.raises(ValueError):
+        fastapi_utils.load_image_frames(b"\0" * 128 + b"DICMbroken")
+    assert fastapi_utils.metrics.snapshot()["counters"] == {"decode.dicom.errors": 1}
+
+
 def test_fastapi_utils_normalize_to_uint8_handles_scaling_and_flat_arrays():
     fastapi_utils = _fastapi_utils_module()
 
@@ -88,6 +227,45 @@ def test_fastapi_utils_normalize_to_uint8_handles_scaling_and_flat_arrays():
     assert np.array_equal(flat, np.zeros((1, 2), dtype=np.uint8))
 
 
+def test_fastapi_utils_normalize_to_uint8_applies_dicom_window_and_rescale():
+    fastapi_utils = _fastapi_utils_module()
+    stored = np.array([[0, 1024, 1064, 2024]], dtype=np.uint16)
+    hounsfield = np.array([[-1000, 0, 40, 1000]], dtype=np.int16)
+
+    rescaled = fastapi_utils.normalize_to_uint8(
+        stored,
+        window_center=40,
+        window_width=80,
+        rescale_intercept=-1024,
+    )
+    windowed = fastapi_utils.normalize_to_uint8(hounsfield, window_center=40, window_width=80)
+    chunked = fastapi_utils.normalize_to_uint8(
+        hounsfield.astype(np.float32), window_center=40, window_width=80
+    )
+
+    assert rescaled.tolist() == [[0, 0, 129, 255]]
+    assert windowed.tolist() == rescaled.tolist()
+    assert chunked.tolist() == rescaled.tolist()
+
+
+def test_fastapi_utils_dicom_display_options_reads_first_window_value():
+    fastapi_utils = _fastapi_utils_module()
+
+    class FakeDataset:
+        WindowCenter = ["40", "400"]
+        WindowWidth = ["80", "2000"]
+        RescaleIntercept = "-1024"
+
+    options = fastapi_utils.dicom_display_options(FakeDataset())
+
+    assert options == {
+        "window_center": 40.0,
+        "window_width": 80.0,
+        "rescale_slope": 1.0,
+        "rescale_intercept": -1024.0,
+    }
+
+
 def test_fastapi_utils_load_image_array_from_dicom(monkeypatch):
     fastapi_utils = _fastapi_utils_module()
 
@@ -105,137 +283,193 @@ def test_fastapi_utils_load_image_array_from_dicom(monkeypatch):
     assert array.shape[2] == 3
 
 
-def test_fastapi_utils_create_heatmap_returns_base64_png():
+def test_fastapi_utils_splits_multi_frame_dicom_into_rgb_frames(monkeypatch):
     fastapi_utils = _fastapi_utils_module()
-    array = np.zeros((2, 2, 3), dtype=np.uint8)
-    result = fastapi_utils.create_heatmap(array)
 
-    assert isinstance(result, str)
-    assert result
+    class FakeDataset:
+        NumberOfFrames = 3
+        SamplesPerPixel = 1
+        pixel_array = np.arange(12, dtype=np.uint16).reshape(3, 2, 2)
 
+    monkeypatch.setattr(
+        "backend.ai_service_fastapi.utils.pydicom.dcmread", lambda *_args: FakeDataset()
+    )
 
-def test_fastapi_mongo_get_ai_result(monkeypatch):
-    fastapi_mongo = _fastapi_mongo_module()
+    frames = fastapi_utils.load_image_frames(b"dicom-bytes")
 
-    class FakeCollection:
-        def create_index(self, *_args, **_kwargs):
-            return "idx"
+    assert len(frames) == 3
+    assert all(frame.shape == (2, 2, 3) and frame.dtype == np.uint8 for frame in frames)
+    assert fastapi_utils.sample_frame_indices(10, 4) == [0, 3, 6, 9]
+    assert fastapi_utils.sample_frame_indices(3, 4) == [0, 1, 2]
+    scores = np.array([0.1, 0.9], dtype=np.float16)
+    assert np.array_equal(fastapi_utils.decode_array(fastapi_utils.encode_array(scores)), scores)
 
-        def find_one(self, query, sort=None):
-            if query == {"image_id": "img-1"}:
-                return {"_id": "mongo-id", "result": {"score": 0.8}}
-            return None
 
-    class FakeDB:
-        ai_results = FakeCollection()
-        image_metadata = FakeCollection()
-        processing_logs = FakeCollection()
+def test_fastapi_utils_reads_strided_dicom_pixels_for_target_size():
+    from pydicom.dataset import FileDataset, FileMetaDataset
+    from pydicom.uid import ExplicitVRLittleEndian, SecondaryCaptureImageStorage, generate_uid
 
-    class FakeClient:
-        def __getitem__(self, _name):
-            return FakeDB()
+    fastapi_utils = _fastapi_utils_module()
+    file_meta = FileMetaDataset()
+    file_meta.MediaStorageSOPClassUID = SecondaryCaptureImageStorage
+    file_meta.MediaStorageSOPInstanceUID = generate_uid()
+    file_meta.TransferSyntaxUID = ExplicitVRLittleEndian
+    dataset = FileDataset("ct.dcm", {}, file_meta=file_meta, preamble=b"\0" * 128)
+    dataset.SeriesInstanceUID = generate_uid()
+    dataset.Rows = dataset.Columns = 512
+    dataset.NumberOfFrames = 2
+    dataset.SamplesPerPixel = 1
+    dataset.PhotometricInterpretation = "MONOCHROME2"
+    dataset.PixelRepresentation = 0
+    dataset.BitsAllocated, dataset.BitsStored, dataset.HighBit = 16, 12, 11
+    dataset.WindowCenter, dataset.WindowWidth = 2048, 4096
+    pixels = np.random.default_rng(3).integers(0, 4096, size=(2, 512, 512), dtype=np.uint16)
+    dataset.PixelData = pixels.tobytes()
+    buffer = BytesIO()
+    dataset.save_as(buffer, write_like_original=False)
 
-    monkeypatch.setattr(fastapi_mongo, "_client", lambda: FakeClient())
-    fastapi_mongo.ensure_indexes.cache_clear()
+    reduced = fastapi_utils.load_image_frames(buffer.getvalue(), target_size=224)
+    full = fastapi_utils.load_image_frames(buffer.getvalue())
 
-    assert fastapi_mongo.get_ai_result("img-1") == {"score": 0.8}
-    assert fastapi_mongo.get_ai_result("missing") is None
+    assert [frame.shape for frame in reduced] == [(256, 256, 3), (256, 256, 3)]
+    assert all(np.array_equal(small, large[::2, ::2]) for small, large in zip(reduced, full))
+    assert fastapi_utils.load_image_frames(buffer.getvalue(), target_size=512)[0].shape[:2] == (
+        512,
+        512,
+    )
+    picked = fastapi_utils.load_image_frames(buffer.getvalue(), frame_indices=[1])
+    assert len(picked) == 1 and np.array_equal(picked[0], full[1])
+    series_uid, frame_count = fastapi_utils.read_dicom_series_info(buffer.getvalue())
+    assert (series_uid, frame_count) == (str(dataset.SeriesInstanceUID), 2)
+    assert fastapi_utils.read_dicom_series_info(b"not-dicom") is None
 
 
-def test_fastapi_mongo_check_connection(monkeypatch):
-    fastapi_mongo = _fastapi_mongo_module()
+def test_fastapi_utils_encodes_cam_heatmap_at_native_or_requested_size():
+    fastapi_utils = _fastapi_utils_module()
+    cam = np.zeros((7, 7), dtype=np.float32)
+    cam[3, 4] = 2.5
 
-    class FakeCollection:
-        def create_index(self, *_args, **_kwargs):
-            return "idx"
+    native = Image.open(BytesIO(base64.b64decode(fastapi_utils.encode_cam_heatmap(cam))))
+    upsampled = Image.open(BytesIO(base64.b64decode(fastapi_utils.encode_cam_heatmap(cam, 64))))
 
-    class HealthyDB:
-        ai_results = FakeCollection()
-        image_metadata = FakeCollection()
-        processing_logs = FakeCollection()
+    assert native.size == (7, 7)
+    assert upsampled.size == (64, 64)
+    assert fastapi_utils.encode_cam_heatmap(np.zeros((7, 7), dtype=np.float32))
 
-    class HealthyClient:
-        class admin:
-            @staticmethod
-            def command(_name):
-                return {"ok": 1}
 
-        def __getitem__(self, _name):
-            return HealthyDB()
+def test_fastapi_utils_create_heatmap_returns_base64_png():
+    fastapi_utils = _fastapi_utils_module()
+    array = np.zeros((2, 2, 3), dtype=np.uint8)
+    result = fastapi_utils.create_heatmap(array)
 
-    class BrokenClient:
-        class admin:
-            @staticmethod
-            def command(_name):
-                raise fastapi_mongo.PyMongoError("down")
+    assert isinstance(result, str)
+    assert result
 
-        def __getitem__(self, _name):
-            return HealthyDB()
 
-    monkeypatch.setattr(fastapi_mongo, "_client", lambda: HealthyClient())
-    fastapi_mongo.ensure_indexes.cache_clear()
-    assert fastapi_mongo.check_mongo_connection() is True
+class _FakeAsyncCollection:
+    def __init__(self, documents=None):
+        self.documents = documents or {}
+        self.find_calls = 0
 
-    monkeypatch.setattr(fastapi_mongo, "_client", lambda: BrokenClient())
-    fastapi_mongo.ensure_indexes.cache_clear()
-    assert fastapi_mongo.check_mongo_connection() is False
+    async def create_index(self, *_args, **_kwargs):
+        return "idx"
 
+    async def find_one(self, query, sort=None):
+        self.find_calls += 1
+        document = self.documents.get(query["image_id"])
+        return dict(document) if document else None
 
-def test_fastapi_model_predict_image_with_stubbed_ml_stack(monkeypatch):
-    fake_torch = types.ModuleType("torch")
 
-    class NoGradContext:
-        def __enter__(self):
-            return None
+def _fake_async_mongo_client(ai_results, ping_error=None):
+    class FakeDB:
+        image_metadata = _FakeAsyncCollection()
+        processing_logs = _FakeAsyncCollection()
 
-        def __exit__(self, exc_type, exc, tb):
-            return False
+    FakeDB.ai_results = ai_results
 
-    class FakeScalar:
-        def item(self):
-            return 0.25
+    class FakeAdmin:
+        async def command(self, _name):
+            if ping_error:
+                raise ping_error
+            return {"ok": 1}
 
-    class FakeProbabilities:
-        def max(self):
-            return FakeScalar()
+    class FakeClient:
+        admin = FakeAdmin()
 
-    setattr(fake_torch, "no_grad", lambda: NoGradContext())
-    setattr(fake_torch, "softmax", lambda logits, dim=1: FakeProbabilities())
+        def __getitem__(self, _name):
+            return FakeDB()
 
-    fake_transforms = types.ModuleType("torchvision.transforms")
+    return FakeClient()
 
-    class FakeTensor:
-        def unsqueeze(self, _dim):
-            return "tensor-batch"
 
-    setattr(fake_transforms, "Resize", lambda size: ("resize", size))
-    setattr(fake_transforms, "ToTensor", lambda: "to-tensor")
-    setattr(
-        fake_transforms,
-        "Normalize",
-        lambda mean, std: ("normalize", tuple(mean), tuple(std)),
+def test_fastapi_mongo_get_ai_result(monkeypatch):
+    fastapi_mongo = _fastapi_mongo_module()
+    ai_results = _FakeAsyncCollection({"img-1": {"_id": "mongo-id", "result": {"score": 0.8}}})
+    monkeypatch.setattr(fastapi_mongo, "_client", lambda: _fake_async_mongo_client(ai_results))
+
+    assert asyncio.run(fastapi_mongo.get_ai_result("img-1")) == {"score": 0.8}
+    assert asyncio.run(fastapi_mongo.get_ai_result("img-1")) == {"score": 0.8}
+    assert asyncio.run(fastapi_mongo.get_ai_result("missing")) is None
+    assert ai_results.find_calls == 2
+
+    fastapi_mongo.ai_result_cache.ttl_seconds = 0
+    fastapi_mongo.ai_result_cache.clear()
+    asyncio.run(fastapi_mongo.get_ai_result("img-1"))
+    asyncio.run(fastapi_mongo.get_ai_result("img-1"))
+    assert ai_results.find_calls == 4
+
+
+def test_fastapi_mongo_client_is_opened_by_the_lifespan_and_index_failures_back_off(monkeypatch):
+    fastapi_mongo = _fastapi_mongo_module()
+    with pytest.raises(RuntimeError):
+        fastapi_mongo._client()
+    client = fastapi_mongo.open_client()
+    assert fastapi_mongo.open_client() is client
+    fastapi_mongo.close_client()
+    with pytest.raises(RuntimeError):
+        fastapi_mongo._client()
+
+    attempts = []
+
+    class FailingCollection:
+        async def create_index(self, *args, **kwargs):
+            attempts.append(args)
+            raise fastapi_mongo.PyMongoError("down")
+
+    class FailingDB:
+        ai_results = image_metadata = processing_logs = FailingCollection()
+
+    monkeypatch.setattr(fastapi_mongo, "_client", lambda: {fastapi_mongo.MONGO_DB: FailingDB()})
+    assert asyncio.run(fastapi_mongo.ensure_indexes()) is False
+    # Inside the backoff window nothing is attempted.
+    assert asyncio.run(fastapi_mongo.ensure_indexes()) is False
+    assert len(attempts) == 1
+
+    monkeypatch.setattr(fastapi_mongo, "_index_retry_at", 0.0)
+    monkeypatch.setattr(
+        fastapi_mongo, "_client", lambda: _fake_async_mongo_client(_FakeAsyncCollection())
     )
-    setattr(fake_transforms, "Compose", lambda steps: (lambda image: FakeTensor()))
+    assert asyncio.run(fastapi_mongo.ensure_indexes()) is True
+    assert fastapi_mongo._index_failures == 0
 
-    fake_models = types.ModuleType("torchvision.models")
 
-    class FakeModel:
-        def eval(self):
-            return self
+def test_fastapi_mongo_check_connection(monkeypatch):
+    fastapi_mongo = _fastapi_mongo_module()
+    ai_results = _FakeAsyncCollection()
 
-        def __call__(self, tensor):
-            return "logits"
+    monkeypatch.setattr(fastapi_mongo, "_client", lambda: _fake_async_mongo_client(ai_results))
+    assert asyncio.run(fastapi_mongo.check_mongo_connection()) is True
 
-    setattr(fake_models, "resnet50", lambda weights=None: FakeModel())
+    monkeypatch.setattr(
+        fastapi_mongo,
+        "_client",
+        lambda: _fake_async_mongo_client(ai_results, fastapi_mongo.PyMongoError("down")),
+    )
+    assert asyncio.run(fastapi_mongo.check_mongo_connection()) is False
 
-    fake_torchvision = types.ModuleType("torchvision")
-    setattr(fake_torchvision, "transforms", fake_transforms)
-    setattr(fake_torchvision, "models", fake_models)
 
-    monkeypatch.setitem(sys.modules, "torch", fake_torch)
-    monkeypatch.setitem(sys.modules, "torchvision", fake_torchvision)
-    monkeypatch.setitem(sys.modules, "torchvision.transforms", fake_transforms)
-    monkeypatch.setitem(sys.modules, "torchvision.models", fake_models)
+def test_fastapi_model_predict_image_with_stubbed_ml_stack(monkeypatch):
+    _stub_ml_stack(monkeypatch)
 
     registry_module_name = "backend.ai_service_fastapi.model_registry"
     sys.modules.pop(registry_module_name, None)
@@ -244,8 +478,8 @@ def test_fastapi_model_predict_image_with_stubbed_ml_stack(monkeypatch):
     model_module = importlib.import_module(module_name)
     monkeypatch.setattr(
         model_module,
-        "load_image_array",
-        lambda image_bytes: np.zeros((2, 2, 3), dtype=np.uint8),
+        "load_image_frames",
+        lambda image_bytes, **_kwargs: [np.zeros((2, 2, 3), dtype=np.uint8)],
     )
     monkeypatch.setattr(model_module, "create_heatmap", lambda array: "heatmap-data")
 
@@ -261,6 +495,147 @@ def test_fastapi_model_predict_image_with_stubbed_ml_stack(monkeypatch):
     assert result["anomaly_probability"] == 0.75
 
 
+def _import_model_module():
+    sys.modules.pop("backend.ai_service_fastapi.model_registry", None)
+    module_name = "backend.ai_service_fastapi.model"
+    sys.modules.pop(module_name, None)
+    return importlib.import_module(module_name)
+
+
+def test_fastapi_model_predict_image_decodes_at_model_input_size(monkeypatch):
+    _stub_ml_stack(monkeypatch)
+    model_module = _import_model_module()
+    target_sizes = []
+
+    def fake_load_image_frames(
+        _image_bytes, *, content_type=None, target_size=None, frame_indices=None
+    ):
+        target_sizes.append(target_size)
+        return [np.zeros((2, 2, 3), dtype=np.uint8)]
+
+    monkeypatch.setattr(model_module, "load_image_frames", fake_load_image_frames)
+    monkeypatch.setattr(model_module, "read_dicom_series_info", lambda image_bytes: None)
+    monkeypatch.setattr(model_module, "create_heatmap", lambda array: "heatmap-data")
+
+    model_module.predict_image(b"image-bytes", content_type="image/jpeg")
+    monkeypatch.setattr(model_module, "FULL_RESOLUTION_HEATMAP", True)
+    model_module.predict_image(b"image-bytes")
+
+    assert target_sizes == [model_module.MODEL_INPUT_SIZE, None]
+
+
+def test_fastapi_model_scores_multi_frame_studies_in_batches(monkeypatch):
+    _stub_ml_stack(monkeypatch, max_probabilities=(0.9, 0.2, 0.6))
+    model_module = _import_model_module()
+    frames = [np.full((2, 2, 3), value, dtype=np.uint8) for value in range(3)]
+    monkeypatch.setattr(model_module, "INFERENCE_BATCH_SIZE", 3)
+    series_info = {
+        b"multi-frame": ("1.2.9", 3),
+        b"series-a": ("1.2.3", 3),
+        b"series-b": ("1.2.4", 3),
+    }
+    monkeypatch.setattr(
+        model_module,
+        "load_image_frames",
+        lambda image_bytes, frame_indices=None, **_kwargs: [frames[i] for i in frame_indices],
+    )
+    monkeypatch.setattr(model_module, "read_dicom_series_info", series_info.get)
+    monkeypatch.setattr(model_module, "create_heatmap", lambda array: f"heatmap-{array[0, 0, 0]}")
+
+    result = model_module.predict_image(b"multi-frame")
+    study = model_module.predict_study([b"series-a", b"series-b"])
+
+    assert result["frame_count"] == 3
+    assert result["frames_analyzed"] == 3
+    assert result["peak_frame_index"] == 1
+    assert result["heatmap"] == "heatmap-1"
+    assert result["anomaly_probability"] == pytest.approx(0.8)
+    assert result["is_anomalous"] is True
+    assert isinstance(result["frame_probabilities"], str)
+    assert study["series_count"] == 2
+    assert study["frame_count"] == 6
+    assert [series["series_instance_uid"] for series in study["series"]] == [
+        "1.2.3",
+        "1.2.4",
+    ]
+    assert study["anomaly_probability"] == pytest.approx(0.8)
+
+
+def test_fastapi_model_study_decodes_only_sampled_frames(monkeypatch):
+    _stub_ml_stack(monkeypatch, max_probabilities=(0.9, 0.9, 0.2, 0.9))
+    model_module = _import_model_module()
+    monkeypatch.setattr(model_module, "INFERENCE_BATCH_SIZE", 4)
+    monkeypatch.setattr(model_module, "MAX_FRAMES_PER_SERIES", 4)
+    decoded = []
+
+    def fake_load_image_frames(image_bytes, *, target_size=None, frame_indices=None):
+        decoded.append((image_bytes, list(frame_indices)))
+        return [np.zeros((2, 2, 3), dtype=np.uint8) for _ in frame_indices]
+
+    monkeypatch.setattr(model_module, "load_image_frames", fake_load_image_frames)
+    # Ten frames of one series, split across two files.
+    monkeypatch.setattr(model_module, "read_dicom_series_info", lambda image_bytes: ("1.2.3", 5))
+    monkeypatch.setattr(model_module, "create_heatmap", lambda array: "heatmap")
+
+    study = model_module.predict_study([b"first-half", b"second-half"])
+
+    # Series frames 0, 3, 6 and 9 are sampled; only those are decoded.
+    assert decoded == [(b"first-half", [0, 3]), (b"second-half", [1, 4])]
+    (series,) = study["series"]
+    assert series["frame_count"] == 10
+    assert series["frames_analyzed"] == 4
+    assert series["peak_frame_index"] == 6
+
+
+def test_fastapi_model_scores_preprocessed_tensor_without_decoding(monkeypatch):
+    _stub_ml_stack(monkeypatch, max_probabilities=(0.7, 0.1))
+    model_module = _import_model_module()
+    heatmap_inputs = []
+    monkeypatch.setattr(
+        model_module,
+        "load_image_frames",
+        lambda image_bytes: pytest.fail("preprocessed tensors must not be decoded"),
+    )
+    monkeypatch.setattr(
+        model_module,
+        "create_heatmap",
+        lambda array: heatmap_inputs.append(array) or "heatmap",
+    )
+    tensors = np.zeros((2, 3, 224, 224), dtype=np.float16)
+    buffer = BytesIO()
+    np.save(buffer, tensors)
+
+    result = model_module.predict_model_input(buffer.getvalue(), frame_count=40)
+
+    assert result["frame_count"] == 40
+    assert result["frames_analyzed"] == 2
+    # The two tensors are source frames 0 and 39.
+    assert result["peak_frame_index"] == 39
+    assert result["anomaly_probability"] == pytest.approx(0.9)
+    assert heatmap_inputs[0].shape == (224, 224, 3)
+    assert heatmap_inputs[0].dtype == np.uint8
+
+    small = BytesIO()
+    np.save(small, np.zeros((1, 3, 32, 32), dtype=np.float16))
+    with pytest.raises(ValueError, match="224x224"):
+        model_module.predict_model_input(small.getvalue())
+
+
+def test_fastapi_utils_model_input_round_trips_to_rgb():
+    utils = _fastapi_utils_module()
+    rgb = np.array([[[0, 128, 255]]], dtype=np.uint8)
+    tensor = ((rgb / 255.0 - utils.IMAGENET_MEAN) / utils.IMAGENET_STD).transpose(2, 0, 1)
+    buffer = BytesIO()
+    np.save(buffer, tensor.astype(np.float16))
+
+    loaded = utils.load_model_input(buffer.getvalue())
+
+    assert loaded.shape == (1, 3, 1, 1)
+    assert np.array_equal(utils.model_input_to_rgb(loaded[0]), rgb)
+    with pytest.raises(ValueError):
+        utils.load_model_input(b"not-npy")
+
+
 def test_model_registry_resolves_known_and_unknown_models():
     module_name = "backend.ai_service_fastapi.model_registry"
     sys.modules.pop(module_name, None)
@@ -310,61 +685,8 @@ def test_model_registry_load_handles_missing_and_invalid_files(monkeypatch, tmp_
 
 
 def test_fastapi_model_warmup_exposes_ready_metadata(monkeypatch):
-    fake_torch = types.ModuleType("torch")
-
-    class NoGradContext:
-        def __enter__(self):
-            return None
-
-        def __exit__(self, exc_type, exc, tb):
-            return False
-
-    class FakeScalar:
-        def item(self):
-            return 0.25
-
-    class FakeProbabilities:
-        def max(self):
-            return FakeScalar()
-
-    setattr(fake_torch, "no_grad", lambda: NoGradContext())
-    setattr(fake_torch, "softmax", lambda logits, dim=1: FakeProbabilities())
-
-    fake_transforms = types.ModuleType("torchvision.transforms")
-
-    class FakeTensor:
-        def unsqueeze(self, _dim):
-            return "tensor-batch"
-
-    setattr(fake_transforms, "Resize", lambda size: ("resize", size))
-    setattr(fake_transforms, "ToTensor", lambda: "to-tensor")
-    setattr(
-        fake_transforms,
-        "Normalize",
-        lambda mean, std: ("normalize", tuple(mean), tuple(std)),
-    )
-    setattr(fake_transforms, "Compose", lambda steps: (lambda image: FakeTensor()))
-
-    fake_models = types.ModuleType("torchvision.models")
-
-    class FakeModel:
-        def eval(self):
-            return self
-
-        def __call__(self, tensor):
-            return "logits"
-
-    setattr(fake_models, "resnet50", lambda weights=None: FakeModel())
-
-    fake_torchvision = types.ModuleType("torchvision")
-    setattr(fake_torchvision, "transforms", fake_transforms)
-    setattr(fake_torchvision, "models", fake_models)
-
     monkeypatch.setenv("AI_MODEL_ANOMALY_THRESHOLD", "not-a-number")
-    monkeypatch.setitem(sys.modules, "torch", fake_torch)
-    monkeypatch.setitem(sys.modules, "torchvision", fake_torchvision)
-    monkeypatch.setitem(sys.modules, "torchvision.transforms", fake_transforms)
-    monkeypatch.setitem(sys.modules, "torchvision.models", fake_models)
+    _stub_ml_stack(monkeypatch)
 
     registry_module_name = "backend.ai_service_fastapi.model_registry"
     registry_module = importlib.import_module(registry_module_name)
@@ -405,3 +727,122 @@ def test_doctor_profile_serializer_exposes_expected_fields():
     assert str(data["id"]) == str(profile.id)
     assert str(data["user"]) == str(user.id)
     assert data["specialty"] == "Radiology"
+
+
+def test_fastapi_weights_verification_caches_digest_by_size_and_mtime(monkeypatch, tmp_path):
+    sys.modules.pop("backend.ai_service_fastapi.weights", None)
+    weights_module = importlib.import_module("backend.ai_service_fastapi.weights")
+    weights_path = tmp_path / "resnet50.pt"
+    weights_path.write_bytes(b"weights-v1")
+    expected_sha256 = hashlib.sha256(b"weights-v1").hexdigest()
+
+    assert weights_module.verify_weights(weights_path, expected_sha256) is True
+    assert weights_module.digest_cache_path(weights_path).exists()
+
+    monkeypatch.setattr(weights_module, "compute_sha256", lambda _path: pytest.fail("re-hashed"))
+    assert weights_module.verify_weights(weights_path, expected_sha256.upper()) is True
+    assert weights_module.verify_weights(weights_path, "") is False
+
+    monkeypatch.undo()
+    weights_path.write_bytes(b"weights-v2-tampered")
+    with pytest.raises(weights_module.WeightsVerificationError):
+        weights_module.verify_weights(weights_path, expected_sha256)
+
+
+def test_fastapi_weights_reject_safetensors_artifacts(tmp_path):
+    weights_module = importlib.import_module("backend.ai_service_fastapi.weights")
+
+    with pytest.raises(ValueError, match="torch.save"):
+        weights_module.load_state_dict(tmp_path / "resnet50.safetensors")
+
+
+def test_fastapi_model_loads_registry_weights_with_assign(monkeypatch, tmp_path):
+    monkeypatch.setenv("AI_MODEL_WEIGHTS_PATH", str(tmp_path / "resnet50.pt"))
+    _stub_ml_stack(monkeypatch)
+    model_module = _import_model_module()
+    loaded_paths = []
+    monkeypatch.setattr(model_module, "verify_weights", lambda path, sha256: True)
+    monkeypatch.setattr(
+        model_module,
+        "load_state_dict",
+        lambda path: loaded_paths.append(path) or {"fc.weight": "mapped"},
+    )
+
+    metadata = model_module.warmup_model()
+
+    assert loaded_paths == [tmp_path / "resnet50.pt"]
+    assert model_module._get_model().state_dict == ({"fc.weight": "mapped"}, True)
+    assert metadata["weights_verified"] is True
+    assert metadata["weights_path"] == str(tmp_path / "resnet50.pt")
+
+
+def test_fastapi_model_warmup_runs_synthetic_batches_once(monkeypatch):
+    monkeypatch.setenv("AI_WARMUP_BATCH_SIZES", "1,8,64")
+    monkeypatch.setenv("AI_TORCH_THREADS", "3")
+    _stub_ml_stack(monkeypatch)
+    thread_calls = []
+    monkeypatch.setattr(sys.modules["torch"], "set_num_threads", thread_calls.append)
+    model_module = _import_model_module()
+    batches = []
+    monkeypatch.setattr(
+        model_module, "_score_batch", lambda model, batch: batches.append(len(batch)) or []
+    )
+
+    first = model_module.warmup_model()
+    second = model_module.warmup_model()
+
+    assert batches == [1, 8, 16]
+    assert thread_calls == [3]
+    assert first["ready"] is True and first["warmup_batch_sizes"] == [1, 8, 16]
+    assert first["torch_threads"] == 3 and first["torch_interop_threads"] == 1
+    assert second["warmup_ms"] == first["warmup_ms"]
+
+
+def test_fastapi_runtime_reads_cgroup_cpu_quota(monkeypatch, tmp_path):
+    sys.modules.pop("backend.ai_service_fastapi.runtime", None)
+    runtime_module = importlib.import_module("backend.ai_service_fastapi.runtime")
+    monkeypatch.setattr(runtime_module.os, "sched_getaffinity", lambda _pid: set(range(16)))
+    monkeypatch.setenv("WEB_CONCURRENCY", "2")
+
+    (tmp_path / "cpu.max").write_text("250000 100000\n", encoding="utf-8")
+    assert runtime_module.cgroup_cpu_quota(tmp_path) == 2.5
+    assert runtime_module.default_torch_threads(tmp_path) == 1
+
+    (tmp_path / "cpu.max").write_text("max 100000\n", encoding="utf-8")
+    assert runtime_module.available_cpus(tmp_path) == 16
+
+    (tmp_path / "cpu.max").unlink()
+    (tmp_path / "cpu").mkdir()
+    (tmp_path / "cpu" / "cpu.cfs_quota_us").write_text("400000", encoding="utf-8")
+    (tmp_path / "cpu" / "cpu.cfs_period_us").write_text("100000", encoding="utf-8")
+    assert runtime_module.default_torch_threads(tmp_path) == 2
+
+
+def test_fastapi_model_renders_cam_from_the_scoring_pass(monkeypatch):
+    _stub_ml_stack(monkeypatch)
+    model_module = _import_model_module()
+    cams = np.zeros((2, 7, 7), dtype=np.float32)
+    cams[1, 2, 2] = 1.0
+    rendered = []
+    monkeypatch.setattr(
+        model_module,
+        "load_image_frames",
+        lambda image_bytes, **_kwargs: [np.zeros((4, 4, 3), dtype=np.uint8)] * 2,
+    )
+    monkeypatch.setattr(model_module, "_score_batch", lambda model, batch: ([0.1, 0.6], cams))
+    monkeypatch.setattr(
+        model_module,
+        "encode_cam_heatmap",
+        lambda cam, size=None: rendered.append((cam, size)) or "cam-heatmap",
+    )
+    monkeypatch.setattr(
+        model_module, "create_heatmap", lambda array: pytest.fail("input colormap used")
+    )
+
+    result = model_module.predict_image(b"image-bytes", heatmap_size=256)
+
+    assert result["heatmap"] == "cam-heatmap"
+    assert result["heatmap_source"] == "cam"
+    assert result["heatmap_size"] == 256
+    assert np.array_equal(rendered[0][0], cams[1]) and rendered[0][1] == 256
+    assert model_module.predict_image(b"image-bytes")["heatmap_size"] == 7
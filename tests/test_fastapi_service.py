@@ -1,17 +1,23 @@
 from __future__ import annotations
 
+import asyncio
 import hashlib
 import importlib
+import subprocess
 import sys
+import threading
+import time
 import types
+from pathlib import Path
 
+import pytest
 from fastapi.testclient import TestClient
 
 fake_model = types.ModuleType("backend.ai_service_fastapi.model")
 setattr(
     fake_model,
     "predict_image",
-    lambda _: {
+    lambda _content, **_kwargs: {
         "anomaly_probability": 0.12,
         "anomaly_threshold": 0.35,
         "is_anomalous": False,
@@ -21,6 +27,16 @@ setattr(
         "device": "cpu",
     },
 )
+setattr(
+    fake_model,
+    "predict_study",
+    lambda files, **_kwargs: {"anomaly_probability": 0.5, "series_count": 1, "heatmap": ""},
+)
+setattr(
+    fake_model,
+    "predict_model_input",
+    lambda payload, **_kwargs: {"anomaly_probability": 0.2, "heatmap": ""},
+)
 setattr(
     fake_model,
     "get_model_metadata",
@@ -49,10 +65,21 @@ setattr(
         "ready": True,
     },
 )
+
+
+def _async_return(value):
+    async def fake(*_args, **_kwargs):
+        return value
+
+    return fake
+
+
 fake_mongo = types.ModuleType("backend.ai_service_fastapi.mongo")
-setattr(fake_mongo, "get_ai_result", lambda image_id: None)
-setattr(fake_mongo, "check_mongo_connection", lambda: True)
-setattr(fake_mongo, "ensure_indexes", lambda: True)
+setattr(fake_mongo, "get_ai_result", _async_return(None))
+setattr(fake_mongo, "check_mongo_connection", _async_return(True))
+setattr(fake_mongo, "ensure_indexes", _async_return(True))
+setattr(fake_mongo, "open_client", lambda: None)
+setattr(fake_mongo, "close_client", lambda: None)
 
 sys.modules["backend.ai_service_fastapi.model"] = fake_model
 sys.modules["backend.ai_service_fastapi.mongo"] = fake_mongo
@@ -61,11 +88,16 @@ fastapi_main = importlib.import_module("backend.ai_service_fastapi.main")
 client = TestClient(fastapi_main.app)
 
 
+@pytest.fixture(autouse=True)
+def model_ready(monkeypatch):
+    monkeypatch.setattr(fastapi_main, "_startup", {"state": "ready"})
+
+
 def test_analyze_image_returns_prediction(monkeypatch):
     monkeypatch.setattr(
         fastapi_main,
         "predict_image",
-        lambda _: {
+        lambda _content, **_kwargs: {
             "anomaly_probability": 0.12,
             "anomaly_threshold": 0.35,
             "is_anomalous": False,
@@ -126,9 +158,10 @@ def test_health_and_model_info_endpoints(monkeypatch):
 
 
 def test_ready_endpoint_requires_model_and_mongo(monkeypatch):
+    monkeypatch.setattr(fastapi_main, "_startup", {"state": "ready"})
     monkeypatch.setattr(
         fastapi_main,
-        "warmup_model",
+        "get_model_metadata",
         lambda: {
             "model": "resnet50",
             "model_version": "demo",
@@ -136,17 +169,137 @@ def test_ready_endpoint_requires_model_and_mongo(monkeypatch):
             "anomaly_threshold": 0.35,
         },
     )
-    monkeypatch.setattr(fastapi_main, "check_mongo_connection", lambda: True)
+    monkeypatch.setattr(fastapi_main, "check_mongo_connection", _async_return(True))
+    monkeypatch.setattr(fastapi_main, "_ready_cache", {})
 
     ready_response = client.get("/ready")
     assert ready_response.status_code == 200
     assert ready_response.json()["status"] == "ready"
 
-    monkeypatch.setattr(fastapi_main, "check_mongo_connection", lambda: False)
+    monkeypatch.setattr(fastapi_main, "check_mongo_connection", _async_return(False))
+    assert client.get("/ready").status_code == 200
+
+    fastapi_main._ready_cache.clear()
     degraded_response = client.get("/ready")
     assert degraded_response.status_code == 503
 
 
+def test_ready_reports_background_startup_progress(monkeypatch):
+    monkeypatch.setattr(fastapi_main, "_startup", {"state": "not_started"})
+    monkeypatch.setattr(fastapi_main, "_ready_cache", {})
+    monkeypatch.setattr(fastapi_main, "check_mongo_connection", _async_return(True))
+    loaded = {}
+
+    def fake_warmup():
+        starting = client.get("/ready")
+        loaded["starting"] = (starting.status_code, starting.json()["detail"]["startup"])
+        loaded["health"] = client.get("/health").status_code
+        return {"model": "resnet50", "ready": True}
+
+    monkeypatch.setattr(fastapi_main, "warmup_model", fake_warmup)
+
+    fastapi_main.load_model_in_background()
+
+    assert loaded["starting"][0] == 503
+    assert loaded["starting"][1]["state"] == "loading"
+    assert loaded["health"] == 200
+    monkeypatch.setattr(fastapi_main, "warmup_model", lambda: {"model": "resnet50"})
+    ready_response = client.get("/ready")
+    assert ready_response.status_code == 200
+    assert ready_response.json()["startup"]["state"] == "ready"
+    assert ready_response.json()["startup"]["load_ms"] >= 0
+
+    monkeypatch.setattr(fastapi_main, "warmup_model", lambda: 1 / 0)
+    fastapi_main.load_model_in_background()
+    assert fastapi_main.startup_status()["state"] == "failed"
+
+
+def test_ready_restarts_a_failed_load_in_the_background(monkeypatch):
+    monkeypatch.setattr(fastapi_main, "_startup", {"state": "failed", "error": "boom"})
+    loads = []
+    loaded = threading.Event()
+
+    def fake_load():
+        loads.append(threading.current_thread().name)
+        loaded.set()
+
+    monkeypatch.setattr(fastapi_main, "load_model_in_background", fake_load)
+    monkeypatch.setattr(fastapi_main, "warmup_model", lambda: 1 / 0)
+
+    response = client.get("/ready")
+    assert response.status_code == 503
+    assert response.json()["detail"]["startup"]["state"] == "importing"
+    assert loaded.wait(5)
+    # A second probe while the restarted load runs does not start another one.
+    assert client.get("/ready").status_code == 503
+    assert loads == ["ai-model-startup"]
+
+
+def test_analyze_waits_for_the_model_while_health_answers(monkeypatch):
+    monkeypatch.setattr(fastapi_main, "_startup", {"state": "not_started"})
+    loading = threading.Event()
+    release = threading.Event()
+
+    def slow_warmup():
+        loading.set()
+        assert release.wait(5)
+        return {"model": "resnet50"}
+
+    monkeypatch.setattr(fastapi_main, "warmup_model", slow_warmup)
+    monkeypatch.setattr(fastapi_main, "predict_image", lambda _content, **_kwargs: {"heatmap": ""})
+    assert fastapi_main.start_model_loader()
+    assert loading.wait(5)
+
+    try:
+        assert client.get("/health").status_code == 200
+        image = client.post("/analyze-image", files={"file": ("scan.png", b"img", "image/png")})
+        study = client.post("/analyze-study", files=[("files", ("a.png", b"img", "image/png"))])
+    finally:
+        release.set()
+
+    assert image.status_code == 503
+    assert image.json()["detail"]["startup"]["state"] == "loading"
+    assert study.status_code == 503
+    for _ in range(100):
+        if fastapi_main.startup_status()["state"] == "ready":
+            break
+        time.sleep(0.05)
+    assert (
+        client.post("/analyze-image", files={"file": ("scan.png", b"img", "image/png")}).status_code
+        == 200
+    )
+
+
+def test_analyze_runs_inference_off_the_event_loop(monkeypatch):
+    def predict_off_loop(_content, **_kwargs):
+        with pytest.raises(RuntimeError):
+            asyncio.get_running_loop()
+        return {"anomaly_probability": 0.1, "heatmap": ""}
+
+    monkeypatch.setattr(fastapi_main, "predict_image", predict_off_loop)
+
+    response = client.post("/analyze-image", files={"file": ("scan.png", b"img", "image/png")})
+
+    assert response.status_code == 200
+
+
+def test_app_import_defers_the_ml_stack():
+    completed = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            "import sys, backend.ai_service_fastapi.main; "
+            "print(sorted({'torch', 'torchvision', 'cv2', 'pydicom'} & set(sys.modules)))",
+        ],
+        cwd=Path(__file__).resolve().parents[1],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    assert completed.stdout.strip() == "[]"
+
+
 def test_analyze_image_rejects_unsupported_types_and_oversized_files(monkeypatch):
     monkeypatch.setattr(fastapi_main, "MAX_UPLOAD_BYTES", 4)
     monkeypatch.setattr(fastapi_main, "MAX_UPLOAD_MB", 0)
@@ -178,7 +331,7 @@ def test_analyze_image_returns_decode_error(monkeypatch):
     monkeypatch.setattr(
         fastapi_main,
         "predict_image",
-        lambda _: (_ for _ in ()).throw(ValueError("Unable to decode image")),
+        lambda _content, **_kwargs: (_ for _ in ()).throw(ValueError("Unable to decode image")),
     )
 
     response = client.post(
@@ -190,13 +343,104 @@ def test_analyze_image_returns_decode_error(monkeypatch):
     assert response.json()["detail"] == "Unable to decode image"
 
 
-def test_ai_result_returns_document(monkeypatch):
+def test_analyze_study_scores_all_uploaded_files(monkeypatch):
+    received = {}
+
+    def fake_predict_study(files, heatmap_size=None):
+        received["files"] = files
+        return {"anomaly_probability": 0.4, "series_count": 1, "frame_count": 2, "heatmap": ""}
+
+    monkeypatch.setattr(fastapi_main, "predict_study", fake_predict_study)
+
+    response = client.post(
+        "/analyze-study",
+        headers={"X-Study-Id": "study-1"},
+        files=[
+            ("files", ("slice-1.dcm", b"slice-1", "application/dicom")),
+            ("files", ("slice-2.dcm", b"slice-2", "application/dicom")),
+        ],
+    )
+
+    assert response.status_code == 200
+    assert received["files"] == [b"slice-1", b"slice-2"]
+    assert response.json()["file_count"] == 2
+    assert response.json()["study_id"] == "study-1"
+    assert "X-Process-Time-Ms" in response.headers
+
+
+def test_analyze_image_routes_preprocessed_tensors_without_decoding(monkeypatch):
+    received = {}
+
+    def fake_predict_model_input(payload, frame_count=None, heatmap_size=None):
+        received["payload"] = payload
+        received["frame_count"] = frame_count
+        return {"anomaly_probability": 0.3, "heatmap": "", "model": "resnet50"}
+
+    monkeypatch.setattr(fastapi_main, "predict_model_input", fake_predict_model_input)
     monkeypatch.setattr(
         fastapi_main,
-        "get_ai_result",
-        lambda image_id: {"image_id": image_id, "anomaly_probability": 0.77},
+        "predict_image",
+        lambda _content, **_kwargs: (_ for _ in ()).throw(
+            AssertionError("original decode path used")
+        ),
+    )
+
+    tensor_bytes = b"\x93NUMPY\x01\x00fake-tensor"
+    response = client.post(
+        "/analyze-image",
+        headers={"X-Image-SHA256": "source-sha", "X-Source-Frame-Count": "40"},
+        files={"file": ("image.npy", tensor_bytes, "application/x-npy")},
     )
 
+    assert response.status_code == 200
+    assert received == {"payload": tensor_bytes, "frame_count": 40}
+    assert response.json()["input_sha256"] == "source-sha"
+
+
+def test_analyze_image_passes_requested_heatmap_size(monkeypatch):
+    received = {}
+
+    def fake_predict_image(_content, content_type=None, heatmap_size=None):
+        received["heatmap_size"] = heatmap_size
+        return {"anomaly_probability": 0.1, "heatmap": "", "model": "resnet50"}
+
+    monkeypatch.setattr(fastapi_main, "predict_image", fake_predict_image)
+
+    response = client.post(
+        "/analyze-image",
+        params={"heatmap_size": 224},
+        files={"file": ("scan.png", b"fake-image", "image/png")},
+    )
+    too_large = client.post(
+        "/analyze-image",
+        params={"heatmap_size": fastapi_main.MAX_HEATMAP_SIZE + 1},
+        files={"file": ("scan.png", b"fake-image", "image/png")},
+    )
+
+    assert response.status_code == 200
+    assert received["heatmap_size"] == 224
+    assert too_large.status_code == 422
+
+
+def test_metrics_endpoint_reports_decode_timings(monkeypatch):
+    monkeypatch.setattr(
+        fastapi_main.metrics,
+        "snapshot",
+        lambda: {"counters": {}, "timings": {"decode.jpeg": {"count": 1}}},
+    )
+
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.json()["timings"]["decode.jpeg"]["count"] == 1
+
+
+def test_ai_result_returns_document(monkeypatch):
+    async def fake_get_ai_result(image_id):
+        return {"image_id": image_id, "anomaly_probability": 0.77}
+
+    monkeypatch.setattr(fastapi_main, "get_ai_result", fake_get_ai_result)
+
     response = client.get("/ai-result", params={"image_id": "img-123"})
 
     assert response.status_code == 200
@@ -204,7 +448,7 @@ def test_ai_result_returns_document(monkeypatch):
 
 
 def test_ai_result_returns_404(monkeypatch):
-    monkeypatch.setattr(fastapi_main, "get_ai_result", lambda _: None)
+    monkeypatch.setattr(fastapi_main, "get_ai_result", _async_return(None))
 
     response = client.get("/ai-result", params={"image_id": "missing"})
 
@@ -1,19 +1,37 @@
 import base64
+from datetime import timedelta
 from io import BytesIO
 
+import numpy as np
 import pydicom
 import pytest
+from PIL import Image
 from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.cache import cache
+from django.core.management import call_command
+from django.utils import timezone
 from pydicom.dataset import FileDataset, FileMetaDataset
 from pydicom.uid import ExplicitVRLittleEndian, SecondaryCaptureImageStorage, generate_uid
 from rest_framework.test import APIClient
 
 from apps.authentication.models import User
-from apps.imaging.models import MedicalImage
+from apps.imaging.models import MedicalImage, StoredObject
+from apps.imaging.preprocessing import model_input_info_key, model_input_key
+from apps.imaging.previews import preview_key
+from apps.imaging.services import handle_image_upload
 from apps.imaging.storage import S3StorageService
 from apps.imaging.storage import StorageError
-from apps.imaging.tasks import ai_inference_task
+from apps.imaging.tasks import (
+    _update_image_metadata,
+    ai_inference_task,
+    collect_unreferenced_objects,
+    generate_previews_task,
+    preprocess_image_task,
+    queue_image_processing,
+    sweep_stuck_images,
+)
 from apps.patients.models import PatientProfile
+from curamind_core.metrics import image_pipeline_snapshot, image_sweeper_snapshot
 
 
 def build_test_dicom_bytes() -> bytes:
@@ -67,6 +85,7 @@ def test_image_upload():
     image = MedicalImage.objects.get(id=response.data["id"])
     assert image.metadata["upload_sha256"]
     assert image.metadata["stored_sha256"]
+    assert image.stored_sha256 == image.metadata["stored_sha256"]
 
 
 @pytest.mark.django_db
@@ -161,6 +180,10 @@ def test_ai_inference_task_marks_image_processed(monkeypatch):
     assert image.metadata["ai_service_processing_ms"] == 12.5
     assert image.metadata["image_sha256"] == "input-sha"
     assert image.metadata["processing_attempts"] == 1
+    assert image.ai_model_version == "demo-resnet50-v1"
+    assert image.ai_anomaly_probability == 0.1
+    assert image.ai_is_anomalous is False
+    assert image.processed_at is not None
 
 
 @pytest.mark.django_db
@@ -444,3 +467,545 @@ def test_image_upload_returns_400_when_storage_fails(monkeypatch):
 
     assert response.status_code == 400
     assert response.data["detail"] == "Unable to store the uploaded image right now."
+
+
+def _create_stored_image(owner_user, owner_profile, *, size=(600, 400)) -> MedicalImage:
+    buffer = BytesIO()
+    Image.new("RGB", size, color=(90, 140, 200)).save(buffer, format="PNG")
+    storage = S3StorageService()
+    key = storage.build_key("preview-test.png")
+    storage.upload(BytesIO(buffer.getvalue()), key)
+    return MedicalImage.objects.create(
+        patient=owner_profile,
+        uploaded_by=owner_user,
+        file_name="preview-test.png",
+        s3_key=key,
+        modality="X-Ray",
+        content_type="image/png",
+        file_size=len(buffer.getvalue()),
+        metadata={"stored_sha256": "a" * 64},
+        stored_sha256="a" * 64,
+    )
+
+
+@pytest.mark.django_db
+def test_generate_previews_task_serves_cacheable_previews_to_authorized_users():
+    owner_user = User.objects.create_user(
+        email="patient-preview@example.com",
+        password="StrongPass123",
+        role=User.Role.PATIENT,
+    )
+    owner_profile = PatientProfile.objects.create(user=owner_user)
+    other_user = User.objects.create_user(
+        email="patient-preview-other@example.com",
+        password="StrongPass123",
+        role=User.Role.PATIENT,
+    )
+    PatientProfile.objects.create(user=other_user)
+    image = _create_stored_image(owner_user, owner_profile)
+
+    assert generate_previews_task(str(image.id)) == str(image.id)
+    image.refresh_from_db()
+
+    previews = image.metadata["previews"]
+    assert list(previews["sizes"]) == ["128", "256", "512"]
+    assert previews["content_type"] == "image/webp"
+    assert "tiles" not in previews
+
+    client = APIClient()
+    client.force_authenticate(user=owner_user)
+    response = client.get(f"/imaging/{image.id}/preview/128")
+
+    assert response.status_code == 200
+    assert response["Content-Type"] == "image/webp"
+    assert "immutable" in response["Cache-Control"]
+    assert "private" in response["Cache-Control"]
+    assert max(Image.open(BytesIO(response.content)).size) == 128
+
+    cached = client.get(f"/imaging/{image.id}/preview/128", HTTP_IF_NONE_MATCH=response["ETag"])
+    assert cached.status_code == 304
+    assert cached["ETag"] == response["ETag"]
+
+    assert client.get(f"/imaging/{image.id}/preview/64").status_code == 404
+
+    other_client = APIClient()
+    other_client.force_authenticate(user=other_user)
+    assert other_client.get(f"/imaging/{image.id}/preview/128").status_code == 404
+
+
+@pytest.mark.django_db
+def test_generate_previews_task_builds_tile_pyramid_for_large_images(monkeypatch):
+    monkeypatch.setattr("apps.imaging.previews.PREVIEW_TILE_MIN_PX", 500)
+    monkeypatch.setattr("apps.imaging.previews.PREVIEW_TILE_SIZE", 128)
+    owner_user = User.objects.create_user(
+        email="patient-tiles@example.com",
+        password="StrongPass123",
+        role=User.Role.PATIENT,
+    )
+    owner_profile = PatientProfile.objects.create(user=owner_user)
+    image = _create_stored_image(owner_user, owner_profile)
+
+    generate_previews_task(str(image.id))
+    image.refresh_from_db()
+
+    tiles = image.metadata["previews"]["tiles"]
+    assert tiles["levels"] == 4
+    assert tiles["tile_size"] == 128
+
+    client = APIClient()
+    client.force_authenticate(user=owner_user)
+    edge_tile = client.get(f"/imaging/{image.id}/tiles/3/4_3")
+    top_tile = client.get(f"/imaging/{image.id}/tiles/0/0_0")
+
+    assert edge_tile.status_code == 200
+    assert Image.open(BytesIO(edge_tile.content)).size == (88, 16)
+    assert Image.open(BytesIO(top_tile.content)).size == (75, 50)
+    assert "immutable" in top_tile["Cache-Control"]
+    assert client.get(f"/imaging/{image.id}/tiles/4/0_0").status_code == 404
+
+
+@pytest.mark.django_db
+def test_generate_previews_task_keeps_pipeline_running_when_render_fails():
+    owner_user = User.objects.create_user(
+        email="patient-preview-fail@example.com",
+        password="StrongPass123",
+        role=User.Role.PATIENT,
+    )
+    owner_profile = PatientProfile.objects.create(user=owner_user)
+    image = _create_stored_image(owner_user, owner_profile)
+    S3StorageService().local_path(image.s3_key).write_bytes(b"not an image")
+
+    assert generate_previews_task(str(image.id)) == str(image.id)
+    image.refresh_from_db()
+
+    assert "previews" not in image.metadata
+    assert image.metadata["preview_error"]
+
+
+@pytest.mark.django_db
+def test_preprocess_caches_model_input_and_inference_sends_it(monkeypatch, settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    owner_user = User.objects.create_user(
+        email="patient-tensor@example.com",
+        password="StrongPass123",
+        role=User.Role.PATIENT,
+    )
+    owner_profile = PatientProfile.objects.create(user=owner_user)
+    image = _create_stored_image(owner_user, owner_profile)
+    duplicate = _create_stored_image(owner_user, owner_profile)
+
+    preprocess_image_task(str(image.id))
+    preprocess_image_task(str(duplicate.id))
+    image.refresh_from_db()
+    duplicate.refresh_from_db()
+
+    assert image.metadata["model_input_key"] == f"preprocessed/{'a' * 64}-224.npy"
+    assert image.metadata["model_input_cached"] is False
+    assert image.metadata["model_input_frame_count"] == 1
+    assert duplicate.metadata["model_input_key"] == image.metadata["model_input_key"]
+    assert duplicate.metadata["model_input_cached"] is True
+    # A duplicate image starts without metadata, so the count comes from the sidecar.
+    assert duplicate.metadata["model_input_frame_count"] == 1
+    assert duplicate.metadata["model_input_shape"] == [1, 3, 224, 224]
+
+    tensor = np.load(BytesIO(S3StorageService().download(image.metadata["model_input_key"])))
+    assert tensor.shape == (1, 3, 224, 224)
+    assert tensor.dtype == np.float16
+
+    calls = []
+
+    def fake_request_inference(image_bytes, image_id, **kwargs):
+        calls.append((image_bytes, kwargs))
+        return {"anomaly_probability": 0.2, "model": "resnet50"}
+
+    monkeypatch.setattr("apps.imaging.tasks.request_inference", fake_request_inference)
+    ai_inference_task(str(image.id))
+    image.refresh_from_db()
+
+    sent_bytes, sent_options = calls[0]
+    assert sent_bytes.startswith(b"\x93NUMPY")
+    assert sent_options == {
+        "content_type": "application/x-npy",
+        "image_sha256": "a" * 64,
+        "frame_count": 1,
+    }
+    assert image.status == MedicalImage.Status.PROCESSED
+
+
+@pytest.mark.django_db
+def test_backfill_image_columns_promotes_metadata_in_batches():
+    user = User.objects.create(email="backfill-patient@example.com", role=User.Role.PATIENT)
+    profile = PatientProfile.objects.create(user=user)
+    legacy = [
+        MedicalImage.objects.create(
+            patient=profile,
+            file_name=f"legacy-{index}.png",
+            s3_key=f"medical-images/legacy-{index}.png",
+            content_type="image/png",
+            file_size=1,
+            status=MedicalImage.Status.PROCESSED,
+            metadata={
+                "stored_sha256": f"{index}" * 64,
+                "ai_model_version": "demo-resnet50-v1",
+                "ai_anomaly_probability": 0.7,
+                "ai_is_anomalous": True,
+                "inference_completed_at": "2030-01-01T10:00:00+00:00",
+            },
+        )
+        for index in range(3)
+    ]
+    pending = MedicalImage.objects.create(
+        patient=profile,
+        file_name="pending.png",
+        s3_key="medical-images/pending.png",
+        content_type="image/png",
+        file_size=1,
+        metadata={"stored_sha256": "f" * 64, "ai_is_anomalous": "yes"},
+    )
+
+    call_command("backfill_image_columns", "--dry-run")
+    assert not MedicalImage.objects.filter(ai_is_anomalous=True).exists()
+
+    call_command("backfill_image_columns", "--batch-size", "2")
+
+    assert MedicalImage.objects.filter(ai_is_anomalous=True).count() == 3
+    legacy[0].refresh_from_db()
+    assert legacy[0].stored_sha256 == "0" * 64
+    assert legacy[0].ai_model_version == "demo-resnet50-v1"
+    assert legacy[0].ai_anomaly_probability == 0.7
+    assert legacy[0].processed_at.year == 2030
+    pending.refresh_from_db()
+    assert pending.stored_sha256 == "f" * 64
+    assert pending.ai_is_anomalous is None
+    assert pending.processed_at is None
+
+
+@pytest.mark.django_db
+def test_duplicate_uploads_share_storage_and_reuse_the_ai_result(
+    monkeypatch, settings, django_capture_on_commit_callbacks
+):
+    copied_results = {}
+    for target in ("apps.imaging.services", "apps.imaging.tasks"):
+        monkeypatch.setattr(f"{target}.store_processing_log", lambda *args, **kwargs: "")
+    monkeypatch.setattr("apps.imaging.services.store_image_metadata", lambda *args: "")
+    monkeypatch.setattr(
+        "apps.imaging.tasks.get_ai_result_by_image", lambda image_id: {"result": {"score": 0.8}}
+    )
+    monkeypatch.setattr(
+        "apps.imaging.tasks.store_ai_result",
+        lambda image_id, result: copied_results.setdefault(image_id, result),
+    )
+    user = User.objects.create(email="dedup-patient@example.com", role=User.Role.PATIENT)
+    PatientProfile.objects.create(user=user)
+    png_bytes = base64.b64decode(
+        "iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAQAAAC1HAwCAAAAC0lE"
+        "QVR4nGNgYAAAAAMAASsJTYQAAAAASUVORK5CYII="
+    )
+
+    def upload(name):
+        return handle_image_upload(
+            user, SimpleUploadedFile(name, png_bytes, content_type="image/png")
+        )
+
+    first, second = upload("first.png"), upload("second.png")
+    stored = StoredObject.objects.get()
+    assert first.s3_key == second.s3_key == stored.s3_key
+    assert stored.s3_key == f"medical-images/sha256/{first.stored_sha256}"
+    assert second.metadata["original_file_name"] == "second.png"
+    assert second.metadata["original_content_type"] == "image/png"
+    assert stored.ref_count == 2
+    assert second.status == MedicalImage.Status.UPLOADED
+
+    MedicalImage.objects.filter(id=first.id).update(
+        status=MedicalImage.Status.PROCESSED,
+        ai_model_version=settings.AI_MODEL_VERSION,
+        ai_anomaly_probability=0.8,
+        ai_is_anomalous=True,
+        processed_at=timezone.now(),
+        metadata={
+            **first.metadata,
+            "ai_model_version": settings.AI_MODEL_VERSION,
+            "ai_is_anomalous": True,
+        },
+    )
+    third = upload("third.png")
+    assert third.status == MedicalImage.Status.PROCESSED
+    assert third.ai_is_anomalous is True
+    assert third.metadata["ai_result_reused_from"] == str(first.id)
+    assert copied_results == {str(third.id): {"score": 0.8}}
+
+    settings.AI_MODEL_VERSION = "demo-resnet50-v2"
+    assert upload("fourth.png").status == MedicalImage.Status.UPLOADED
+
+    local_file = S3StorageService().local_path(stored.s3_key)
+    images = list(MedicalImage.objects.filter(s3_key=stored.s3_key))
+    with django_capture_on_commit_callbacks(execute=True):
+        for image in images[:-1]:
+            image.delete()
+    assert StoredObject.objects.get().ref_count == 1
+    assert local_file.exists()
+    with django_capture_on_commit_callbacks(execute=True):
+        images[-1].delete()
+    # The last release keeps the row and the bytes for the collector.
+    stored = StoredObject.objects.get()
+    assert stored.ref_count == 0
+    assert stored.released_at is not None
+    assert local_file.exists()
+
+    again = upload("again.png")
+    stored.refresh_from_db()
+    assert again.s3_key == stored.s3_key
+    assert (stored.ref_count, stored.released_at) == (1, None)
+
+
+@pytest.mark.django_db
+def test_collector_deletes_objects_unreferenced_past_the_grace_period(monkeypatch, settings):
+    monkeypatch.setattr("apps.imaging.services.store_processing_log", lambda *args, **kwargs: "")
+    monkeypatch.setattr("apps.imaging.services.store_image_metadata", lambda *args: "")
+    settings.STORED_OBJECT_GC_GRACE_SECONDS = 3600
+    user = User.objects.create(email="gc-patient@example.com", role=User.Role.PATIENT)
+    PatientProfile.objects.create(user=user)
+    storage = S3StorageService()
+
+    def upload(name, size):
+        buffer = BytesIO()
+        Image.new("L", (size, size)).save(buffer, format="PNG")
+        return handle_image_upload(
+            user, SimpleUploadedFile(name, buffer.getvalue(), content_type="image/png")
+        )
+
+    released, recent, live = upload("a.png", 8), upload("b.png", 9), upload("c.png", 10)
+    derived = [
+        model_input_key(released.stored_sha256),
+        model_input_info_key(released.stored_sha256),
+        preview_key(released.s3_key, "128.webp"),
+        preview_key(released.s3_key, "tiles/0/0_0.webp"),
+    ]
+    for key in derived:
+        storage.upload(BytesIO(b"derived"), key)
+    released.delete()
+    recent.delete()
+    StoredObject.objects.filter(sha256=released.stored_sha256).update(
+        released_at=timezone.now() - timedelta(hours=2)
+    )
+
+    assert collect_unreferenced_objects() == 1
+    assert set(StoredObject.objects.values_list("sha256", flat=True)) == {
+        recent.stored_sha256,
+        live.stored_sha256,
+    }
+    assert not storage.exists(released.s3_key)
+    assert not any(storage.exists(key) for key in derived)
+    assert storage.exists(recent.s3_key)
+    assert storage.exists(live.s3_key)
+
+
+@pytest.mark.django_db
+def test_sweeper_requeues_stuck_images_in_bounded_batches(
+    monkeypatch, settings, django_capture_on_commit_callbacks
+):
+    cache.clear()
+    settings.IMAGE_SWEEP_BATCH_SIZE = 2
+    settings.IMAGE_SWEEP_MAX_REQUEUES = 1
+    queued = {}
+    monkeypatch.setattr(
+        "apps.imaging.tasks._start_chain",
+        lambda image_id, queue, lease: queued.setdefault(image_id, (queue, lease)),
+    )
+    monkeypatch.setattr("apps.imaging.tasks.store_processing_log", lambda *args, **kwargs: "")
+    user = User.objects.create(email="sweep-patient@example.com", role=User.Role.PATIENT)
+    profile = PatientProfile.objects.create(user=user)
+
+    def image(status, minutes_ago):
+        created = MedicalImage.objects.create(
+            patient=profile,
+            file_name="stuck.png",
+            s3_key="medical-images/stuck.png",
+            content_type="image/png",
+            file_size=1,
+            status=status,
+        )
+        MedicalImage.objects.filter(id=created.id).update(
+            updated_at=timezone.now() - timedelta(minutes=minutes_ago)
+        )
+        return created
+
+    def sweep():
+        # Chains are started once the sweep's transaction commits.
+        with django_capture_on_commit_callbacks(execute=True):
+            return sweep_stuck_images()
+
+    oldest = image(MedicalImage.Status.UPLOADED, 120)
+    crashed = image(MedicalImage.Status.PROCESSING, 90)
+    waiting = image(MedicalImage.Status.UPLOADED, 60)
+    recent = image(MedicalImage.Status.PROCESSING, 5)
+    image(MedicalImage.Status.PROCESSED, 600)
+
+    assert sweep() == {"requeued": 2, "abandoned": 0, "busy": 0}
+    assert list(queued) == [str(oldest.id), str(waiting.id)]
+    assert queued[str(oldest.id)][0] == "imaging-bulk"
+    # Requeued images are not swept again until they go stale once more.
+    assert sweep() == {"requeued": 1, "abandoned": 0, "busy": 0}
+    assert list(queued)[-1] == str(crashed.id)
+
+    # Stale again, but its chain still holds the lease: the row is left alone.
+    MedicalImage.objects.filter(id=oldest.id).update(updated_at=timezone.now() - timedelta(hours=2))
+    assert sweep() == {"requeued": 0, "abandoned": 0, "busy": 1}
+    oldest.refresh_from_db()
+    assert oldest.status == MedicalImage.Status.UPLOADED
+    assert oldest.metadata["sweep_requeues"] == 1
+
+    # Once the dead chain's lease is gone the image is given up on.
+    cache.delete(queued[str(oldest.id)][1]["key"])
+    assert sweep() == {"requeued": 0, "abandoned": 1, "busy": 0}
+    oldest.refresh_from_db()
+    crashed.refresh_from_db()
+    recent.refresh_from_db()
+    assert oldest.status == MedicalImage.Status.FAILED
+    assert cache.get(queued[str(oldest.id)][1]["key"]) is None
+    assert crashed.status == MedicalImage.Status.UPLOADED
+    assert crashed.metadata["sweep_requeues"] == 1
+    assert recent.status == MedicalImage.Status.PROCESSING
+    assert image_sweeper_snapshot() == {"runs": 4, "requeued": 3, "abandoned": 1}
+
+
+@pytest.mark.django_db
+def test_swept_image_processed_inline_stays_processed(
+    monkeypatch, settings, django_capture_on_commit_callbacks
+):
+    cache.clear()
+    for target in (
+        "apps.imaging.tasks.store_processing_log",
+        "apps.imaging.tasks.raise_ai_priority",
+    ):
+        monkeypatch.setattr(target, lambda *args, **kwargs: None)
+    monkeypatch.setattr(
+        "apps.imaging.tasks.ensure_model_input",
+        lambda image, storage: {
+            "model_input_key": "preprocessed/swept.npy",
+            "model_input_cached": True,
+        },
+    )
+    monkeypatch.setattr(
+        "apps.imaging.tasks.generate_image_previews", lambda image, storage: {"sizes": {}}
+    )
+    monkeypatch.setattr("apps.imaging.tasks.S3StorageService.download", lambda self, key: b"npy")
+    monkeypatch.setattr(
+        "apps.imaging.tasks.request_inference",
+        lambda *args, **kwargs: {"anomaly_probability": 0.2, "model_version": "demo"},
+    )
+    user = User.objects.create(email="swept-patient@example.com", role=User.Role.PATIENT)
+    image = MedicalImage.objects.create(
+        patient=PatientProfile.objects.create(user=user),
+        file_name="swept.png",
+        s3_key="medical-images/swept.png",
+        content_type="image/png",
+        file_size=1,
+        status=MedicalImage.Status.PROCESSING,
+    )
+    MedicalImage.objects.filter(id=image.id).update(updated_at=timezone.now() - timedelta(hours=1))
+
+    # Eager Celery runs the whole chain as soon as the sweep commits.
+    with django_capture_on_commit_callbacks(execute=True):
+        assert sweep_stuck_images()["requeued"] == 1
+
+    image.refresh_from_db()
+    assert image.status == MedicalImage.Status.PROCESSED
+    assert image.metadata["sweep_requeues"] == 1
+
+
+@pytest.mark.django_db
+def test_duplicate_processing_is_suppressed_and_completed_stages_are_skipped(monkeypatch, settings):
+    cache.clear()
+    chains = []
+    monkeypatch.setattr(
+        "apps.imaging.tasks.chain",
+        lambda *signatures: lambda: chains.append(signatures) or "queued",
+    )
+    monkeypatch.setattr("apps.imaging.tasks.store_processing_log", lambda *args, **kwargs: "")
+
+    def unexpected(*args, **kwargs):
+        raise AssertionError("a completed stage ran again")
+
+    for name in ("ensure_model_input", "generate_image_previews", "request_inference"):
+        monkeypatch.setattr(f"apps.imaging.tasks.{name}", unexpected)
+    user = User.objects.create(email="lease-patient@example.com", role=User.Role.PATIENT)
+    image = MedicalImage.objects.create(
+        patient=PatientProfile.objects.create(user=user),
+        file_name="lease.png",
+        s3_key="medical-images/lease.png",
+        content_type="image/png",
+        file_size=1,
+        stored_sha256="c" * 64,
+        ai_model_version=settings.AI_MODEL_VERSION,
+        status=MedicalImage.Status.PROCESSED,
+        metadata={
+            "preprocess_completed_at": "2030-01-01T10:00:00+00:00",
+            "model_input_key": "preprocessed/lease.npy",
+            "previews": {"sizes": {}},
+        },
+    )
+    image_id = str(image.id)
+
+    def run(signatures):
+        result = signatures[0].type(*signatures[0].args, **signatures[0].kwargs)
+        for signature in signatures[1:]:
+            result = signature.type(result, *signature.args, **signature.kwargs)
+
+    assert queue_image_processing(image_id) is not None
+    assert queue_image_processing(image_id, priority="bulk") is None
+    assert len(chains) == 1
+    # Previews run last so they never delay the AI result.
+    assert [signature.task.rsplit(".", 1)[1] for signature in chains[0]] == [
+        "preprocess_image_task",
+        "ai_inference_task",
+        "generate_previews_task",
+    ]
+    run(chains[0])
+    # The finished chain released its lease.
+    assert queue_image_processing(image_id) is not None
+    assert image_pipeline_snapshot() == {"duplicates_suppressed": 1, "stages_skipped": 3}
+
+    # A stage that raises frees the image through the chain's link_error.
+    errback = chains[1][0].options["link_error"][0]
+    errback.type(None, RuntimeError("worker crashed"), None, **errback.kwargs)
+    assert queue_image_processing(image_id) is not None
+
+    # A chain whose lease was taken over stops at its next stage and leaves the
+    # new holder's lease alone.
+    stale_lease = chains[2][0].kwargs["lease"]
+    cache.delete(stale_lease["key"])
+    assert queue_image_processing(image_id) is not None
+    assert preprocess_image_task(image_id, lease=stale_lease) is None
+    assert cache.get(stale_lease["key"]) == chains[3][0].kwargs["lease"]["token"]
+    assert image_pipeline_snapshot()["duplicates_suppressed"] == 2
+
+    # Stages that find the image gone still release the lease.
+    fresh_lease = chains[3][0].kwargs["lease"]
+    MedicalImage.objects.filter(id=image_id).delete()
+    assert generate_previews_task(None, lease=fresh_lease) is None
+    assert cache.get(fresh_lease["key"]) is None
+
+
+@pytest.mark.django_db
+def test_metadata_updates_from_stale_copies_are_merged():
+    user = User.objects.create(email="merge-patient@example.com", role=User.Role.PATIENT)
+    image = MedicalImage.objects.create(
+        patient=PatientProfile.objects.create(user=user),
+        file_name="merge.png",
+        s3_key="medical-images/merge.png",
+        content_type="image/png",
+        file_size=1,
+        metadata={"upload_sha256": "u"},
+    )
+    stale = MedicalImage.objects.get(id=image.id)
+
+    _update_image_metadata(image, metadata_updates={"previews": {"sizes": {}}})
+    _update_image_metadata(stale, metadata_updates={"model_input_key": "preprocessed/x.npy"})
+
+    image.refresh_from_db()
+    assert image.metadata == {
+        "upload_sha256": "u",
+        "previews": {"sizes": {}},
+        "model_input_key": "preprocessed/x.npy",
+    }
@@ -0,0 +1,75 @@
+import pytest
+from django.core.management import call_command
+from guardian.models import UserObjectPermission
+from guardian.shortcuts import assign_perm
+from rest_framework.test import APIClient
+
+from apps.authentication.models import User
+from apps.doctors.models import DoctorProfile
+from apps.medical_records.models import MedicalRecord
+from apps.patients.models import PatientProfile
+from apps.reports.models import Report
+
+
+@pytest.fixture
+def record():
+    patient_user = User.objects.create(email="perm-patient@example.com", role=User.Role.PATIENT)
+    doctor_user = User.objects.create(email="perm-doctor@example.com", role=User.Role.DOCTOR)
+    return MedicalRecord.objects.create(
+        patient=PatientProfile.objects.create(user=patient_user),
+        doctor=DoctorProfile.objects.create(user=doctor_user, specialty="Cardiology"),
+        diagnosis_text="Stable",
+    )
+
+
+@pytest.mark.django_db
+def test_record_and_report_permissions_are_derived_without_stored_rows(record):
+    doctor_user = record.doctor.user
+    patient_user = record.patient.user
+    client = APIClient()
+    client.force_authenticate(user=doctor_user)
+    response = client.post(
+        "/reports/create",
+        {"medical_record_id": str(record.id), "content": "Findings"},
+        format="json",
+    )
+    assert response.status_code == 201
+    report = Report.objects.get(id=response.data["id"])
+    assert UserObjectPermission.objects.count() == 0
+
+    assert doctor_user.has_perm("medical_records.change_medicalrecord", record)
+    assert doctor_user.has_perm("reports.change_report", report)
+    assert patient_user.has_perm("medical_records.view_medicalrecord", record)
+    assert patient_user.has_perm("view_report", report)
+    assert not patient_user.has_perm("reports.change_report", report)
+    assert not patient_user.has_perm("medical_records.change_medicalrecord", record)
+
+    # Grants follow the record when it is reassigned.
+    other_user = User.objects.create(email="perm-other@example.com", role=User.Role.DOCTOR)
+    record.doctor = DoctorProfile.objects.create(user=other_user, specialty="Neurology")
+    record.save()
+    assert other_user.has_perm("medical_records.change_medicalrecord", record)
+    assert not doctor_user.has_perm("medical_records.view_medicalrecord", record)
+
+
+@pytest.mark.django_db
+def test_prune_object_permissions_keeps_only_grants_that_are_not_derived(record):
+    doctor_user = record.doctor.user
+    radiologist = User.objects.create(email="perm-rad@example.com", role=User.Role.RADIOLOGIST)
+    orphan = MedicalRecord.objects.create(
+        patient=record.patient, doctor=record.doctor, diagnosis_text="Removed"
+    )
+    assign_perm("view_medicalrecord", doctor_user, record)
+    assign_perm("change_medicalrecord", doctor_user, record)
+    assign_perm("view_medicalrecord", radiologist, record)
+    assign_perm("view_medicalrecord", doctor_user, orphan)
+    orphan.delete()
+
+    call_command("prune_object_permissions", "--dry-run")
+    assert UserObjectPermission.objects.count() == 4
+
+    call_command("prune_object_permissions", "--batch-size", "2")
+    assert list(UserObjectPermission.objects.values_list("user_id", "permission__codename")) == [
+        (radiologist.id, "view_medicalrecord")
+    ]
+    assert radiologist.has_perm("medical_records.view_medicalrecord", record)
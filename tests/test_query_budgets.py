@@ -0,0 +1,177 @@
+"""Query-count regression harness.
+
+Each endpoint is requested once with a small dataset and again after more
+rows are added. The query count must stay within the endpoint's budget and
+must not grow with the data; a new N+1 fails here before it reaches
+production.
+"""
+
+from __future__ import annotations
+
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.appointments.models import Appointment
+from apps.audit_logs.models import AuditLog
+from apps.authentication.models import User
+from apps.doctors.models import DoctorProfile
+from apps.medical_records.models import Diagnosis, MedicalRecord, Prescription
+from apps.medical_records.views import PatientRecordsView
+from apps.patients.models import PatientProfile
+from apps.reports.models import Report
+
+
+def _create_user(email: str, role: str) -> User:
+    return User.objects.create_user(email=email, password="StrongPass123", role=role)
+
+
+@pytest.fixture
+def clinic():
+    patient_user = _create_user("budget-patient@example.com", User.Role.PATIENT)
+    doctor_user = _create_user("budget-doctor@example.com", User.Role.DOCTOR)
+    radiologist_user = _create_user("budget-radiologist@example.com", User.Role.RADIOLOGIST)
+    admin_user = User.objects.create_superuser(
+        email="budget-admin@example.com", password="StrongPass123"
+    )
+    return {
+        "patient": patient_user,
+        "patient_profile": PatientProfile.objects.create(user=patient_user),
+        "doctor": doctor_user,
+        "doctor_profile": DoctorProfile.objects.create(user=doctor_user, specialty="Radiology"),
+        "radiologist": radiologist_user,
+        "admin": admin_user,
+    }
+
+
+def _add_rows(clinic, count: int) -> None:
+    """Add ``count`` of each related row, including extra patients for the doctor."""
+    for index in range(count):
+        suffix = f"{Appointment.objects.count()}-{index}"
+        other_user = User.objects.create(
+            email=f"budget-other-{suffix}@example.com", role=User.Role.PATIENT
+        )
+        other_patient = PatientProfile.objects.create(user=other_user)
+        for patient in (clinic["patient_profile"], other_patient):
+            Appointment.objects.create(
+                patient=patient,
+                doctor=clinic["doctor_profile"],
+                scheduled_time=timezone.now() + timedelta(days=index + 1),
+            )
+            record = MedicalRecord.objects.create(
+                patient=patient, doctor=clinic["doctor_profile"], diagnosis_text="Follow-up"
+            )
+            Diagnosis.objects.create(medical_record=record, text="Stable")
+            Prescription.objects.create(medical_record=record, medication_name="Rx", dosage="1")
+            Report.objects.create(
+                medical_record=record,
+                author=clinic["doctor"],
+                content="Body",
+                status=Report.Status.APPROVED,
+            )
+            # Drafts sit in the radiologist's work queue so the dashboard lists them.
+            Report.objects.create(
+                medical_record=record,
+                author=clinic["doctor"],
+                content="Body",
+                claimed_by=clinic["radiologist"],
+                claimed_at=timezone.now(),
+            )
+        AuditLog.objects.create(user=clinic["patient"], action="record_view")
+
+
+def _first_record_id(clinic) -> str:
+    record = MedicalRecord.objects.filter(patient=clinic["patient_profile"]).first()
+    assert record is not None
+    return str(record.id)
+
+
+# API endpoints use force_authenticate; portal and admin pages log in with a
+# session, which adds the session and user lookups to their budgets.
+ENDPOINTS = [
+    pytest.param("api", "patient", lambda clinic: "/appointments", 4, id="appointments"),
+    pytest.param("api", "patient", lambda clinic: "/patient/records", 6, id="patient-records"),
+    pytest.param(
+        "api",
+        "patient",
+        lambda clinic: f"/records/{_first_record_id(clinic)}/diagnoses",
+        5,
+        id="record-diagnoses",
+    ),
+    pytest.param("api", "patient", lambda clinic: "/reports", 4, id="reports"),
+    pytest.param("api", "doctor", lambda clinic: "/doctor/patients", 2, id="doctor-patients"),
+    pytest.param("api", "admin", lambda clinic: "/audit-logs", 1, id="audit-logs"),
+    pytest.param(
+        "session", "patient", lambda clinic: reverse("portal-dashboard"), 10, id="portal-patient"
+    ),
+    pytest.param(
+        "session", "doctor", lambda clinic: reverse("portal-dashboard"), 13, id="portal-doctor"
+    ),
+    pytest.param(
+        "session",
+        "radiologist",
+        lambda clinic: reverse("portal-dashboard"),
+        4,
+        id="portal-radiologist",
+    ),
+    pytest.param(
+        "session", "admin", lambda clinic: reverse("portal-dashboard"), 6, id="portal-admin"
+    ),
+    *[
+        pytest.param(
+            "session",
+            "admin",
+            lambda clinic, name=name: reverse(f"admin:{name}_changelist"),
+            5,
+            id=f"admin-{name}",
+        )
+        for name in (
+            "medical_records_medicalrecord",
+            "medical_records_diagnosis",
+            "medical_records_prescription",
+            "reports_report",
+            "audit_logs_auditlog",
+        )
+    ],
+]
+
+
+def _count_queries(clinic, kind: str, role: str, path: str) -> int:
+    if kind == "api":
+        client = APIClient()
+        client.force_authenticate(user=clinic[role])
+    else:
+        client = Client()
+        client.force_login(clinic[role])
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(path)
+    assert response.status_code == 200, (path, response.status_code)
+    return len(queries)
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(("kind", "role", "path", "budget"), ENDPOINTS)
+def test_endpoint_query_count_is_flat_and_within_budget(clinic, kind, role, path, budget):
+    _add_rows(clinic, 2)
+    small = _count_queries(clinic, kind, role, path(clinic))
+    _add_rows(clinic, 6)
+    large = _count_queries(clinic, kind, role, path(clinic))
+
+    assert large == small, f"{path(clinic)} grew from {small} to {large} queries"
+    assert large <= budget, f"{path(clinic)} ran {large} queries, budget is {budget}"
+
+
+@pytest.mark.django_db
+def test_medical_record_serializer_query_plan_prefetches_nested_rows(clinic, monkeypatch):
+    monkeypatch.setattr(PatientRecordsView, "use_values_serializer", False)
+    _add_rows(clinic, 2)
+    small = _count_queries(clinic, "api", "patient", "/patient/records")
+    _add_rows(clinic, 6)
+
+    assert _count_queries(clinic, "api", "patient", "/patient/records") == small
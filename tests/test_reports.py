@@ -1,4 +1,7 @@
+from datetime import timedelta
+
 import pytest
+from django.utils import timezone
 from rest_framework.test import APIClient
 
 from apps.appointments.models import Appointment
@@ -7,6 +10,8 @@ from apps.doctors.models import DoctorProfile
 from apps.medical_records.models import MedicalRecord
 from apps.patients.models import PatientProfile
 from apps.reports.models import Report
+from apps.reports.tasks import release_stale_report_claims
+from apps.reports.work_queue import approve_draft, raise_ai_priority
 
 
 @pytest.mark.django_db
@@ -187,3 +192,161 @@ def test_admin_cannot_download_private_patient_report():
     response = client.get(f"/reports/{report.id}/download")
 
     assert response.status_code == 403
+
+
+def _queue_clinic():
+    patient_profile = PatientProfile.objects.create(
+        user=User.objects.create(email="queue-patient@example.com", role=User.Role.PATIENT)
+    )
+    doctor_user = User.objects.create(email="queue-doctor@example.com", role=User.Role.DOCTOR)
+    doctor_profile = DoctorProfile.objects.create(user=doctor_user, specialty="Radiology")
+    record = MedicalRecord.objects.create(
+        patient=patient_profile, doctor=doctor_profile, diagnosis_text="Queue"
+    )
+    radiologists = [
+        User.objects.create(
+            email=f"queue-radiologist-{index}@example.com", role=User.Role.RADIOLOGIST
+        )
+        for index in range(2)
+    ]
+    return record, doctor_user, radiologists
+
+
+def _draft(record, author, ai_priority=0.0, age_minutes=0):
+    report = Report.objects.create(
+        medical_record=record, author=author, content="Draft", ai_priority=ai_priority
+    )
+    Report.objects.filter(id=report.id).update(
+        created_at=timezone.now() - timedelta(minutes=age_minutes)
+    )
+    return report
+
+
+@pytest.mark.django_db
+def test_work_queue_claims_by_ai_priority_then_age_without_overlap():
+    record, doctor_user, (first, second) = _queue_clinic()
+    urgent = _draft(record, doctor_user, ai_priority=0.92)
+    oldest = _draft(record, doctor_user, age_minutes=30)
+    newer = _draft(record, doctor_user, age_minutes=5)
+    newest = _draft(record, doctor_user)
+
+    client = APIClient()
+    client.force_authenticate(user=first)
+    response = client.post("/reports/queue", {"count": 2}, format="json")
+
+    assert response.status_code == 200
+    assert [item["id"] for item in response.data] == [str(urgent.id), str(oldest.id)]
+    assert response.data[0]["ai_priority"] == 0.92
+
+    client.force_authenticate(user=second)
+    response = client.post("/reports/queue", {"count": 5}, format="json")
+    assert [item["id"] for item in response.data] == [str(newer.id), str(newest.id)]
+
+    client.force_authenticate(user=first)
+    assert [item["id"] for item in client.get("/reports/queue").data] == [
+        str(urgent.id),
+        str(oldest.id),
+    ]
+
+
+@pytest.mark.django_db
+def test_claimed_report_is_locked_to_its_radiologist_until_released():
+    record, doctor_user, (first, second) = _queue_clinic()
+    report = _draft(record, doctor_user)
+    client = APIClient()
+    client.force_authenticate(user=first)
+    client.post("/reports/queue", {"count": 1}, format="json")
+
+    client.force_authenticate(user=second)
+    response = client.patch(f"/reports/{report.id}/approve", {"approve": True}, format="json")
+    assert response.status_code == 409
+    assert client.post(f"/reports/{report.id}/release").status_code == 404
+
+    client.force_authenticate(user=first)
+    assert client.post(f"/reports/{report.id}/release").status_code == 204
+    assert client.get("/reports/queue").data == []
+
+    client.force_authenticate(user=second)
+    response = client.patch(f"/reports/{report.id}/approve", {"approve": True}, format="json")
+    assert response.status_code == 200
+    report.refresh_from_db()
+    assert report.status == Report.Status.APPROVED
+    assert report.claimed_by is None
+
+
+@pytest.mark.django_db
+def test_approval_never_overrides_a_claim_taken_after_the_report_was_read(monkeypatch):
+    record, doctor_user, (first, second) = _queue_clinic()
+    report = _draft(record, doctor_user)
+    stale = Report.objects.get(id=report.id)
+    Report.objects.filter(id=report.id).update(claimed_by=first, claimed_at=timezone.now())
+
+    assert not approve_draft(stale, second)
+    assert stale.status == Report.Status.DRAFT
+    report.refresh_from_db()
+    assert (report.status, report.claimed_by) == (Report.Status.DRAFT, first)
+
+    # The view's early claim check read the report before the claim landed.
+    monkeypatch.setattr("apps.reports.views.is_claimed_by_other", lambda *args: False)
+    client = APIClient()
+    client.force_authenticate(user=second)
+    response = client.patch(f"/reports/{report.id}/approve", {"approve": True}, format="json")
+    assert response.status_code == 409
+    report.refresh_from_db()
+    assert report.status == Report.Status.DRAFT
+
+    assert approve_draft(stale, first)
+    assert stale.status == Report.Status.APPROVED
+    assert Report.objects.get(id=report.id).claimed_by is None
+
+
+@pytest.mark.django_db
+def test_report_routes_reject_malformed_ids_with_404():
+    _record, _doctor_user, (radiologist, _second) = _queue_clinic()
+    client = APIClient()
+    client.force_authenticate(user=radiologist)
+
+    assert client.post("/reports/abc/release").status_code == 404
+    assert client.post("/reports/0000-1111/release").status_code == 404
+    response = client.patch("/reports/abc-def/approve", {"approve": True}, format="json")
+    assert response.status_code == 404
+
+
+@pytest.mark.django_db
+def test_stale_claims_return_to_the_queue(settings):
+    settings.REPORT_CLAIM_TTL_SECONDS = 60
+    record, doctor_user, (first, second) = _queue_clinic()
+    report = _draft(record, doctor_user)
+    Report.objects.filter(id=report.id).update(
+        claimed_by=first, claimed_at=timezone.now() - timedelta(minutes=5)
+    )
+
+    client = APIClient()
+    client.force_authenticate(user=first)
+    assert client.get("/reports/queue").data == []
+
+    assert release_stale_report_claims() == 1
+    report.refresh_from_db()
+    assert report.claimed_by is None
+
+    client.force_authenticate(user=second)
+    response = client.post("/reports/queue", {"count": 1}, format="json")
+    assert [item["id"] for item in response.data] == [str(report.id)]
+
+
+@pytest.mark.django_db
+def test_inference_result_only_raises_draft_priority():
+    record, doctor_user, _ = _queue_clinic()
+    draft = _draft(record, doctor_user, ai_priority=0.4)
+    approved = Report.objects.create(
+        medical_record=record, author=doctor_user, status=Report.Status.APPROVED
+    )
+
+    assert raise_ai_priority(record.patient_id, 0.3) == 0
+    assert raise_ai_priority(record.patient_id, None) == 0
+    assert raise_ai_priority(record.patient_id, 0.8) == 1
+
+    draft.refresh_from_db()
+    approved.refresh_from_db()
+    assert draft.ai_priority == 0.8
+    assert approved.ai_priority == 0.0
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import time
 from io import BytesIO
 
 import pytest
@@ -16,11 +17,14 @@ from apps.ai_engine.service import (
 from apps.appointments.models import Appointment
 from apps.authentication.models import LoginAttempt, User
 from apps.doctors.models import DoctorProfile
+from apps.imaging.models import MedicalImage
 from apps.imaging.storage import S3StorageService, StorageError
 from apps.medical_records.models import MedicalRecord
 from apps.notifications.tasks import send_email_notification
 from apps.patients.models import PatientProfile
 from apps.reports.models import Report
+from backend.celery_worker.celery_app import app as celery_app
+from backend.celery_worker.celery_app import record_queue_latency, stamp_enqueued_at
 
 
 class _FakeResponse:
@@ -486,3 +490,155 @@ def test_appointment_api_doctor_and_admin_listing_and_missing_status_update():
     assert missing_update.status_code == 404
     assert admin_list.status_code == 200
     assert admin_list.data[0]["id"] == str(appointment.id)
+
+
+@pytest.mark.django_db
+def test_celery_routes_imaging_and_notification_tasks_to_dedicated_queues(monkeypatch):
+    router = celery_app.amqp.router
+    assert router.route({}, "apps.imaging.tasks.ai_inference_task")["queue"].name == (
+        "imaging-interactive"
+    )
+    assert router.route({}, "apps.notifications.tasks.send_email_notification")["queue"].name == (
+        "notifications"
+    )
+
+    from apps.imaging import tasks as imaging_tasks
+
+    captured = {}
+
+    def fake_chain(*signatures):
+        captured["queues"] = [signature.options["queue"] for signature in signatures]
+        return lambda: "chain-result"
+
+    monkeypatch.setattr(imaging_tasks, "chain", fake_chain)
+    monkeypatch.setattr(imaging_tasks, "store_processing_log", lambda *args, **kwargs: "")
+    patient = PatientProfile.objects.create(
+        user=User.objects.create(email="routing-patient@example.com", role=User.Role.PATIENT)
+    )
+    first, second = (
+        str(
+            MedicalImage.objects.create(
+                patient=patient,
+                file_name="route.png",
+                s3_key="medical-images/route.png",
+                content_type="image/png",
+                file_size=1,
+            ).id
+        )
+        for _ in range(2)
+    )
+
+    assert imaging_tasks.queue_image_processing(first, priority="bulk") == "chain-result"
+    assert captured["queues"] == ["imaging-bulk"] * 3
+    imaging_tasks.queue_image_processing(second)
+    assert captured["queues"] == ["imaging-interactive"] * 3
+    with pytest.raises(ValueError):
+        imaging_tasks.queue_image_processing(first, priority="someday")
+
+
+@pytest.mark.django_db
+def test_queue_latency_metrics_are_recorded_per_queue_and_admin_only(monkeypatch):
+    from django.core.cache import cache
+
+    cache.clear()
+    headers: dict = {}
+    monkeypatch.setattr(time, "time", lambda: 1000.0)
+    stamp_enqueued_at(headers=headers, routing_key="imaging-bulk")
+
+    class FakeRequest:
+        enqueued_at = headers["enqueued_at"]
+        enqueued_queue = headers["enqueued_queue"]
+
+    class FakeTask:
+        request = FakeRequest()
+
+    monkeypatch.setattr(time, "time", lambda: 1002.5)
+    record_queue_latency(task=FakeTask())
+
+    admin_user = User.objects.create_user(
+        email="admin-queues@example.com",
+        password="StrongPass123",
+        role=User.Role.ADMIN,
+        is_staff=True,
+    )
+    doctor_user = User.objects.create_user(
+        email="doctor-queues@example.com",
+        password="StrongPass123",
+        role=User.Role.DOCTOR,
+    )
+    client = APIClient()
+    client.force_authenticate(user=admin_user)
+    response = client.get("/ops/queue-metrics")
+
+    assert response.status_code == 200
+    bulk = response.data["queues"]["imaging-bulk"]
+    assert bulk == {"published": 1, "count": 1, "avg_ms": 2500.0, "max_ms": 2500.0}
+    assert response.data["queues"]["imaging-interactive"]["count"] == 0
+    assert response.data["authorization_cache"] == {"hits": 0, "misses": 0, "hit_rate": 0.0}
+    assert response.data["image_sweeper"] == {"runs": 0, "requeued": 0, "abandoned": 0}
+    assert response.data["image_pipeline"] == {"duplicates_suppressed": 0, "stages_skipped": 0}
+
+    client.force_authenticate(user=doctor_user)
+    assert client.get("/ops/queue-metrics").status_code == 403
+
+
+def test_orjson_renderer_matches_drf_output_and_handles_native_types():
+    import json
+    import uuid
+    from datetime import datetime, timezone
+    from decimal import Decimal
+
+    from django.utils.translation import gettext_lazy
+    from rest_framework.exceptions import ParseError
+    from rest_framework.renderers import JSONRenderer
+
+    from curamind_core.renderers import ORJSONParser, ORJSONRenderer
+
+    record_id = uuid.UUID("12345678-1234-5678-1234-567812345678")
+    created_at = datetime(2030, 1, 1, 10, 0, tzinfo=timezone.utc)
+    payload = [{"id": str(record_id), "status": "pending", "score": 0.25, "tags": ["a", "b"]}]
+
+    assert ORJSONRenderer().render(payload) == JSONRenderer().render(payload)
+    native = json.loads(
+        ORJSONRenderer().render(
+            {
+                "id": record_id,
+                "created_at": created_at,
+                "fee": Decimal("12.50"),
+                "label": gettext_lazy("Pending"),
+            }
+        )
+    )
+    assert native == {
+        "id": str(record_id),
+        "created_at": "2030-01-01T10:00:00Z",
+        "fee": 12.5,
+        "label": "Pending",
+    }
+    assert b"\n  " in ORJSONRenderer().render({"a": 1}, "application/json; indent=4")
+    assert ORJSONParser().parse(BytesIO(b'{"status": "approved"}')) == {"status": "approved"}
+    with pytest.raises(ParseError):
+        ORJSONParser().parse(BytesIO(b"{bad"))
+
+
+@pytest.mark.django_db
+def test_api_parses_and_rejects_json_bodies_with_orjson_parser():
+    User.objects.create_user(
+        email="orjson-login@example.com",
+        password="StrongPass123",
+        role=User.Role.PATIENT,
+    )
+    client = APIClient()
+
+    malformed = client.post("/auth/login", data=b"{not-json", content_type="application/json")
+    login = client.post(
+        "/auth/login",
+        data=b'{"email": "orjson-login@example.com", "password": "StrongPass123"}',
+        content_type="application/json",
+    )
+
+    assert malformed.status_code == 400
+    assert malformed["Content-Type"] == "application/json"
+    assert "JSON parse error" in malformed.json()["detail"]
+    assert login.status_code == 200
+    assert login.json()["access"]
@@ -3,6 +3,7 @@ from rest_framework import generics, status
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from django.shortcuts import get_object_or_404
+from curamind_core.pagination import KeysetPagination
 from .models import Appointment
 from .notifications import send_appointment_status_email
 from .serializers import (
@@ -12,9 +13,15 @@ from .serializers import (
 )
 
 
+class AppointmentKeysetPagination(KeysetPagination):
+    def __init__(self):
+        super().__init__(ordering=("-date", "-time", "-id"))
+
+
 class AppointmentListCreateAPI(generics.GenericAPIView):
     permission_classes = [IsAuthenticated]
     serializer_class = AppointmentSerializer
+    pagination_class = AppointmentKeysetPagination
 
     def get_serializer_class(self):
         method = getattr(getattr(self, "request", None), "method", "GET")
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.11 on 2026-10-19 12:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0009_appointment_uniq_active_doctor_slot"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="appointment",
+            index=models.Index(
+                fields=["patient", "date", "time", "id"], name="users_appt_patient_slot_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="appointment",
+            index=models.Index(
+                fields=["doctor", "date", "time", "id"], name="users_appt_doctor_slot_idx"
+            ),
+        ),
+    ]
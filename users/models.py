@@ -83,6 +83,10 @@ class Appointment(models.Model):
                 name='uniq_active_doctor_slot',
             ),
         ]
+        indexes = [
+            models.Index(fields=['patient', 'date', 'time', 'id'], name='users_appt_patient_slot_idx'),
+            models.Index(fields=['doctor', 'date', 'time', 'id'], name='users_appt_doctor_slot_idx'),
+        ]
 
     def clean(self):
         errors = {}
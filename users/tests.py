@@ -367,8 +367,28 @@ class AppointmentAPITests(TestCase):
         self.client.force_authenticate(user=self.patient)
         response = self.client.get(reverse("api_appointments"))
         self.assertEqual(response.status_code, 200)
-        self.assertIn("results", response.data)
-        self.assertEqual(len(response.data["results"]), 1)
+        self.assertIsInstance(response.data, list)
+        self.assertEqual(len(response.data), 1)
+
+    def test_appointment_list_pages_with_keyset_cursor(self):
+        later = Appointment.objects.create(
+            patient=self.patient,
+            doctor=self.doctor,
+            date=self.future_date,
+            time=time(17, 0),
+            description="Later API appointment",
+            status="pending",
+        )
+        self.client.force_authenticate(user=self.patient)
+        first = self.client.get(reverse("api_appointments"), {"page_size": 1})
+        self.assertEqual([row["id"] for row in first.data], [later.id])
+        self.assertIn('rel="next"', first["Link"])
+
+        second = self.client.get(
+            reverse("api_appointments"), {"page_size": 1, "cursor": first["X-Next-Cursor"]}
+        )
+        self.assertEqual([row["id"] for row in second.data], [self.appointment.id])
+        self.assertNotIn("X-Next-Cursor", second)
 
     def test_patient_can_filter_appointments_by_status(self):
         self.client.force_authenticate(user=self.patient)
@@ -376,7 +396,7 @@ class AppointmentAPITests(TestCase):
         self.appointment.save()
         response = self.client.get(f"{reverse('api_appointments')}?status=approved")
         self.assertEqual(response.status_code, 200)
-        self.assertEqual(len(response.data["results"]), 1)
+        self.assertEqual(len(response.data), 1)
 
     def test_patient_filter_invalid_date_returns_400(self):
         self.client.force_authenticate(user=self.patient)
@@ -452,7 +472,7 @@ class AppointmentAPITests(TestCase):
         client.force_authenticate(user=self.doctor)
         response = client.get(f"{reverse('api_appointments')}?status=pending")
         self.assertEqual(response.status_code, 200)
-        self.assertGreaterEqual(len(response.data["results"]), 1)
+        self.assertGreaterEqual(len(response.data), 1)
 
 
 class DataIntegrityAndCommandTests(TestCase):